@@ -58,6 +58,7 @@ all_by_module = {
     'segeval.window.pk':        ['pk'],
     'segeval.window.windowdiff':['window_diff'],
     'segeval.compute':          ['summarize'],
+    'segeval.metric':           ['make_metric'],
     'segeval.format':           ['BoundaryFormat',
                                  'boundary_string_from_masses',
                                  'convert_positions_to_masses',
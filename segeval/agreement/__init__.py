@@ -5,7 +5,7 @@ Inter-coder agreement statistics.
 '''
 from __future__ import absolute_import, division
 from segeval.data import get_coders
-from segeval.similarity import SIMILARITY_METRIC_DEFAULTS
+from segeval.similarity import SIMILARITY_METRIC_DEFAULTS, Detail
 from segeval.similarity.boundary import boundary_similarity
 from segeval.similarity.distance import identify_types
 from segeval.format import (BoundaryFormat, boundary_string_from_masses,
@@ -16,7 +16,9 @@ from segeval.util import SegmentationMetricError
 AGREEMENT_METRIC_DEFAULTS = dict(SIMILARITY_METRIC_DEFAULTS)
 AGREEMENT_METRIC_DEFAULTS.update({
     'fnc_compare': boundary_similarity,
-    'return_parts': False
+    'return_parts': False,
+    # Only the numerator and denominator of each comparison are used
+    'detail': Detail.counts
 })
 
 
@@ -132,47 +134,145 @@ def __actual_agreement_linear__(dataset, **kwargs):
     Other real and contrived examples can be found in
     :mod:`segeval.data.Samples`.
 
+    The parts of each comparison listed by :func:`__agreement_comparisons__`
+    may be computed elsewhere (see :func:`__agreement_part__`) and given as
+    ``parts``.
     '''
-    metric_kwargs = dict(kwargs)
-    del metric_kwargs['fnc_compare']
-    metric_kwargs['return_parts'] = True
+    metric_kwargs = __compare_kwargs__(kwargs)
     # Arguments
     fnc_compare = kwargs['fnc_compare']
     return_parts = kwargs['return_parts']
-    # Initialize
-    all_numerators = list()
-    all_denominators = list()
-    all_pbs = list()
-    coders_boundaries = dict()
+    parts = kwargs.get('parts')
+    # Compare each pair of coders for each item
+    comparisons = __agreement_comparisons__(dataset)
+    if parts is None:
+        parts = __agreement_parts__(dataset, comparisons, fnc_compare,
+                                    metric_kwargs, kwargs.get('progress'),
+                                    kwargs.get('checkpoint'))
+    all_numerators, all_denominators, all_pbs, coders_boundaries = \
+        __combine_agreement_parts__(comparisons, parts)
+    if return_parts:
+        return all_numerators, all_denominators, all_pbs, coders_boundaries
+    else:
+        return sum(all_numerators) / sum(all_denominators)
+
+
+def __compare_kwargs__(kwargs):
+    '''
+    Keyword arguments passed to ``fnc_compare`` by
+    :func:`__actual_agreement_linear__`.
+    '''
+    metric_kwargs = dict(kwargs)
+    del metric_kwargs['fnc_compare']
+    metric_kwargs.pop('parts', None)
+    metric_kwargs.pop('progress', None)
+    metric_kwargs.pop('checkpoint', None)
+    metric_kwargs['return_parts'] = True
+    return metric_kwargs
+
+
+def __agreement_comparisons__(dataset):
+    '''
+    List the ``(coder_m, coder_n, item)`` comparisons made to compute actual
+    agreement, in the order that they are made.  Coders are sorted, so that
+    every process (whatever its hash seed) lists the same comparisons.
+    '''
+    comparisons = list()
     # Obtain the list of coders
-    coders = list(get_coders(dataset))
+    coders = sorted(get_coders(dataset),
+                    key=lambda coder: (str(coder), repr(coder)))
     # For each permutation of coders
     for m in range(0, len(coders) - 1):
         for n in range(m + 1, len(coders)):
             for item in dataset.keys():
-                segs_a = dataset[item][coders[m]]
-                segs_b = dataset[item][coders[n]]
-                # Compute similarity
-                numerator, denominator = \
-                    fnc_compare(segs_a, segs_b, **metric_kwargs)[0:2]
-                # Obtain necessary values
-                pbs = __potential_boundaries__(segs_a, segs_b, **metric_kwargs)
-                # Add all pbs
-                all_numerators.append(numerator)
-                all_denominators.append(denominator)
-                all_pbs.append(pbs)
-                # Create in dicts if not present
-                if coders[m] not in coders_boundaries:
-                    coders_boundaries[coders[m]] = list()
-                if coders[n] not in coders_boundaries:
-                    coders_boundaries[coders[n]] = list()
-                # Add per-coder values to dicts
-                coders_boundaries[coders[m]].append([__boundaries__(segs_a, **metric_kwargs), pbs])
-                coders_boundaries[coders[n]].append([__boundaries__(segs_b, **metric_kwargs), pbs])
-    if return_parts:
-        return all_numerators, all_denominators, all_pbs, coders_boundaries
-    else:
-        return sum(all_numerators) / sum(all_denominators)
+                comparisons.append((coders[m], coders[n], item))
+    return comparisons
+
+
+def __agreement_parts__(dataset, comparisons, fnc_compare, metric_kwargs,
+                        progress=None, checkpoint=None):
+    '''
+    Compute the parts of each comparison (see :func:`__agreement_part__`),
+    reporting each to ``progress`` and storing each in ``checkpoint`` (if
+    any).
+    '''
+    from segeval.util.checkpoint import run_fingerprint
+    from segeval.util.progress import as_progress
+    progress = as_progress(progress)
+    restored = 0
+    if checkpoint is not None:
+        # Caches only serve comparisons, so do not distinguish runs
+        run_kwargs = dict(metric_kwargs)
+        run_kwargs.pop('cache', None)
+        checkpoint.resume(run_fingerprint(
+            __agreement_part__, dataset, fnc_compare=fnc_compare,
+            **run_kwargs))
+    entries = [','.join((str(item), str(coder_m), str(coder_n)))
+               for coder_m, coder_n, item in comparisons]
+    if checkpoint is not None:
+        # Only count stored comparisons that this run makes
+        restored = sum(1 for entry in entries if checkpoint.get(entry)[0])
+    if progress is not None:
+        progress.start(len(comparisons), restored)
+    parts = list()
+    for (coder_m, coder_n, item), entry in zip(comparisons, entries):
+        if checkpoint is not None:
+            found, part = checkpoint.get(entry)
+            if found:
+                parts.append(part)
+                continue
+        if progress is not None:
+            progress.begin(item)
+        part = __agreement_part__(dataset[item][coder_m],
+                                  dataset[item][coder_n], fnc_compare,
+                                  metric_kwargs)
+        parts.append(part)
+        if checkpoint is not None:
+            checkpoint.set(entry, part)
+        if progress is not None:
+            progress.advance(item)
+    if checkpoint is not None:
+        checkpoint.commit()
+    return parts
+
+
+def __agreement_part__(segs_a, segs_b, fnc_compare, metric_kwargs):
+    '''
+    Compare one pair of codings, returning the numerator, denominator,
+    potential boundaries, and boundaries of each coding that actual agreement
+    is computed from.
+    '''
+    # Compute similarity
+    numerator, denominator = \
+        fnc_compare(segs_a, segs_b, **metric_kwargs)[0:2]
+    # Obtain necessary values
+    pbs = __potential_boundaries__(segs_a, segs_b, **metric_kwargs)
+    return (numerator, denominator, pbs,
+            __boundaries__(segs_a, **metric_kwargs),
+            __boundaries__(segs_b, **metric_kwargs))
+
+
+def __combine_agreement_parts__(comparisons, parts):
+    '''
+    Collect the parts of each comparison (see :func:`__agreement_part__`)
+    into the totals returned by :func:`__actual_agreement_linear__`.
+    '''
+    all_numerators = list()
+    all_denominators = list()
+    all_pbs = list()
+    coders_boundaries = dict()
+    for (coder_m, coder_n, _), part in zip(comparisons, parts):
+        numerator, denominator, pbs, boundaries_m, boundaries_n = part
+        # Add all pbs
+        all_numerators.append(numerator)
+        all_denominators.append(denominator)
+        all_pbs.append(pbs)
+        # Add per-coder values to dicts
+        coders_boundaries.setdefault(coder_m, list()).append(
+            [boundaries_m, pbs])
+        coders_boundaries.setdefault(coder_n, list()).append(
+            [boundaries_n, pbs])
+    return all_numerators, all_denominators, all_pbs, coders_boundaries
 
 
 def actual_agreement_linear(dataset, **kwargs):
@@ -4,7 +4,8 @@ Arstein Poesio's annotator bias [ArtsteinPoesio2008]_.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import
-from segeval.agreement import __fnc_metric__
+from segeval.agreement import (__fnc_metric__, __agreement_comparisons__,
+                               __agreement_parts__, __compare_kwargs__)
 from segeval.agreement.kappa import __fleiss_kappa_linear__
 from segeval.agreement.pi import __fleiss_pi_linear__
 
@@ -17,6 +18,14 @@ def __artstein_poesio_bias_linear__(dataset, **kwargs):
     metric_kwargs['return_parts'] = True
     # Arguments
     return_parts = kwargs['return_parts']
+    # Compare coders once for both coefficients (if all coders coded the
+    # same number of items, as is checked by each)
+    if metric_kwargs.get('parts') is None and len(set(
+            [len(coder_segs.values()) for coder_segs in dataset.values()])) == 1:
+        metric_kwargs['parts'] = __agreement_parts__(
+            dataset, __agreement_comparisons__(dataset),
+            kwargs['fnc_compare'], __compare_kwargs__(kwargs),
+            kwargs.get('progress'), kwargs.get('checkpoint'))
     # Compute
     A_pi_e = __fleiss_pi_linear__(dataset, **metric_kwargs)[1]
     A_fleiss_e = __fleiss_kappa_linear__(dataset, **metric_kwargs)[1]
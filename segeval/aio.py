@@ -0,0 +1,259 @@
+'''
+:mod:`asyncio` coroutines (Python 3.5+) for the dataset-level metrics and
+loaders, for use within event loops that must not be blocked for the seconds
+that large evaluations take.  Pairs of codings are compared in chunks within
+an executor (the loop's default executor, unless one is given), and control
+returns to the event loop between chunks.  Cancelling a coroutine stops it
+from submitting further chunks, e.g.::
+
+    values = await segeval.aio.boundary_similarity(dataset, chunk_size=32)
+    kappa = await segeval.aio.fleiss_kappa_linear(dataset)
+
+Coroutines accept the same arguments, and return the same values, as their
+synchronous counterparts.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import asyncio
+from functools import partial
+from itertools import islice
+from segeval.agreement import (AGREEMENT_METRIC_DEFAULTS, __compare_kwargs__,
+                               __agreement_comparisons__, __agreement_part__,
+                               __actual_agreement_linear__)
+from segeval.agreement.bias import __artstein_poesio_bias_linear__
+from segeval.agreement.kappa import __fleiss_kappa_linear__
+from segeval.agreement.pi import __fleiss_pi_linear__
+from segeval.data import Dataset, load_nested_folders_dict as __folders__
+from segeval.data.jsonutils import input_linear_mass_json as __json__
+from segeval.data.sqlite import SqliteDataset
+from segeval.data.tsv import input_linear_mass_tsv as __tsv__
+from segeval.parallel import iter_pairs
+from segeval.similarity import (SIMILARITY_METRIC_DEFAULTS,
+                                __boundary_confusion_matrix__)
+from segeval.similarity.boundary import __boundary_similarity__
+from segeval.similarity.segmentation import (__segmentation_similarity__,
+                                             SEGMENTATION_METRIC_DEFAULTS)
+from segeval.util import SegmentationMetricError
+from segeval.window import WINDOW_METRIC_DEFAULTS
+from segeval.window.pk import __pk__
+from segeval.window.windowdiff import (__window_diff__,
+                                       WINDOWDIFF_METRIC_DEFAULTS)
+
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def __compare_chunk__(fnc_metric, metric_kwargs, chunk):
+    '''
+    Compare each pair of a chunk, returning the key and value of each.
+    '''
+    return [(','.join((pair.item, str(pair.hypothesis_coder),
+                       str(pair.reference_coder))),
+             fnc_metric(pair.hypothesis, pair.reference, **metric_kwargs))
+            for pair in chunk]
+
+
+def __agreement_chunk__(fnc_compare, metric_kwargs, chunk):
+    '''
+    Compute the agreement parts of each pair of codings of a chunk.
+    '''
+    return [__agreement_part__(segs_a, segs_b, fnc_compare, metric_kwargs)
+            for segs_a, segs_b in chunk]
+
+
+def __next_chunk__(values, chunk_size):
+    return list(islice(values, chunk_size))
+
+
+async def __map_chunks__(fnc_chunk, values, executor, chunk_size):
+    '''
+    Apply ``fnc_chunk`` to consecutive chunks of the iterable ``values``
+    within an executor, one chunk at a time, returning the concatenated
+    results.  Each chunk is read from ``values`` within the loop's default
+    executor (so that ``executor`` may be a process pool), and so neither
+    reading a dataset nor holding all of its pairs burdens the event loop.
+    '''
+    loop = asyncio.get_event_loop()
+    values = iter(values)
+    results = list()
+    while True:
+        chunk = await loop.run_in_executor(None, __next_chunk__, values,
+                                           chunk_size)
+        if len(chunk) == 0:
+            return results
+        results.extend(await loop.run_in_executor(executor, fnc_chunk,
+                                                  chunk))
+
+
+async def __pairwise__(fnc_metric, args, kwargs, kw_defaults):
+    '''
+    Asynchronous counterpart of :func:`segeval.util.__fnc_metric__`.
+    '''
+    metric_kwargs = dict(kw_defaults)
+    metric_kwargs.update(kwargs)
+    executor = metric_kwargs.pop('executor', None)
+    chunk_size = metric_kwargs.pop('chunk_size', DEFAULT_CHUNK_SIZE)
+    if 'cache' in metric_kwargs:
+        raise SegmentationMetricError(
+            'Caches are not supported by asynchronous metrics')
+    for name in ('hypothesis', 'reference', 'dataset'):
+        metric_kwargs.pop(name, None)
+    if len(args) == 0:
+        if 'hypothesis' in kwargs and 'reference' in kwargs:
+            args = (kwargs['hypothesis'], kwargs['reference'])
+        elif 'dataset' in kwargs:
+            args = (kwargs['dataset'],)
+    permuted = metric_kwargs.pop('permuted')
+    datasets = (Dataset, SqliteDataset)
+    if len(args) == 1:
+        dataset = args[0]
+        metric_kwargs['boundary_format'] = dataset.boundary_format
+        pairs = iter_pairs(dataset, permuted=permuted)
+    elif len(args) == 2 and all(isinstance(arg, datasets) for arg in args):
+        hypothesis, reference = args
+        if hypothesis.boundary_format is not reference.boundary_format:
+            raise SegmentationMetricError(
+                'Datasets contain differing boundary formats; {0} != {1}'
+                .format(hypothesis.boundary_format,
+                        reference.boundary_format))
+        metric_kwargs['boundary_format'] = hypothesis.boundary_format
+        pairs = iter_pairs(hypothesis, reference)
+    elif len(args) == 2:
+        # A single pair of segmentations
+        hypothesis, reference = [(arg,) if isinstance(arg, int) else arg
+                                 for arg in args]
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(executor, partial(
+            fnc_metric, hypothesis, reference, **metric_kwargs))
+    else:
+        raise SegmentationMetricError(
+            'Incorrect arguments specified; expected 1 or 2, obtained {0}'
+            .format(len(args)))
+    return dict(await __map_chunks__(
+        partial(__compare_chunk__, fnc_metric, metric_kwargs), pairs,
+        executor, chunk_size))
+
+
+async def __agreement__(fnc_metric, dataset, kwargs):
+    '''
+    Asynchronous counterpart of :func:`segeval.agreement.__fnc_metric__`,
+    which computes the comparisons of actual agreement in chunks.
+    '''
+    metric_kwargs = dict(AGREEMENT_METRIC_DEFAULTS)
+    metric_kwargs.update(kwargs)
+    executor = metric_kwargs.pop('executor', None)
+    chunk_size = metric_kwargs.pop('chunk_size', DEFAULT_CHUNK_SIZE)
+    if 'cache' in metric_kwargs:
+        raise SegmentationMetricError(
+            'Caches are not supported by asynchronous metrics')
+    if hasattr(dataset, 'boundary_types'):
+        metric_kwargs['boundary_types'] = dataset.boundary_types
+    if hasattr(dataset, 'boundary_format'):
+        metric_kwargs['boundary_format'] = dataset.boundary_format
+    # Read lazily, chunk by chunk (see __map_chunks__)
+    codings = ((dataset[item][coder_m], dataset[item][coder_n])
+               for coder_m, coder_n, item in
+               __agreement_comparisons__(dataset))
+    metric_kwargs['parts'] = await __map_chunks__(
+        partial(__agreement_chunk__, metric_kwargs['fnc_compare'],
+                __compare_kwargs__(metric_kwargs)), codings, executor,
+        chunk_size)
+    return fnc_metric(dataset, **metric_kwargs)
+
+
+async def boundary_similarity(*args, **kwargs):
+    '''
+    Boundary Similarity (B); see :func:`segeval.boundary_similarity`.
+    '''
+    return await __pairwise__(__boundary_similarity__, args, kwargs,
+                              SIMILARITY_METRIC_DEFAULTS)
+
+
+async def segmentation_similarity(*args, **kwargs):
+    '''
+    Segmentation Similarity (S); see :func:`segeval.segmentation_similarity`.
+    '''
+    return await __pairwise__(__segmentation_similarity__, args, kwargs,
+                              SEGMENTATION_METRIC_DEFAULTS)
+
+
+async def boundary_confusion_matrix(*args, **kwargs):
+    '''
+    BED-based confusion matrices; see
+    :func:`segeval.boundary_confusion_matrix`.
+    '''
+    return await __pairwise__(__boundary_confusion_matrix__, args, kwargs,
+                              SIMILARITY_METRIC_DEFAULTS)
+
+
+async def pk(*args, **kwargs):
+    '''
+    Pk; see :func:`segeval.pk`.
+    '''
+    return await __pairwise__(__pk__, args, kwargs, WINDOW_METRIC_DEFAULTS)
+
+
+async def window_diff(*args, **kwargs):
+    '''
+    WindowDiff; see :func:`segeval.window_diff`.
+    '''
+    return await __pairwise__(__window_diff__, args, kwargs,
+                              WINDOWDIFF_METRIC_DEFAULTS)
+
+
+async def actual_agreement_linear(dataset, **kwargs):
+    '''
+    Actual agreement; see :func:`segeval.actual_agreement_linear`.
+    '''
+    return await __agreement__(__actual_agreement_linear__, dataset, kwargs)
+
+
+async def fleiss_pi_linear(dataset, **kwargs):
+    '''
+    Fleiss' Pi; see :func:`segeval.fleiss_pi_linear`.
+    '''
+    return await __agreement__(__fleiss_pi_linear__, dataset, kwargs)
+
+
+async def fleiss_kappa_linear(dataset, **kwargs):
+    '''
+    Fleiss' Kappa; see :func:`segeval.fleiss_kappa_linear`.
+    '''
+    return await __agreement__(__fleiss_kappa_linear__, dataset, kwargs)
+
+
+async def artstein_poesio_bias_linear(dataset, **kwargs):
+    '''
+    Artstein and Poesio's annotator bias; see
+    :func:`segeval.artstein_poesio_bias_linear`.
+    '''
+    return await __agreement__(__artstein_poesio_bias_linear__, dataset,
+                               kwargs)
+
+
+async def input_linear_mass_json(filepath, executor=None):
+    '''
+    Load a JSON dataset; see :func:`segeval.input_linear_mass_json`.
+    '''
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, __json__, filepath)
+
+
+async def input_linear_mass_tsv(filepath, executor=None, **kwargs):
+    '''
+    Load a TSV file; see :func:`segeval.input_linear_mass_tsv`.
+    '''
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor,
+                                      partial(__tsv__, filepath, **kwargs))
+
+
+async def load_nested_folders_dict(containing_dir, filetype, executor=None):
+    '''
+    Load a directory of datasets; see
+    :func:`segeval.load_nested_folders_dict`.
+    '''
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, __folders__, containing_dir,
+                                      filetype)
@@ -0,0 +1,127 @@
+'''
+Tests asyncio coroutines.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from segeval.util.test import TestCase
+from segeval.data.samples import (KAZANTSEVA2012_G5, HEARST_1997_STARGAZER,
+                                  HYPOTHESIS_STARGAZER)
+from segeval.data.jsonutils import input_linear_mass_json
+from segeval.data.sqlite import SqliteDataset
+from segeval.agreement.bias import artstein_poesio_bias_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.pi import fleiss_pi_linear
+from segeval.similarity.boundary import boundary_similarity
+from segeval.window.windowdiff import window_diff
+from segeval import aio
+
+
+class TestAio(TestCase):
+
+    '''
+    Test asyncio coroutines.
+    '''
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def __run__(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_pairwise(self):
+        '''
+        Test that pairwise values equal those computed synchronously.
+        '''
+        self.assertEqual(boundary_similarity(KAZANTSEVA2012_G5),
+                         self.__run__(aio.boundary_similarity(
+                             KAZANTSEVA2012_G5, chunk_size=5)))
+        self.assertEqual(window_diff(KAZANTSEVA2012_G5, permuted=True),
+                         self.__run__(aio.window_diff(KAZANTSEVA2012_G5,
+                                                      permuted=True)))
+        self.assertEqual(
+            boundary_similarity(HYPOTHESIS_STARGAZER, HEARST_1997_STARGAZER),
+            self.__run__(aio.boundary_similarity(HYPOTHESIS_STARGAZER,
+                                                 HEARST_1997_STARGAZER)))
+        self.assertEqual(boundary_similarity((2, 3, 6), (5, 6)),
+                         self.__run__(aio.boundary_similarity((2, 3, 6),
+                                                              (5, 6))))
+
+    def test_sqlite(self):
+        '''
+        Test that SQLite datasets are read chunk by chunk within executors.
+        '''
+        dataset = SqliteDataset(item_coder_data=KAZANTSEVA2012_G5)
+        executor = ThreadPoolExecutor(2)
+        self.assertEqual(
+            boundary_similarity(dataset),
+            self.__run__(aio.boundary_similarity(dataset, chunk_size=4,
+                                                 executor=executor)))
+        self.assertEqual(fleiss_pi_linear(dataset),
+                         self.__run__(aio.fleiss_pi_linear(dataset,
+                                                           chunk_size=4)))
+        executor.shutdown()
+        dataset.close()
+
+    def test_agreement(self):
+        '''
+        Test that agreement coefficients equal those computed synchronously.
+        '''
+        executor = ThreadPoolExecutor(2)
+        for fnc_sync, fnc_async in (
+                (fleiss_pi_linear, aio.fleiss_pi_linear),
+                (fleiss_kappa_linear, aio.fleiss_kappa_linear),
+                (artstein_poesio_bias_linear,
+                 aio.artstein_poesio_bias_linear)):
+            self.assertEqual(fnc_sync(KAZANTSEVA2012_G5),
+                             self.__run__(fnc_async(KAZANTSEVA2012_G5,
+                                                    executor=executor,
+                                                    chunk_size=3)))
+        executor.shutdown()
+
+    def test_yields(self):
+        '''
+        Test that other tasks run between chunks, and that cancellation stops
+        an evaluation.
+        '''
+        ticks = list()
+
+        async def __ticker__():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def __evaluate__():
+            ticker = self.loop.create_task(__ticker__())
+            task = self.loop.create_task(aio.boundary_similarity(
+                KAZANTSEVA2012_G5, chunk_size=1))
+            values = await task
+            cancelled = self.loop.create_task(aio.fleiss_kappa_linear(
+                KAZANTSEVA2012_G5, chunk_size=1))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            try:
+                await cancelled
+            except asyncio.CancelledError:
+                pass
+            ticker.cancel()
+            return values, cancelled.cancelled()
+
+        values, cancelled = self.__run__(__evaluate__())
+        self.assertTrue(len(ticks) >= len(values))
+        self.assertTrue(cancelled)
+
+    def test_load(self):
+        '''
+        Test loading a dataset.
+        '''
+        filepath = os.path.join(os.path.dirname(__file__), 'data',
+                                'hearst1997.json')
+        self.assertEqual(input_linear_mass_json(filepath),
+                         self.__run__(aio.input_linear_mass_json(filepath)))
@@ -0,0 +1,142 @@
+'''
+Benchmarks of the package's public metrics and loaders upon synthetic
+corpora (see :mod:`segeval.bench.generate`).  Run ``python -m segeval.bench``
+to time each benchmark across document sizes and emit the results as JSON.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import os
+import platform
+import shutil
+import tempfile
+import timeit
+from collections import namedtuple
+from segeval.bench.generate import generate_dataset, write_dataset
+from segeval.bench.memory import measure_memory
+from segeval.data import load_nested_folders_dict, FILETYPE_TSV
+from segeval.data.jsonutils import input_linear_mass_json
+from segeval.format import BoundaryFormat
+from segeval.similarity import boundary_confusion_matrix
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.segmentation import segmentation_similarity
+from segeval.window.pk import pk
+from segeval.window.windowdiff import window_diff
+from segeval.agreement.pi import fleiss_pi_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.bias import artstein_poesio_bias_linear
+
+
+Benchmark = namedtuple('Benchmark', 'name fnc formats')
+
+ALL_FORMATS = (BoundaryFormat.mass, BoundaryFormat.sets)
+MASS_FORMATS = (BoundaryFormat.mass,)
+
+BENCHMARKS = (
+    Benchmark('boundary_similarity',
+              lambda dataset, directory: boundary_similarity(dataset),
+              ALL_FORMATS),
+    Benchmark('segmentation_similarity',
+              lambda dataset, directory: segmentation_similarity(dataset),
+              ALL_FORMATS),
+    Benchmark('boundary_confusion_matrix',
+              lambda dataset, directory: boundary_confusion_matrix(dataset),
+              ALL_FORMATS),
+    Benchmark('pk', lambda dataset, directory: pk(dataset), MASS_FORMATS),
+    Benchmark('window_diff', lambda dataset, directory: window_diff(dataset),
+              MASS_FORMATS),
+    Benchmark('fleiss_pi_linear',
+              lambda dataset, directory: fleiss_pi_linear(dataset),
+              ALL_FORMATS),
+    Benchmark('fleiss_kappa_linear',
+              lambda dataset, directory: fleiss_kappa_linear(dataset),
+              ALL_FORMATS),
+    Benchmark('artstein_poesio_bias_linear',
+              lambda dataset, directory: artstein_poesio_bias_linear(dataset),
+              ALL_FORMATS),
+    Benchmark('input_linear_mass_json',
+              lambda dataset, directory: input_linear_mass_json(
+                  os.path.join(directory, 'dataset.json')),
+              MASS_FORMATS),
+    Benchmark('load_nested_folders_dict_tsv',
+              lambda dataset, directory: load_nested_folders_dict(
+                  os.path.join(directory, 'tsv'), FILETYPE_TSV),
+              MASS_FORMATS),
+)
+'''
+Benchmarks run by default, and the boundary formats that each supports.
+'''
+
+
+def median(values):
+    '''
+    Median of a sequence of numbers.
+    '''
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2 == 1:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def time_benchmark(benchmark, dataset, directory, repeat=3):
+    '''
+    Time ``repeat`` runs of a benchmark, returning a list of wall times in
+    seconds.  An untimed run is performed first.
+    '''
+    timer = timeit.default_timer
+    times = list()
+    benchmark.fnc(dataset, directory)
+    for _ in range(0, repeat):
+        start = timer()
+        benchmark.fnc(dataset, directory)
+        times.append(timer() - start)
+    return times
+
+
+def run(sizes=(100, 1000), items=5, coders=3, density=0.1, boundary_types=1,
+        jitter=2, type_noise=0.1, seed=0, repeat=3, names=None,
+        memory=False):
+    '''
+    Run each benchmark (or only those in ``names``) upon a synthetic dataset
+    of each document size in ``sizes``; see
+    :func:`segeval.bench.generate.generate_dataset` for the remaining
+    parameters.  If ``memory``, the memory used by an additional (untimed)
+    run is also recorded; see :mod:`segeval.bench.memory`.  Returns a
+    JSON-serializable ``dict`` of the parameters and a list of results.
+    '''
+    from segeval import __version__
+    parameters = {'sizes': list(sizes), 'items': items, 'coders': coders,
+                  'density': density, 'boundary_types': boundary_types,
+                  'jitter': jitter, 'type_noise': type_noise, 'seed': seed,
+                  'repeat': repeat, 'names': names, 'memory': memory}
+    benchmarks = [benchmark for benchmark in BENCHMARKS
+                  if names is None or benchmark.name in names]
+    results = list()
+    for size in sizes:
+        dataset = generate_dataset(items=items, coders=coders, length=size,
+                                   density=density,
+                                   boundary_types=boundary_types,
+                                   jitter=jitter, type_noise=type_noise,
+                                   seed=seed)
+        directory = tempfile.mkdtemp()
+        try:
+            if dataset.boundary_format == BoundaryFormat.mass:
+                write_dataset(dataset, directory)
+            for benchmark in benchmarks:
+                if dataset.boundary_format not in benchmark.formats:
+                    continue
+                times = time_benchmark(benchmark, dataset, directory, repeat)
+                result = {'metric': benchmark.name, 'size': size,
+                          'times': times, 'min': min(times),
+                          'median': median(times),
+                          'mean': sum(times) / len(times)}
+                if memory:
+                    result.update(measure_memory(
+                        lambda: benchmark.fnc(dataset, directory)) or
+                        {'peak_memory': None})
+                results.append(result)
+        finally:
+            shutil.rmtree(directory)
+    return {'segeval': __version__, 'python': platform.python_version(),
+            'parameters': parameters, 'results': results}
@@ -0,0 +1,83 @@
+'''
+Command-line entry point for running benchmarks; e.g.::
+
+    python -m segeval.bench --sizes 100 1000 10000 --output results.json
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import argparse
+import json
+import sys
+from segeval.bench import run, BENCHMARKS
+
+
+def add_arguments(parser):
+    '''
+    Add arguments describing the benchmark workload to a parser.
+    '''
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000],
+                        help='document lengths (in units) to benchmark')
+    parser.add_argument('--items', type=int, default=5,
+                        help='documents per dataset')
+    parser.add_argument('--coders', type=int, default=3,
+                        help='coders per document')
+    parser.add_argument('--density', type=float, default=0.1,
+                        help='probability of a boundary at each position')
+    parser.add_argument('--boundary-types', type=int, default=1,
+                        help='number of boundary types')
+    parser.add_argument('--jitter', type=int, default=2,
+                        help='maximum distance coders move boundaries')
+    parser.add_argument('--type-noise', type=float, default=0.1,
+                        help='probability that coders change a boundary type')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each benchmark')
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        choices=[benchmark.name for benchmark in BENCHMARKS],
+                        help='benchmarks to run (default all)')
+    parser.add_argument('--memory', action='store_true',
+                        help='also record the peak memory of each benchmark')
+
+
+def parse_args(argv=None):
+    '''
+    Parse benchmark command-line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m segeval.bench',
+        description='Time segeval metrics upon synthetic corpora.')
+    add_arguments(parser)
+    parser.add_argument('--output', default=None,
+                        help='file to write JSON results to (default stdout)')
+    return parser.parse_args(argv)
+
+
+def run_args(args):
+    '''
+    Run the benchmarks described by parsed arguments.
+    '''
+    return run(sizes=args.sizes, items=args.items, coders=args.coders,
+               density=args.density, boundary_types=args.boundary_types,
+               jitter=args.jitter, type_noise=args.type_noise,
+               seed=args.seed, repeat=args.repeat, names=args.metrics,
+               memory=args.memory)
+
+
+def main(argv=None):
+    '''
+    Run benchmarks and write their results as JSON.
+    '''
+    args = parse_args(argv)
+    report = run_args(args)
+    if args.output is None:
+        json.dump(report, sys.stdout, sort_keys=True, indent=4)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, sort_keys=True, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
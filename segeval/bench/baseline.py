@@ -0,0 +1,172 @@
+'''
+Storage of benchmark baselines and detection of performance regressions
+against them.  Save a baseline with::
+
+    python -m segeval.bench.baseline save baseline.json --repeat 9 --memory
+
+and, later (e.g., after upgrading), re-run the same benchmarks and compare::
+
+    python -m segeval.bench.baseline compare baseline.json --threshold 0.2
+
+which exits with a status of 1 if any benchmark regressed.  Noise is handled
+by comparing medians of repeated runs: a benchmark only regresses when the
+lower bound of a bootstrapped confidence interval of the ratio between its
+current and baseline medians exceeds ``1 + threshold``.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import argparse
+import json
+import random
+import sys
+from segeval.bench import run, median
+from segeval.bench.__main__ import add_arguments, run_args
+
+
+def save_baseline(report, path):
+    '''
+    Write a benchmark report (see :func:`segeval.bench.run`) to ``path``.
+    '''
+    with open(path, 'w') as baseline:
+        json.dump(report, baseline, sort_keys=True, indent=4)
+
+
+def load_baseline(path):
+    '''
+    Read a benchmark report written by :func:`save_baseline`.
+    '''
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def ratio_interval(baseline_times, current_times, confidence=0.95,
+                   resamples=2000, seed=0):
+    '''
+    Bootstrap a confidence interval of the ratio between the medians of two
+    samples of run times, returning a ``(low, high)`` tuple.
+    '''
+    rng = random.Random(seed)
+    ratios = list()
+    for _ in range(0, resamples):
+        baseline = median([rng.choice(baseline_times)
+                           for _ in baseline_times])
+        current = median([rng.choice(current_times) for _ in current_times])
+        ratios.append(current / baseline if baseline > 0 else float('inf'))
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    low = ratios[int(tail * (resamples - 1))]
+    high = ratios[int((1 - tail) * (resamples - 1))]
+    return low, high
+
+
+def compare(baseline, current, threshold=0.1, memory_threshold=0.1,
+            confidence=0.95):
+    '''
+    Compare the results of two benchmark reports, returning a list of
+    comparisons of each benchmark and size found in both.  A benchmark has
+    ``regressed`` if it is slower by more than ``threshold`` (as a proportion
+    of its baseline median) with the ``confidence`` given, or if its peak
+    memory grew by more than ``memory_threshold``.
+    '''
+    baseline_results = dict(((result['metric'], result['size']), result)
+                            for result in baseline['results'])
+    comparisons = list()
+    for result in current['results']:
+        key = (result['metric'], result['size'])
+        if key not in baseline_results:
+            continue
+        baseline_result = baseline_results[key]
+        low, high = ratio_interval(baseline_result['times'], result['times'],
+                                   confidence)
+        comparison = {
+            'metric': result['metric'], 'size': result['size'],
+            'baseline': baseline_result['median'],
+            'current': result['median'],
+            'ratio': result['median'] / baseline_result['median']
+            if baseline_result['median'] > 0 else float('inf'),
+            'low': low, 'high': high}
+        regressed = low > 1 + threshold
+        baseline_peak = baseline_result.get('peak_memory')
+        current_peak = result.get('peak_memory')
+        if baseline_peak is not None and current_peak is not None:
+            comparison['memory_ratio'] = current_peak / baseline_peak \
+                if baseline_peak > 0 else float('inf')
+            regressed = regressed or \
+                comparison['memory_ratio'] > 1 + memory_threshold
+        comparison['regressed'] = regressed
+        comparisons.append(comparison)
+    return comparisons
+
+
+def write_comparisons(comparisons, stream=None):
+    '''
+    Write a table of comparisons to ``stream`` (default ``sys.stdout``).
+    '''
+    stream = stream if stream is not None else sys.stdout
+    stream.write('{0:<30} {1:>8} {2:>12} {3:>12} {4:>7} {5:>15} {6:>7}\n'
+                 .format('metric', 'size', 'baseline (s)', 'current (s)',
+                         'ratio', 'interval', 'memory'))
+    for comparison in comparisons:
+        memory_ratio = comparison.get('memory_ratio')
+        row = '{0:<30} {1:>8} {2:>12.6f} {3:>12.6f} {4:>7.2f} {5:>15} {6:>7} \
+{7}'.format(comparison['metric'], comparison['size'], comparison['baseline'],
+            comparison['current'], comparison['ratio'],
+            '[{0:.2f}, {1:.2f}]'.format(comparison['low'], comparison['high']),
+            '{0:.2f}'.format(memory_ratio) if memory_ratio is not None
+            else '-',
+            'REGRESSED' if comparison['regressed'] else '')
+        stream.write(row.rstrip() + '\n')
+
+
+def parse_args(argv=None):
+    '''
+    Parse baseline command-line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m segeval.bench.baseline',
+        description='Save benchmark baselines and compare against them.')
+    commands = parser.add_subparsers(dest='command')
+    save = commands.add_parser('save', help='run benchmarks and save them')
+    save.add_argument('path', help='baseline file to write')
+    add_arguments(save)
+    check = commands.add_parser(
+        'compare', help='re-run the benchmarks of a baseline and compare')
+    check.add_argument('path', help='baseline file to read')
+    check.add_argument('--threshold', type=float, default=0.1,
+                       help='tolerated slowdown (proportion of the median)')
+    check.add_argument('--memory-threshold', type=float, default=0.1,
+                       help='tolerated peak memory growth (proportion)')
+    check.add_argument('--confidence', type=float, default=0.95,
+                       help='confidence level of slowdown intervals')
+    check.add_argument('--output', default=None,
+                       help='file to write JSON comparisons to')
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.error('a command (save or compare) is required')
+    return args
+
+
+def main(argv=None):
+    '''
+    Save a baseline, or compare against one returning 1 if any benchmark
+    regressed.
+    '''
+    args = parse_args(argv)
+    if args.command == 'save':
+        save_baseline(run_args(args), args.path)
+        return 0
+    baseline = load_baseline(args.path)
+    current = run(**baseline['parameters'])
+    comparisons = compare(baseline, current, args.threshold,
+                          args.memory_threshold, args.confidence)
+    write_comparisons(comparisons)
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump(comparisons, output, sort_keys=True, indent=4)
+    return 1 if any(comparison['regressed'] for comparison in comparisons) \
+        else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
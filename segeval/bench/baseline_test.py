@@ -0,0 +1,86 @@
+'''
+Tests benchmark baselines and regression detection.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+from segeval.bench.baseline import (ratio_interval, compare, main,
+                                    load_baseline, save_baseline)
+
+
+def __report__(times, peak_memory=None):
+    result = {'metric': 'pk', 'size': 100, 'times': times,
+              'median': sorted(times)[len(times) // 2]}
+    if peak_memory is not None:
+        result['peak_memory'] = peak_memory
+    return {'parameters': {}, 'results': [result]}
+
+
+class TestBaseline(unittest.TestCase):
+
+    '''
+    Test benchmark baselines and regression detection.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'baseline.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ratio_interval(self):
+        '''
+        Test that intervals contain the ratio of medians.
+        '''
+        low, high = ratio_interval([1.0, 1.1, 0.9, 1.0, 1.05],
+                                   [2.0, 2.1, 1.9, 2.0, 2.2])
+        self.assertTrue(1.5 < low <= 2 <= high < 2.5)
+
+    def test_compare(self):
+        '''
+        Test that only slowdowns beyond noise and the threshold regress.
+        '''
+        baseline = __report__([1.0, 1.1, 0.9, 1.0, 1.05])
+        self.assertTrue(compare(baseline, __report__(
+            [2.0, 2.1, 1.9, 2.0, 2.2]))[0]['regressed'])
+        self.assertFalse(compare(baseline, __report__(
+            [1.0, 1.05, 0.95, 1.1, 1.0]))[0]['regressed'])
+        # Noisy runs whose interval includes the threshold do not regress
+        self.assertFalse(compare(baseline, __report__(
+            [0.9, 1.0, 2.0, 2.1, 1.0]))[0]['regressed'])
+        self.assertFalse(compare(baseline, __report__(
+            [2.0, 2.1, 1.9, 2.0, 2.2]), threshold=2)[0]['regressed'])
+
+    def test_compare_memory(self):
+        '''
+        Test that peak memory growth regresses.
+        '''
+        baseline = __report__([1.0, 1.0, 1.0], peak_memory=1000)
+        comparison = compare(baseline, __report__([1.0, 1.0, 1.0],
+                                                  peak_memory=1500))[0]
+        self.assertEqual(1.5, comparison['memory_ratio'])
+        self.assertTrue(comparison['regressed'])
+
+    def test_main(self):
+        '''
+        Test saving a baseline and comparing against it.
+        '''
+        self.assertEqual(0, main(['save', self.path, '--sizes', '30',
+                                  '--repeat', '3', '--metrics', 'pk',
+                                  '--memory']))
+        baseline = load_baseline(self.path)
+        self.assertTrue(baseline['results'][0]['peak_memory'] > 0)
+        self.assertEqual(0, main(['compare', self.path, '--threshold', '1000',
+                                  '--memory-threshold', '1000']))
+        # Pretend that the baseline was far faster
+        for result in baseline['results']:
+            result['times'] = [time / 10000 for time in result['times']]
+            result['median'] = result['median'] / 10000
+        save_baseline(baseline, self.path)
+        self.assertEqual(1, main(['compare', self.path,
+                                  '--memory-threshold', '1000']))
@@ -0,0 +1,118 @@
+'''
+Synthetic corpus generators for benchmarking.  A reference segmentation is
+drawn for each item, and each coder's segmentation is derived from it by
+moving boundaries by up to ``jitter`` units (and occasionally changing their
+type), which resembles the disagreement found between real coders.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import random
+from segeval.data import Dataset
+from segeval.data.jsonutils import output_linear_mass_json
+from segeval.format import BoundaryFormat
+
+
+def generate_boundaries(length, density, boundary_types, rng):
+    '''
+    Draw a ``dict`` of boundary positions to boundary types for a document of
+    ``length`` units, placing a boundary at each of the ``length - 1``
+    potential boundary positions with probability ``density``.
+    '''
+    boundaries = dict()
+    for position in range(1, length):
+        if rng.random() < density:
+            boundaries[position] = rng.randint(1, boundary_types)
+    return boundaries
+
+
+def jitter_boundaries(boundaries, length, jitter, boundary_types, type_noise,
+                      rng):
+    '''
+    Move each boundary by up to ``jitter`` units and change its type with
+    probability ``type_noise``.  Boundaries moved onto the same position (or
+    past either end of the document) are merged (or dropped).
+    '''
+    jittered = dict()
+    for position, boundary_type in boundaries.items():
+        position += rng.randint(-jitter, jitter)
+        if rng.random() < type_noise:
+            boundary_type = rng.randint(1, boundary_types)
+        if 0 < position < length:
+            jittered[position] = boundary_type
+    return jittered
+
+
+def boundaries_to_masses(boundaries, length):
+    '''
+    Convert boundary positions into a tuple of segment masses.
+    '''
+    masses = list()
+    previous = 0
+    for position in sorted(boundaries):
+        masses.append(position - previous)
+        previous = position
+    masses.append(length - previous)
+    return tuple(masses)
+
+
+def boundaries_to_sets(boundaries, length):
+    '''
+    Convert boundary positions and types into a boundary string of sets.
+    '''
+    return tuple(frozenset([boundaries[position]]) if position in boundaries
+                 else frozenset() for position in range(1, length))
+
+
+def generate_dataset(items=1, coders=2, length=100, density=0.1,
+                     boundary_types=1, jitter=2, type_noise=0.1, seed=0):
+    '''
+    Generate a :class:`segeval.data.Dataset` of ``items`` documents of
+    ``length`` units, each segmented by ``coders`` coders.  Segmentations are
+    masses if there is one boundary type, and boundary strings of sets (see
+    :func:`segeval.format.boundary_string_from_masses`) otherwise.
+
+    :param density: Probability of a boundary at each potential boundary.
+    :param jitter: Maximum distance that a coder moves a reference boundary.
+    :param type_noise: Probability that a coder changes a boundary's type.
+    :param seed: Seed of the random number generator.
+    :type density: float
+    :type jitter: int
+    :type type_noise: float
+    '''
+    rng = random.Random(seed)
+    if boundary_types > 1:
+        boundary_format = BoundaryFormat.sets
+        fnc_convert = boundaries_to_sets
+    else:
+        boundary_format = BoundaryFormat.mass
+        fnc_convert = boundaries_to_masses
+    data = dict()
+    for i in range(0, items):
+        reference = generate_boundaries(length, density, boundary_types, rng)
+        codings = dict()
+        for j in range(0, coders):
+            boundaries = jitter_boundaries(reference, length, jitter,
+                                           boundary_types, type_noise, rng)
+            codings['coder{0}'.format(j + 1)] = \
+                fnc_convert(boundaries, length)
+        data['item{0}'.format(i + 1)] = codings
+    return Dataset(data, boundary_types=range(1, boundary_types + 1),
+                   boundary_format=boundary_format)
+
+
+def write_dataset(dataset, directory):
+    '''
+    Write a mass-format dataset to ``directory`` as ``dataset.json`` and as
+    one TSV file per item within a ``tsv`` sub-directory.
+    '''
+    output_linear_mass_json(os.path.join(directory, 'dataset.json'), dataset)
+    tsv_directory = os.path.join(directory, 'tsv')
+    os.mkdir(tsv_directory)
+    for item, codings in dataset.items():
+        with open(os.path.join(tsv_directory, item + '.tsv'), 'w') as tsv:
+            tsv.write('Coder\tMasses\n')
+            for coder in sorted(codings):
+                tsv.write('\t'.join([coder] + [str(mass) for mass in
+                                               codings[coder]]) + '\n')
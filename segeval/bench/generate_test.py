@@ -0,0 +1,76 @@
+'''
+Tests synthetic corpus generation.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+from segeval.bench.generate import (generate_dataset, write_dataset,
+                                    boundaries_to_masses, boundaries_to_sets)
+from segeval.data import load_nested_folders_dict, FILETYPE_TSV
+from segeval.data.jsonutils import input_linear_mass_json
+from segeval.format import BoundaryFormat, boundary_string_from_masses
+
+
+class TestGenerate(unittest.TestCase):
+
+    '''
+    Test synthetic corpus generation.
+    '''
+
+    def test_conversion(self):
+        '''
+        Test that boundaries convert to equivalent masses and sets.
+        '''
+        boundaries = {2: 1, 5: 1}
+        self.assertEqual((2, 3, 2), boundaries_to_masses(boundaries, 7))
+        self.assertEqual(boundary_string_from_masses((2, 3, 2)),
+                         boundaries_to_sets(boundaries, 7))
+
+    def test_generate_dataset(self):
+        '''
+        Test the shape and reproducibility of generated datasets.
+        '''
+        dataset = generate_dataset(items=4, coders=3, length=50, seed=1)
+        self.assertEqual(4, len(dataset))
+        self.assertEqual(set(['coder1', 'coder2', 'coder3']), dataset.coders)
+        for codings in dataset.values():
+            for masses in codings.values():
+                self.assertEqual(50, sum(masses))
+        self.assertEqual(dataset, generate_dataset(items=4, coders=3,
+                                                   length=50, seed=1))
+        self.assertNotEqual(dataset, generate_dataset(items=4, coders=3,
+                                                      length=50, seed=2))
+
+    def test_generate_dataset_types(self):
+        '''
+        Test that multiple boundary types produce boundary strings of sets.
+        '''
+        dataset = generate_dataset(length=50, density=0.5, boundary_types=3)
+        self.assertEqual(BoundaryFormat.sets, dataset.boundary_format)
+        self.assertEqual(set([1, 2, 3]), dataset.boundary_types)
+        for codings in dataset.values():
+            for boundary_string in codings.values():
+                self.assertEqual(49, len(boundary_string))
+
+    def test_write_dataset(self):
+        '''
+        Test that written datasets can be loaded.
+        '''
+        directory = tempfile.mkdtemp()
+        try:
+            dataset = generate_dataset(items=2, length=30)
+            write_dataset(dataset, directory)
+            loaded = input_linear_mass_json(
+                os.path.join(directory, 'dataset.json'))
+            self.assertEqual(dataset['item1']['coder1'],
+                             tuple(loaded['item1']['coder1']))
+            loaded = load_nested_folders_dict(
+                os.path.join(directory, 'tsv'), FILETYPE_TSV)
+            self.assertEqual(dataset['item2']['coder2'],
+                             loaded['item2']['coder2'])
+        finally:
+            shutil.rmtree(directory)
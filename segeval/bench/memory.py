@@ -0,0 +1,157 @@
+'''
+Memory benchmarks using :mod:`tracemalloc` (Python 3.4+).  For each run
+measured, the following are reported (in bytes):
+
+* ``peak_memory``, the most memory allocated at once during the run;
+* ``result_memory``, the memory held once the run has returned, including its
+  result;
+* ``retained_memory``, the memory still held after the result is discarded
+  (e.g., by caches); and
+* ``modules``, the memory held once the run has returned, attributed to the
+  innermost ``segeval`` module (or ``other``) that allocated it.
+
+Run ``python -m segeval.bench.memory`` to print these for each benchmark and
+size; the same values are added to the timing report of
+:func:`segeval.bench.run` when ``memory=True``.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import argparse
+import gc
+import json
+import os
+import sys
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4
+    tracemalloc = None
+
+
+TRACEBACK_FRAMES = 4
+'''
+Frames stored per traced allocation.  Tracing slows runs in proportion to the
+number of frames stored, so only enough are kept to find the ``segeval``
+module beneath most allocations made by the standard library.
+'''
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def __module_of__(traceback):
+    '''
+    Name of the innermost ``segeval`` module within a traceback, or
+    ``other``.
+    '''
+    frames = list(traceback)
+    # Tracebacks are ordered oldest frame first as of Python 3.7
+    if sys.version_info >= (3, 7):
+        frames.reverse()
+    for frame in frames:
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(PACKAGE_ROOT + os.sep):
+            name = os.path.splitext(os.path.relpath(
+                filename, os.path.dirname(PACKAGE_ROOT)))[0]
+            name = name.replace(os.sep, '.')
+            if name.endswith('.__init__'):
+                name = name[:-len('.__init__')]
+            return name
+    return 'other'
+
+
+def attribute(before, after):
+    '''
+    Attribute the memory allocated between two snapshots to modules.
+    '''
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before = before.filter_traces(ignored)
+    after = after.filter_traces(ignored)
+    modules = dict()
+    for statistic in after.compare_to(before, 'traceback'):
+        if statistic.size_diff == 0:
+            continue
+        module = __module_of__(statistic.traceback)
+        modules[module] = modules.get(module, 0) + statistic.size_diff
+    return modules
+
+
+def measure_memory(fnc, frames=TRACEBACK_FRAMES):
+    '''
+    Call ``fnc`` while tracing memory allocations (storing ``frames`` frames
+    of each), returning a ``dict`` of the measurements described in
+    :mod:`segeval.bench.memory`, or ``None`` if :mod:`tracemalloc` is
+    unavailable.  Allocations are attributed to the module that made them,
+    which is not necessarily the module that retains them.
+    '''
+    if tracemalloc is None:
+        return None
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(frames)
+    try:
+        gc.collect()
+        initial = tracemalloc.get_traced_memory()[0]
+        before = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        result = fnc()
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        modules = attribute(before, after)
+        del result, before, after
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - initial
+        return {'peak_memory': max(peak - start, 0),
+                'result_memory': current - start,
+                'retained_memory': retained,
+                'modules': modules}
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+def write_memory_report(report, stream=None):
+    '''
+    Write a table of the memory measurements within a benchmark report to
+    ``stream`` (default ``sys.stdout``), including the module that held the
+    most memory after each run.
+    '''
+    stream = stream if stream is not None else sys.stdout
+    stream.write('{0:<30} {1:>8} {2:>12} {3:>12} {4:>12}  {5}\n'.format(
+        'metric', 'size', 'peak', 'result', 'retained', 'largest module'))
+    for result in report['results']:
+        if result.get('peak_memory') is None:
+            continue
+        modules = result['modules']
+        largest = max(modules, key=modules.get) if len(modules) > 0 else '-'
+        stream.write('{0:<30} {1:>8} {2:>12} {3:>12} {4:>12}  {5}\n'.format(
+            result['metric'], result['size'], result['peak_memory'],
+            result['result_memory'], result['retained_memory'], largest))
+
+
+def main(argv=None):
+    '''
+    Run benchmarks measuring their memory use and print a table of it.
+    '''
+    from segeval.bench.__main__ import add_arguments, run_args
+    parser = argparse.ArgumentParser(
+        prog='python -m segeval.bench.memory',
+        description='Measure the memory used by segeval metrics upon '
+        'synthetic corpora.')
+    add_arguments(parser)
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON report to')
+    args = parser.parse_args(argv)
+    args.memory = True
+    report = run_args(args)
+    write_memory_report(report)
+    if args.output is not None:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, sort_keys=True, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
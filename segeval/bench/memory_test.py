@@ -0,0 +1,53 @@
+'''
+Tests memory benchmarks.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import unittest
+from segeval.bench import run
+from segeval.bench.generate import generate_dataset
+from segeval.bench.memory import measure_memory, tracemalloc
+from segeval.window.pk import pk
+
+
+@unittest.skipIf(tracemalloc is None, 'tracemalloc is unavailable')
+class TestMemory(unittest.TestCase):
+
+    '''
+    Test memory benchmarks.
+    '''
+
+    def test_measure_memory(self):
+        '''
+        Test that results held are measured and attributed to modules.
+        '''
+        measurements = measure_memory(lambda: [0] * 100000)
+        self.assertTrue(measurements['peak_memory'] >= 800000)
+        self.assertTrue(measurements['result_memory'] >= 800000)
+        self.assertTrue(measurements['retained_memory'] < 800000)
+        self.assertTrue(measurements['modules']['segeval.bench.memory_test'] >=
+                        800000)
+
+    def test_measure_memory_segeval(self):
+        '''
+        Test that allocations made by metrics are attributed to their
+        modules.
+        '''
+        dataset = generate_dataset(items=2, coders=2, length=200)
+        measurements = measure_memory(lambda: pk(dataset))
+        self.assertTrue(measurements['peak_memory'] > 0)
+        self.assertTrue(any(module.startswith('segeval.window')
+                            for module in measurements['modules']))
+
+    def test_run_memory(self):
+        '''
+        Test that memory measurements are added to benchmark reports.
+        '''
+        report = run(sizes=[50], items=1, coders=2, repeat=1,
+                     names=['pk', 'window_diff'], memory=True)
+        self.assertEqual(2, len(report['results']))
+        for result in report['results']:
+            for key in ('peak_memory', 'result_memory', 'retained_memory',
+                        'modules'):
+                self.assertTrue(key in result)
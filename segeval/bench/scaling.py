@@ -0,0 +1,147 @@
+'''
+Empirical scaling checks.  Each check times a metric at geometrically
+increasing input sizes and fits the exponent of its growth (the slope of log
+time over log size), failing if the exponent exceeds what the metric's
+algorithm should exhibit.  Run ``python -m segeval.bench.scaling`` to print
+the fitted exponents as JSON (exiting with a status of 1 upon failure).
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import argparse
+import json
+import math
+import sys
+import timeit
+from collections import namedtuple
+from segeval.bench import median
+from segeval.bench.generate import generate_dataset
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.distance import multipleboundary
+from segeval.window.pk import pk
+from segeval.window.windowdiff import window_diff
+from segeval.agreement.kappa import fleiss_kappa_linear
+
+
+ScalingCheck = namedtuple('ScalingCheck',
+                          'name fnc setup sizes max_exponent')
+
+
+def __pair__(size):
+    dataset = generate_dataset(coders=2, length=size, seed=size)
+    codings = dataset['item1']
+    return (codings['coder1'], codings['coder2']), dict()
+
+
+def __window_pair__(size):
+    # Windows grow with the input so that O(n k) growth is quadratic
+    args, kwargs = __pair__(size)
+    kwargs['window_size'] = max(2, size // 10)
+    return args, kwargs
+
+
+def __dataset__(size):
+    return (generate_dataset(items=2, coders=3, length=size, seed=size),), \
+        dict()
+
+
+def __types__(size):
+    # Two positions that each contain ``size`` distinct boundary types, all
+    # of which can be substituted for each other
+    a = set(range(1, 2 * size, 2))
+    b = set(range(2, 2 * size + 1, 2))
+    return (a ^ b, a, b), dict()
+
+
+CHECKS = (
+    ScalingCheck('boundary_similarity', boundary_similarity, __pair__,
+                 (1000, 2000, 4000, 8000, 16000), 1.5),
+    ScalingCheck('window_diff', window_diff, __window_pair__,
+                 (1000, 2000, 4000, 8000, 16000), 1.5),
+    ScalingCheck('pk', pk, __window_pair__,
+                 (1000, 2000, 4000, 8000, 16000), 1.5),
+    ScalingCheck('fleiss_kappa_linear', fleiss_kappa_linear, __dataset__,
+                 (500, 1000, 2000, 4000, 8000), 1.5),
+    # Sizes are numbers of boundary types, spanning enough orders of
+    # magnitude that timing noise does not dominate the fit; pairing types by
+    # dynamic programming is at worst cubic, whereas a search over
+    # permutations grows factorially
+    ScalingCheck('__additions_substitutions_sets__',
+                 multipleboundary.__additions_substitutions_sets__, __types__,
+                 (8, 16, 32, 64, 128), 3),
+)
+'''
+Scaling checks run by default.
+'''
+
+
+def fit_exponent(sizes, times):
+    '''
+    Fit the exponent ``e`` of ``time = c * size ** e`` by least squares upon
+    the logarithms of sizes and times.
+    '''
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(time, 1e-9)) for time in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return covariance / variance
+
+
+def measure(check, repeat=3):
+    '''
+    Return the median time of ``repeat`` runs of a check at each of its sizes.
+    '''
+    timer = timeit.default_timer
+    times = list()
+    for size in check.sizes:
+        args, kwargs = check.setup(size)
+        runs = list()
+        for _ in range(0, repeat):
+            start = timer()
+            check.fnc(*args, **kwargs)
+            runs.append(timer() - start)
+        times.append(median(runs))
+    return times
+
+
+def run(names=None, repeat=3):
+    '''
+    Run each scaling check (or only those in ``names``), returning a list of
+    results that include the fitted ``exponent`` and whether it ``passed``.
+    '''
+    results = list()
+    for check in CHECKS:
+        if names is not None and check.name not in names:
+            continue
+        times = measure(check, repeat)
+        exponent = fit_exponent(check.sizes, times)
+        results.append({'metric': check.name, 'sizes': list(check.sizes),
+                        'times': times, 'exponent': exponent,
+                        'max_exponent': check.max_exponent,
+                        'passed': exponent <= check.max_exponent})
+    return results
+
+
+def main(argv=None):
+    '''
+    Run scaling checks, returning 1 if any failed.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='python -m segeval.bench.scaling',
+        description='Fit the growth exponents of segeval metrics.')
+    parser.add_argument('--metrics', nargs='+', default=None,
+                        choices=[check.name for check in CHECKS],
+                        help='checks to run (default all)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs of each check at each size')
+    args = parser.parse_args(argv)
+    results = run(args.metrics, args.repeat)
+    json.dump(results, sys.stdout, sort_keys=True, indent=4)
+    sys.stdout.write('\n')
+    return 0 if all(result['passed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+'''
+Tests empirical scaling checks.  Timing every check is slow, so the checks
+themselves are only run when the ``SEGEVAL_SCALING_TESTS`` environment
+variable is set.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import unittest
+from segeval.bench.scaling import fit_exponent, run, CHECKS
+
+
+class TestScaling(unittest.TestCase):
+
+    '''
+    Test empirical scaling checks.
+    '''
+
+    def test_fit_exponent(self):
+        '''
+        Test fitting the exponents of known growth.
+        '''
+        sizes = [10, 20, 40, 80]
+        self.assertAlmostEqual(1, fit_exponent(sizes, [3 * size
+                                                       for size in sizes]))
+        self.assertAlmostEqual(2, fit_exponent(sizes, [size ** 2
+                                                       for size in sizes]))
+
+    def test_run(self):
+        '''
+        Test that a cheap check reports its exponent.
+        '''
+        result = run(names=['__additions_substitutions_sets__'], repeat=1)[0]
+        self.assertEqual(len(result['sizes']), len(result['times']))
+        self.assertTrue('exponent' in result)
+
+    @unittest.skipUnless(os.environ.get('SEGEVAL_SCALING_TESTS'),
+                         'set SEGEVAL_SCALING_TESTS to run scaling checks')
+    def test_scaling(self):
+        '''
+        Test that no metric grows faster than its algorithm should.
+        '''
+        results = run()
+        self.assertEqual(len(CHECKS), len(results))
+        for result in results:
+            self.assertTrue(result['passed'],
+                            '{metric} grew with exponent {exponent:.2f} > '
+                            '{max_exponent}'.format(**result))
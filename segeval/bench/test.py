@@ -0,0 +1,63 @@
+'''
+Tests the benchmark runner.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from segeval.bench import run, median, BENCHMARKS
+from segeval.bench.__main__ import main
+
+
+class TestBench(unittest.TestCase):
+
+    '''
+    Test the benchmark runner.
+    '''
+
+    def test_median(self):
+        '''
+        Test medians of odd and even numbers of values.
+        '''
+        self.assertEqual(2, median([3, 1, 2]))
+        self.assertEqual(2.5, median([4, 1, 2, 3]))
+
+    def test_run(self):
+        '''
+        Test that every benchmark is run for every size.
+        '''
+        report = run(sizes=[50, 80], items=2, repeat=2)
+        self.assertEqual(2 * len(BENCHMARKS), len(report['results']))
+        for result in report['results']:
+            self.assertEqual(2, len(result['times']))
+            self.assertTrue(result['min'] <= result['median'])
+        json.dumps(report)
+
+    def test_run_sets(self):
+        '''
+        Test that benchmarks of mass segmentations only are skipped for
+        boundary strings of sets.
+        '''
+        report = run(sizes=[20], items=2, repeat=1, boundary_types=2,
+                     names=['boundary_similarity', 'pk'])
+        self.assertEqual(['boundary_similarity'],
+                         [result['metric'] for result in report['results']])
+
+    def test_main(self):
+        '''
+        Test writing results from the command line.
+        '''
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'results.json')
+            self.assertEqual(0, main(['--sizes', '20', '--repeat', '1',
+                                      '--metrics', 'pk', '--output', path]))
+            with open(path) as results:
+                report = json.load(results)
+            self.assertEqual('pk', report['results'][0]['metric'])
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,232 @@
+'''
+The ``segeval`` command, which evaluates segmentations in batch; e.g.::
+
+    segeval reference/ --hypothesis hypothesis/ --metrics B S WD \\
+        --processes 4 --output results.tsv
+
+compares every hypothesis coder of each item against every reference coder
+(or, without ``--hypothesis``, every pair of reference coders), writes each
+value to a TSV, JSON lines, or SQLite file as it is computed, and prints a
+summary of each metric (see :func:`segeval.compute.summarize`).
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import argparse
+import os
+import sys
+from itertools import chain
+from segeval.data import (DataIOError, FILETYPES, FILETYPE_JSON, FNC, EXT,
+                          load_nested_folders_dict)
+from segeval.compute import summarize
+from segeval.data.results import RESULT_FORMATS, open_result_writer
+from segeval.format import BoundaryFormat
+from segeval.metric import METRIC_ALIASES, __metric_definitions__
+from segeval.parallel import evaluate_datasets, DEFAULT_CHUNK_SIZE
+from segeval.schedule import Scheduler
+from segeval.util import SegmentationMetricError
+
+
+METRIC_OPTIONS = {
+    'boundary_similarity': ('n_t',),
+    'segmentation_similarity': ('n_t',),
+    'pk': ('window_size',),
+    'window_diff': ('window_size',)
+}
+'''
+Command-line options that apply to each metric (other than the boundary
+format, which applies to all).
+'''
+
+
+def load_dataset(path, filetype=FILETYPE_JSON):
+    '''
+    Load a dataset from a file (whose type is implied by its extension) or a
+    directory of files of ``filetype`` (see
+    :func:`segeval.data.load_nested_folders_dict`).
+    '''
+    if os.path.isdir(path):
+        return load_nested_folders_dict(path, filetype)
+    ext = os.path.splitext(path)[1].lower()
+    for description in FILETYPES.values():
+        if ext in description[EXT]:
+            return description[FNC](path)
+    raise DataIOError('Unrecognized file extension: {0}'.format(path))
+
+
+def metric_specifications(args, boundary_format):
+    '''
+    Build the ``(name, options)`` specifications of the metrics requested by
+    parsed arguments; see :func:`segeval.parallel.evaluate`.
+    '''
+    metrics = list()
+    for name in args.metrics:
+        name = METRIC_ALIASES.get(name, name)
+        options = {'boundary_format': boundary_format}
+        for option in METRIC_OPTIONS[name]:
+            value = getattr(args, option)
+            if value is not None:
+                options[option] = value
+        metrics.append((name, options))
+    return metrics
+
+
+def permuted_groups(metrics, permuted=None):
+    '''
+    Group ``(name, options)`` metric specifications by whether reference
+    coders are compared in both orders for each: ``permuted`` if given, else
+    the metric's own default (as when the metric's function is given a
+    dataset, e.g., :func:`segeval.pk` permutes and
+    :func:`segeval.boundary_similarity` does not).  Returns a list of
+    ``(permuted, metrics)`` tuples in the order that metrics were given.
+    '''
+    definitions = __metric_definitions__()
+    groups = list()
+    for name, options in metrics:
+        metric_permuted = permuted if permuted is not None else \
+            definitions[name][0]['permuted']
+        for group_permuted, group in groups:
+            if group_permuted == metric_permuted:
+                group.append((name, options))
+                break
+        else:
+            groups.append((metric_permuted, [(name, options)]))
+    return groups
+
+
+def write_summaries(values, stream):
+    '''
+    Write the mean, standard deviation, variance, standard error, and count
+    of the values of each metric to ``stream``.
+    '''
+    stream.write('metric\tmean\tstd\tvar\tstderr\tn\n')
+    for name in sorted(values):
+        if len(values[name]) == 0:
+            continue
+        summary = summarize(values[name])
+        stream.write('\t'.join([name] + [str(part) for part in summary]) +
+                     '\n')
+
+
+def add_dataset_arguments(parser):
+    '''
+    Add the arguments that select datasets to compare to a parser.
+    '''
+    parser.add_argument('reference',
+                        help='reference dataset file or directory')
+    parser.add_argument('--hypothesis', default=None,
+                        help='hypothesis dataset file or directory (default '
+                        'compares reference coders with each other)')
+    parser.add_argument('--filetype', default=FILETYPE_JSON,
+                        choices=sorted(FILETYPES),
+                        help='type of files to load from directories')
+    permuted = parser.add_mutually_exclusive_group()
+    permuted.add_argument('--permuted', dest='permuted', action='store_true',
+                          help='compare reference coders in both orders '
+                          '(default is that of each metric: Pk and WD do, '
+                          'B and S do not)')
+    permuted.add_argument('--no-permuted', dest='permuted',
+                          action='store_false',
+                          help='compare reference coders in one order')
+    parser.set_defaults(permuted=None)
+
+
+def add_metric_arguments(parser):
+    '''
+    Add the arguments that select metrics and their options to a parser.
+    '''
+    metric_names = sorted(set(METRIC_OPTIONS) | set(METRIC_ALIASES))
+    parser.add_argument('--metrics', nargs='+', default=['B'],
+                        choices=metric_names, help='metrics to compute')
+    parser.add_argument('--n-t', dest='n_t', type=int, default=None,
+                        help='maximum transposition distance (B and S)')
+    parser.add_argument('--window-size', type=int, default=None,
+                        help='window size (Pk and WD; default is computed)')
+    parser.add_argument('--boundary-format', default=None,
+                        choices=[BoundaryFormat.mass, BoundaryFormat.position,
+                                 BoundaryFormat.sets, BoundaryFormat.nltk],
+                        help='format of segmentations (default is that of '
+                        'the dataset)')
+
+
+def add_output_arguments(parser):
+    '''
+    Add the arguments that select where results are written to a parser.
+    '''
+    parser.add_argument('--output', default='-',
+                        help='file to write results to (default stdout)')
+    parser.add_argument('--output-format', default=None,
+                        choices=sorted(RESULT_FORMATS),
+                        help='format of results (default is implied by the '
+                        'output file extension, else tsv)')
+
+
+def parse_args(argv=None):
+    '''
+    Parse command-line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='segeval',
+        description='Evaluate segmentations using segeval metrics.')
+    add_dataset_arguments(parser)
+    add_metric_arguments(parser)
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes (default one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='pairs sent to a worker at a time (at most, '
+                        'with --schedule)')
+    parser.add_argument('--schedule', action='store_true',
+                        help='send the costliest pairs to workers first and '
+                        'report worker utilization')
+    add_output_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''
+    Evaluate segmentations, writing results and then summaries (to stderr),
+    and returning 1 upon error.
+    '''
+    args = parse_args(argv)
+    try:
+        reference = load_dataset(args.reference, args.filetype)
+        hypothesis = None
+        if args.hypothesis is not None:
+            hypothesis = load_dataset(args.hypothesis, args.filetype)
+        boundary_format = args.boundary_format or reference.boundary_format
+        metrics = metric_specifications(args, boundary_format)
+        scheduler = None
+        if args.schedule:
+            scheduler = Scheduler(args.processes, args.chunk_size,
+                                  boundary_format)
+        if hypothesis is not None:
+            rows = evaluate_datasets(hypothesis, metrics, reference,
+                                     processes=args.processes,
+                                     chunk_size=args.chunk_size,
+                                     scheduler=scheduler)
+        else:
+            rows = chain.from_iterable(
+                evaluate_datasets(reference, group, permuted=group_permuted,
+                                  processes=args.processes,
+                                  chunk_size=args.chunk_size,
+                                  scheduler=scheduler)
+                for group_permuted, group in
+                permuted_groups(metrics, args.permuted))
+        values = dict((name, dict()) for name, _ in metrics)
+        with open_result_writer(args.output, args.output_format) as writer:
+            for row in rows:
+                writer.write(row)
+                key = ','.join((row.item, row.hypothesis_coder,
+                                row.reference_coder))
+                values[row.metric][key] = row.value
+    except (DataIOError, SegmentationMetricError, IOError) as error:
+        sys.stderr.write('segeval: error: {0}\n'.format(error))
+        return 1
+    write_summaries(values, sys.stderr)
+    if scheduler is not None:
+        sys.stderr.write(scheduler.report())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
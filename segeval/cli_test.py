@@ -0,0 +1,166 @@
+'''
+Tests the segeval command.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from segeval.util.test import TestCase
+from segeval.data.jsonutils import output_linear_mass_json
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.cli import load_dataset, main
+from segeval.compute import summarize
+from segeval.similarity.boundary import boundary_similarity
+from segeval.window.pk import pk
+
+
+class TestCli(TestCase):
+
+    '''
+    Test the segeval command.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.directory, 'dataset.json')
+        output_linear_mass_json(self.dataset_path, KAZANTSEVA2012_G5)
+        self.stderr = sys.stderr
+        sys.stderr = open(os.path.join(self.directory, 'stderr'), 'w')
+
+    def tearDown(self):
+        sys.stderr.close()
+        sys.stderr = self.stderr
+        shutil.rmtree(self.directory)
+
+    def __path__(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_tsv(self):
+        '''
+        Test writing results as TSV and summaries.
+        '''
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'B', 'Pk',
+                                  '--processes', '1', '--output',
+                                  self.__path__('results.tsv')]))
+        with open(self.__path__('results.tsv')) as results:
+            lines = results.read().splitlines()
+        expected = boundary_similarity(KAZANTSEVA2012_G5)
+        # Pk compares reference coders in both orders by default
+        self.assertEqual(1 + 3 * len(expected), len(lines))
+        item, hypothesis, reference, metric, value = lines[1].split('\t')
+        self.assertEqual('boundary_similarity', metric)
+        self.assertEqual(str(expected[','.join((item, hypothesis,
+                                                reference))]), value)
+        sys.stderr.close()
+        with open(self.__path__('stderr')) as stderr:
+            summaries = stderr.read().splitlines()
+        sys.stderr = open(self.__path__('stderr'), 'a')
+        self.assertEqual(3, len(summaries))
+        self.assertTrue(summaries[1].startswith('boundary_similarity\t'))
+
+    def __summaries__(self):
+        sys.stderr.close()
+        with open(self.__path__('stderr')) as stderr:
+            lines = stderr.read().splitlines()
+        sys.stderr = open(self.__path__('stderr'), 'w')
+        return dict((line.split('\t')[0], line.split('\t')[1:])
+                    for line in lines[1:])
+
+    def __assert_summary__(self, values, summary):
+        # Sums of Decimal values may differ in their last digits by order
+        expected = summarize(values)
+        self.assertEqual(str(expected[-1]), summary[-1])
+        for expected_part, part in zip(expected[:-1], summary[:-1]):
+            self.assertAlmostEqual(float(expected_part), float(part),
+                                   places=12)
+
+    def test_permuted(self):
+        '''
+        Test that each metric is summarized as its function summarizes a
+        dataset unless coders are explicitly (not) permuted.
+        '''
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'Pk', 'B',
+                                  '--processes', '1', '--output',
+                                  self.__path__('results.tsv')]))
+        summaries = self.__summaries__()
+        for name, fnc_metric in (('pk', pk),
+                                 ('boundary_similarity', boundary_similarity)):
+            self.__assert_summary__(fnc_metric(KAZANTSEVA2012_G5),
+                                    summaries[name])
+        self.assertEqual('48', summaries['pk'][-1])
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'Pk', 'B',
+                                  '--no-permuted', '--processes', '1',
+                                  '--output', self.__path__('results.tsv')]))
+        summaries = self.__summaries__()
+        # Coders are ordered as loaded, which orients each pair
+        dataset = load_dataset(self.dataset_path)
+        self.__assert_summary__(pk(dataset, permuted=False), summaries['pk'])
+        self.assertEqual('24', summaries['pk'][-1])
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'Pk', 'B',
+                                  '--permuted', '--processes', '1',
+                                  '--output', self.__path__('results.tsv')]))
+        summaries = self.__summaries__()
+        self.__assert_summary__(
+            boundary_similarity(KAZANTSEVA2012_G5, permuted=True),
+            summaries['boundary_similarity'])
+
+    def test_jsonl(self):
+        '''
+        Test writing results as JSON lines using worker processes.
+        '''
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'S',
+                                  '--processes', '2', '--output',
+                                  self.__path__('results.jsonl')]))
+        with open(self.__path__('results.jsonl')) as results:
+            records = [json.loads(line) for line in results]
+        self.assertEqual(len(boundary_similarity(KAZANTSEVA2012_G5)),
+                         len(records))
+        self.assertEqual('segmentation_similarity', records[0]['metric'])
+        self.assertTrue(0 <= records[0]['value'] <= 1)
+
+    def test_schedule(self):
+        '''
+        Test reporting worker utilization of scheduled pairs.
+        '''
+        self.assertEqual(0, main([self.dataset_path, '--metrics', 'B', 'Pk',
+                                  '--processes', '2', '--schedule',
+                                  '--output', self.__path__('results.tsv')]))
+        sys.stderr.close()
+        with open(self.__path__('stderr')) as stderr:
+            lines = stderr.read().splitlines()
+        sys.stderr = open(self.__path__('stderr'), 'a')
+        self.assertTrue(lines[-1].startswith('worker '))
+        # Pairs of both B and (permuted) Pk are reported
+        workers = [line for line in lines if line.startswith('worker ')]
+        pairs = len(boundary_similarity(KAZANTSEVA2012_G5))
+        self.assertEqual(3 * pairs, sum(int(line.split(', ')[1].split()[0])
+                                        for line in workers))
+
+    def test_sqlite(self):
+        '''
+        Test writing results to SQLite comparing two datasets.
+        '''
+        self.assertEqual(0, main([self.dataset_path, '--hypothesis',
+                                  self.dataset_path, '--metrics', 'WD',
+                                  '--window-size', '3', '--processes', '1',
+                                  '--output', self.__path__('results.db')]))
+        connection = sqlite3.connect(self.__path__('results.db'))
+        count = connection.execute('SELECT COUNT(*) FROM results').fetchone()
+        connection.close()
+        coders = sum(len(codings) ** 2
+                     for codings in KAZANTSEVA2012_G5.values())
+        self.assertEqual(coders, count[0])
+
+    def test_error(self):
+        '''
+        Test that errors are reported with an exit status.
+        '''
+        self.assertEqual(1, main([self.__path__('missing.json'),
+                                  '--output', self.__path__('results.tsv')]))
+        self.assertEqual(1, main([self.dataset_path, '--n-t', '-1',
+                                  '--output', self.__path__('results.tsv')]))
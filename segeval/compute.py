@@ -4,10 +4,41 @@ Abstract computation utilities.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import
+import copy
+from decimal import Decimal
 from segeval.util.math import mean, std, var, stderr
 from itertools import combinations
 
 
+REUSE_MEMO_BYTES = 16 * 1024 * 1024
+'''
+Approximate bytes of segmentations (and results) that
+:func:`compute_pairwise_values` holds to reuse the results of identical
+pairs.
+'''
+
+
+def __reuse_size__(entry):
+    '''
+    Estimate the bytes held by a memoized ``(segs_m, segs_n, value)`` entry,
+    counting one pointer per segmentation value.
+    '''
+    segs_m, segs_n, _ = entry
+    if segs_m is segs_n:
+        return 64 + 8 * len(segs_m)
+    return 64 + 8 * (len(segs_m) + len(segs_n))
+
+
+def __copy_result__(value):
+    '''
+    Copy a metric result so that a reused result can be modified without
+    affecting the pairs that it was reused for.
+    '''
+    if isinstance(value, (Decimal, int, float)):
+        return value
+    return copy.deepcopy(value)
+
+
 def compute_pairwise_values(fnc_metric, dataset_a, dataset_b=None, **kwargs):
     '''
     Calculate mean pairwise segmentation metric pairs for functions that take
@@ -17,18 +48,82 @@ def compute_pairwise_values(fnc_metric, dataset_a, dataset_b=None, **kwargs):
                            codings).
     :param fnc_metric:     Metric function to call on segmentation mass pairs.
     :param permuted:       Permute coder combinations if true.
+    :param cache:          Cache to serve unchanged pairs from, if any.
+    :param progress:       Progress to report each pair compared to, if any.
+    :param checkpoint:     Checkpoint to store (and restore) each pair's
+                           value in, if any.
     :type dataset: dict
     :type fnc_metric:     func
     :type permuted:       bool
+    :type cache:          :class:`segeval.util.cache.PairwiseCache`
+    :type progress:       :class:`segeval.util.progress.Progress` or func
+    :type checkpoint:     :class:`segeval.util.checkpoint.Checkpoint`
     '''
-
+    from segeval.util.cache import LruMemo
+    from segeval.util.checkpoint import run_fingerprint
+    from segeval.util.progress import as_progress
     pairs = dict()
     fnc_kwargs = dict(kwargs)
     # Obtain parameters
     permuted = fnc_kwargs['permuted']
-    return_parts = fnc_kwargs['return_parts'] \
-        if 'return_parts' in fnc_kwargs else False
     del fnc_kwargs['permuted']
+    cache = fnc_kwargs.pop('cache', None)
+    progress = as_progress(fnc_kwargs.pop('progress', None))
+    checkpoint = fnc_kwargs.pop('checkpoint', None)
+    restored = 0
+    if checkpoint is not None:
+        restored = checkpoint.resume(run_fingerprint(
+            fnc_metric, dataset_a, dataset_b, permuted=permuted,
+            **fnc_kwargs))
+
+    def __metric__(segs_m, segs_n):
+        if cache is not None:
+            return cache.compute(fnc_metric, segs_m, segs_n, **fnc_kwargs)
+        return fnc_metric(segs_m, segs_n, **fnc_kwargs)
+
+    # Results of pairs already compared (of any label); identical pairs
+    # (e.g., of interned segmentations) are only compared once
+    results = LruMemo(max_size=float('inf'), max_bytes=REUSE_MEMO_BYTES,
+                      fnc_size=__reuse_size__)
+
+    def __compare__(entry, label, segs_m, segs_n):
+        '''
+        Compare a pair of segmentations, reusing the result of an identical
+        pair if one was already compared (or restoring it from a checkpoint).
+        The comparison is stored before progress is reported, so that a run
+        interrupted by a progress callback loses no completed comparison.
+        '''
+        if checkpoint is not None:
+            found, value = checkpoint.get(entry)
+            if found:
+                return value
+        if progress is not None:
+            progress.begin(label)
+        value = __reuse__(segs_m, segs_n)
+        if checkpoint is not None:
+            checkpoint.set(entry, value)
+        if progress is not None:
+            progress.advance(label)
+        return value
+
+    def __reuse__(segs_m, segs_n):
+        if segs_m is segs_n:
+            # Found by identity, without hashing either segmentation (the
+            # entry holds the segmentation, so its id is not reused)
+            key = ('is', id(segs_m))
+        else:
+            key = (segs_m, segs_n)
+        try:
+            found, entry = results.get(key)
+        except (TypeError, ValueError):
+            # Unhashable segmentations (e.g., shared memory views of
+            # integers) cannot be reused
+            return __metric__(segs_m, segs_n)
+        if found:
+            return __copy_result__(entry[2])
+        value = __metric__(segs_m, segs_n)
+        results.set(key, (segs_m, segs_n, value))
+        return value
 
     # Define fnc per group
     def __per_group__(prefix, inner_dataset_m, inner_dataset_n, has_two_datasets):
@@ -71,23 +166,15 @@ def compute_pairwise_values(fnc_metric, dataset_a, dataset_b=None, **kwargs):
                 entry_parts = list(prefix)
                 entry_parts.extend([label, str(m), str(n)])
                 entry = ','.join(entry_parts)
-                if return_parts:
-                    label_pairs[entry] = fnc_metric(segs_m, segs_n,
-                                                    **fnc_kwargs)
-                else:
-                    label_pairs[entry] = fnc_metric(segs_m, segs_n,
-                                                    **fnc_kwargs)
+                label_pairs[entry] = __compare__(entry, label, segs_m,
+                                                 segs_n)
                 # Handle permutation
                 if permuted and not has_two_datasets:
                     entry_parts = list(prefix)
                     entry_parts.extend([label, str(n), str(m)])
                     entry = ','.join(entry_parts)
-                    if return_parts:
-                        label_pairs[entry] = \
-                            fnc_metric(segs_n, segs_m, **fnc_kwargs)
-                    else:
-                        label_pairs[entry] = fnc_metric(segs_n, segs_m,
-                                                        **fnc_kwargs)
+                    label_pairs[entry] = __compare__(entry, label, segs_n,
+                                                     segs_m)
             # Add all
             for entry, pair in label_pairs.items():
                 pairs[entry] = pair
@@ -95,11 +182,32 @@ def compute_pairwise_values(fnc_metric, dataset_a, dataset_b=None, **kwargs):
             label_pairs = dict()
     # Parse
     has_two_datasets = dataset_b is not None
+    if progress is not None:
+        progress.start(__count_pairs__(dataset_a, dataset_b, permuted),
+                       restored)
     __per_group__(tuple(), dataset_a, dataset_b, has_two_datasets)
+    results.clear()
+    if checkpoint is not None:
+        checkpoint.commit()
     # Return mean, std dev, and variance
     return pairs
 
 
+def __count_pairs__(dataset_a, dataset_b, permuted):
+    '''
+    Count the pairs that :func:`compute_pairwise_values` compares.
+    '''
+    count = 0
+    for label, codings_m in dataset_a.items():
+        if dataset_b is not None:
+            if label in dataset_b:
+                count += len(codings_m) * len(dataset_b[label])
+        else:
+            combinations_m = len(codings_m) * (len(codings_m) - 1) // 2
+            count += 2 * combinations_m if permuted else combinations_m
+    return count
+
+
 def summarize(pairs):
     '''
     Takes a list of values and returns the mean, standard deviation, variance, standard error, and number of values.
@@ -0,0 +1,81 @@
+'''
+Tests abstract computation utilities.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import unittest
+from segeval.data import Dataset
+from segeval.compute import compute_pairwise_values
+
+
+class TestComputePairwiseValues(unittest.TestCase):
+
+    '''
+    Test pairwise computation.
+    '''
+
+    dataset = Dataset({'item1': {'a': (2, 3), 'b': (2, 3), 'c': (2, 3),
+                                 'd': (5,)},
+                       'item2': {'a': (2, 3), 'b': (5,)}})
+
+    def test_identical_pairs(self):
+        '''
+        Test that identical pairs (of any item) are compared only once.
+        '''
+        calls = list()
+
+        def fnc_metric(segs_m, segs_n):
+            calls.append((segs_m, segs_n))
+            return len(segs_m) - len(segs_n)
+
+        pairs = compute_pairwise_values(fnc_metric, self.dataset,
+                                        permuted=True)
+        self.assertEqual(14, len(pairs))
+        self.assertEqual(-1, pairs['item1,d,a'])
+        self.assertEqual(1, pairs['item2,a,b'])
+        self.assertEqual(sorted([((2, 3), (2, 3)), ((2, 3), (5,)),
+                                 ((5,), (2, 3))]),
+                         sorted(calls))
+
+    def test_reused_results_are_copies(self):
+        '''
+        Test that mutable results are not shared between pairs.
+        '''
+        def fnc_metric(segs_m, segs_n):
+            return [segs_m, segs_n]
+
+        pairs = compute_pairwise_values(fnc_metric, self.dataset,
+                                        permuted=False)
+        values = [value for entry, value in pairs.items()
+                  if entry.startswith('item1') and 'd' not in entry]
+        self.assertEqual(3, len(values))
+        values[0].append(None)
+        self.assertEqual(2, len(values[1]))
+
+    def test_unhashable(self):
+        '''
+        Test that unhashable segmentations are still compared.
+        '''
+        dataset = Dataset({'item1': {'a': [2, 3], 'b': [2, 3]}})
+        pairs = compute_pairwise_values(lambda m, n: m == n, dataset,
+                                        permuted=False)
+        self.assertEqual([True], list(pairs.values()))
+
+    def test_same_segmentation(self):
+        '''
+        Test that a pair of the same (unhashable) segmentation object is
+        recognised by identity.
+        '''
+        calls = list()
+        segmentation = [2, 3]
+        dataset = Dataset({'item1': {'a': segmentation, 'b': segmentation},
+                           'item2': {'a': segmentation, 'b': segmentation}})
+
+        def fnc_metric(segs_m, segs_n):
+            calls.append((segs_m, segs_n))
+            return 1
+
+        pairs = compute_pairwise_values(fnc_metric, dataset, permuted=True)
+        self.assertEqual(4, len(pairs))
+        self.assertEqual(1, len(calls))
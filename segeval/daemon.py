@@ -0,0 +1,308 @@
+'''
+A long-running evaluation process that reads JSON-lines requests from stdin
+or a Unix socket and writes a JSON-lines response to each, so that callers
+outside of Python pay for interpreter start-up and imports once.  Each
+request names a metric, its options, and either one pair of segmentations::
+
+    {"id": 1, "metric": "B", "options": {"n_t": 2},
+     "hypothesis": [2, 3, 6], "reference": [5, 6]}
+
+or a list of them (``"pairs": [[hypothesis, reference], ...]``), and is
+answered with either its ``value`` (or ``values``) or an ``error``::
+
+    {"id": 1, "value": 0.5}
+
+Metrics are compiled once per set of options (see
+:func:`segeval.metric.make_metric`) and kept between requests, as are the
+boundary edits of pairs compared by each serving thread (or worker), up to
+:data:`EDIT_MEMO_BYTES` each (see
+:func:`segeval.similarity.distance.multipleboundary.memoize_edits`).
+Requests may be pipelined; with worker processes, responses are written as
+they complete (which may be out of order, hence ``id``), and each socket
+connection is served concurrently.
+
+Run with ``python -m segeval.daemon [--socket PATH] [--processes N]`` or the
+``segeval-daemon`` command.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+try:
+    import socketserver
+except ImportError:
+    # Python 2
+    import SocketServer as socketserver
+from segeval.data.results import __json_value__
+from segeval.format import BoundaryFormat
+from segeval.metric import make_metric
+from segeval.similarity.distance.multipleboundary import (
+    DEFAULT_EDIT_MEMO_BYTES, edit_memo, memoize_edits)
+from segeval.util.cache import LruMemo, __canonical__
+
+
+COMPILED_METRICS = LruMemo(max_size=256)
+'''
+Metrics compiled by this process, keyed by name and options.
+'''
+
+DEFAULT_MAX_PENDING = 1024
+
+EDIT_MEMO_BYTES = DEFAULT_EDIT_MEMO_BYTES
+'''
+Approximate bytes of boundary edits kept by each serving thread (or worker).
+'''
+
+# Memo of boundary edits kept by each thread
+__thread_edits__ = threading.local()
+
+
+def __segmentation__(segmentation, boundary_format):
+    '''
+    Convert a segmentation decoded from JSON into the hashable form that the
+    metrics expect.
+    '''
+    if boundary_format == BoundaryFormat.nltk:
+        return segmentation
+    if boundary_format == BoundaryFormat.sets:
+        return tuple(frozenset(position) for position in segmentation)
+    return tuple(segmentation)
+
+
+def compiled_metric(name, options):
+    '''
+    Return a compiled metric, compiling it if it has not been used (recently)
+    by this process.
+    '''
+    key = (name, __canonical__(options))
+    found, metric = COMPILED_METRICS.get(key)
+    if not found:
+        metric = make_metric(name, **options)
+        COMPILED_METRICS.set(key, metric)
+    return metric
+
+
+def thread_edit_memo():
+    '''
+    Return the memo of boundary edits kept between the requests that this
+    thread handles, creating it if necessary.
+    '''
+    memo = getattr(__thread_edits__, 'memo', None)
+    if memo is None:
+        memo = __thread_edits__.memo = edit_memo(EDIT_MEMO_BYTES)
+    return memo
+
+
+def handle_request(request):
+    '''
+    Compute the response to a decoded request.  Errors are returned as
+    responses rather than raised, so that one bad request does not stop the
+    daemon.
+    '''
+    request_id = request.get('id') if hasattr(request, 'get') else None
+    response = {'id': request_id}
+    try:
+        options = dict(request.get('options') or dict())
+        metric = compiled_metric(request['metric'], options)
+        boundary_format = metric.options['boundary_format']
+        with memoize_edits(memo=thread_edit_memo()):
+            if 'pairs' in request:
+                response['values'] = [__json_value__(metric(
+                    __segmentation__(hypothesis, boundary_format),
+                    __segmentation__(reference, boundary_format)))
+                    for hypothesis, reference in request['pairs']]
+            else:
+                response['value'] = __json_value__(metric(
+                    __segmentation__(request['hypothesis'], boundary_format),
+                    __segmentation__(request['reference'], boundary_format)))
+    except Exception as exception:
+        response['error'] = '{0}: {1}'.format(type(exception).__name__,
+                                              exception)
+    return response
+
+
+def __error_response__(line, exception):
+    '''
+    Respond to a request line with an error, identifying the request if the
+    line can be decoded.
+    '''
+    try:
+        request = json.loads(line)
+    except ValueError:
+        request = None
+    request_id = request.get('id') if hasattr(request, 'get') else None
+    return {'id': request_id,
+            'error': '{0}: {1}'.format(type(exception).__name__, exception)}
+
+
+def __handle_line__(line):
+    try:
+        request = json.loads(line)
+    except ValueError as exception:
+        return {'id': None, 'error': 'ValueError: {0}'.format(exception)}
+    return handle_request(request)
+
+
+class Daemon(object):
+
+    '''
+    Serves requests read from streams, either within this process or using a
+    pool of ``processes`` workers.  At most ``max_pending`` requests are
+    queued for workers at once.
+    '''
+
+    def __init__(self, processes=0, max_pending=DEFAULT_MAX_PENDING):
+        self.processes = processes
+        self.max_pending = max_pending
+        self.pool = None
+        self.server = None
+        if processes > 0:
+            self.pool = multiprocessing.Pool(processes)
+
+    def serve(self, input_stream, output_stream):
+        '''
+        Respond to each request line of ``input_stream`` until it ends.
+        '''
+        lock = threading.Lock()
+
+        def __write__(response):
+            with lock:
+                output_stream.write(json.dumps(response, sort_keys=True) +
+                                    '\n')
+                output_stream.flush()
+
+        if self.pool is None:
+            for line in iter(input_stream.readline, ''):
+                if line.strip():
+                    __write__(__handle_line__(line))
+            return
+        pending = threading.BoundedSemaphore(self.max_pending)
+        results = list()
+
+        def __complete__(response):
+            __write__(response)
+            pending.release()
+
+        def __failed__(line):
+            # A worker failed outside of handle_request (e.g., it died, or its
+            # response could not be pickled), so answer the request here
+            def __fail__(exception):
+                __complete__(__error_response__(line, exception))
+            return __fail__
+
+        for line in iter(input_stream.readline, ''):
+            if line.strip():
+                pending.acquire()
+                results.append(self.pool.apply_async(
+                    __handle_line__, (line,), callback=__complete__,
+                    error_callback=__failed__(line)))
+                # Forget requests that have been answered
+                results = [result for result in results if not result.ready()]
+        for result in results:
+            result.wait()
+
+    def serve_unix(self, path):
+        '''
+        Serve each connection to a Unix socket at ``path`` concurrently
+        until interrupted (or :meth:`shutdown`).
+        '''
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                daemon.serve(__TextStream__(self.rfile),
+                             __TextStream__(self.wfile))
+
+        if os.path.exists(path):
+            os.unlink(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        self.server = server
+        try:
+            server.serve_forever()
+        finally:
+            self.server = None
+            server.server_close()
+            os.unlink(path)
+
+    def shutdown(self):
+        '''
+        Stop serving a Unix socket (from another thread).
+        '''
+        if self.server is not None:
+            self.server.shutdown()
+
+    def close(self):
+        '''
+        Stop any worker processes.
+        '''
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class __TextStream__(object):
+
+    '''
+    Adapts a binary socket file to the text ``readline`` and ``write`` used by
+    :meth:`Daemon.serve`.
+    '''
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readline(self):
+        return self.stream.readline().decode('utf-8')
+
+    def write(self, text):
+        self.stream.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.stream.flush()
+
+
+def main(argv=None):
+    '''
+    Serve requests from stdin (or a Unix socket) until it is closed (or the
+    daemon is interrupted).
+    '''
+    parser = argparse.ArgumentParser(
+        prog='segeval-daemon',
+        description='Evaluate JSON-lines requests read from stdin or a Unix '
+        'socket.')
+    parser.add_argument('--socket', default=None,
+                        help='Unix socket path to listen upon instead of '
+                        'stdin')
+    parser.add_argument('--processes', type=int, default=0,
+                        help='worker processes (default 0, evaluating '
+                        'requests in order within the daemon)')
+    parser.add_argument('--max-pending', type=int,
+                        default=DEFAULT_MAX_PENDING,
+                        help='requests queued for workers at once')
+    args = parser.parse_args(argv)
+    with Daemon(args.processes, args.max_pending) as daemon:
+        try:
+            if args.socket is not None:
+                daemon.serve_unix(args.socket)
+            else:
+                daemon.serve(sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
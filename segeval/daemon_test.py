@@ -0,0 +1,151 @@
+'''
+Tests the evaluation daemon.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from io import StringIO
+from segeval.util.test import TestCase
+from segeval import daemon as daemon_module
+from segeval.daemon import (Daemon, handle_request, thread_edit_memo,
+                            COMPILED_METRICS)
+
+
+REQUESTS = [
+    {'id': 1, 'metric': 'B', 'hypothesis': [2, 3, 6], 'reference': [5, 6]},
+    {'id': 2, 'metric': 'WD', 'options': {'window_size': 2},
+     'pairs': [[[2, 3, 6], [5, 6]], [[1, 10], [5, 6]]]},
+    {'id': 3, 'metric': 'B', 'options': {'boundary_format': 'sets'},
+     'hypothesis': [[1], [], [2]], 'reference': [[1], [2], []]},
+    {'id': 4, 'metric': 'B', 'hypothesis': [2, 3], 'reference': [5, 6]},
+]
+
+
+def __fail__(line):
+    raise RuntimeError('worker failed')
+
+
+def __input__(requests):
+    return StringIO(u''.join(json.dumps(request) + u'\n'
+                             for request in requests) + u'not json\n')
+
+
+class TestDaemon(TestCase):
+
+    '''
+    Test the evaluation daemon.
+    '''
+
+    def __check__(self, lines):
+        responses = [json.loads(line) for line in lines]
+        self.assertEqual(5, len(responses))
+        responses = dict((response['id'], response)
+                         for response in responses)
+        self.assertAlmostEquals(0.5, responses[1]['value'])
+        self.assertEqual(2, len(responses[2]['values']))
+        self.assertAlmostEquals(0.75, responses[3]['value'])
+        self.assertTrue('differ in length' in responses[4]['error'])
+        self.assertTrue(responses[None]['error'].startswith('ValueError'))
+
+    def test_handle_request(self):
+        '''
+        Test that compiled metrics are reused between requests.
+        '''
+        COMPILED_METRICS.clear()
+        handle_request(REQUESTS[0])
+        handle_request(REQUESTS[0])
+        self.assertEqual(1, COMPILED_METRICS.hits)
+        self.assertEqual('SegmentationMetricError', handle_request(
+            {'id': 5, 'metric': 'X'})['error'].split(':')[0])
+
+    def test_edit_memo(self):
+        '''
+        Test that boundary edits are reused between requests.
+        '''
+        memo = thread_edit_memo()
+        memo.clear()
+        handle_request(REQUESTS[0])
+        handle_request(dict(REQUESTS[0], metric='S'))
+        self.assertEqual((1, 1), (memo.misses, memo.hits))
+        self.assertTrue(thread_edit_memo() is memo)
+
+    def test_serve(self):
+        '''
+        Test serving requests in order within this process.
+        '''
+        output = StringIO()
+        with Daemon() as daemon:
+            daemon.serve(__input__(REQUESTS), output)
+        lines = output.getvalue().splitlines()
+        self.__check__(lines)
+        self.assertEqual([1, 2, 3, 4, None],
+                         [json.loads(line)['id'] for line in lines])
+
+    def test_serve_processes(self):
+        '''
+        Test serving pipelined requests using worker processes.
+        '''
+        output = StringIO()
+        with Daemon(processes=2) as daemon:
+            daemon.serve(__input__(REQUESTS), output)
+        self.__check__(output.getvalue().splitlines())
+
+    def test_serve_worker_error(self):
+        '''
+        Test that requests whose workers fail are answered with errors and no
+        longer count as pending.
+        '''
+        output = StringIO()
+        handle_line = daemon_module.__handle_line__
+        # Workers are forked with (and look up) the replaced handler
+        daemon_module.__handle_line__ = __fail__
+        try:
+            with Daemon(processes=1, max_pending=1) as daemon:
+                daemon.serve(__input__(REQUESTS), output)
+        finally:
+            daemon_module.__handle_line__ = handle_line
+        responses = [json.loads(line)
+                     for line in output.getvalue().splitlines()]
+        self.assertEqual([1, 2, 3, 4, None],
+                         [response['id'] for response in responses])
+        for response in responses:
+            self.assertEqual('RuntimeError: worker failed', response['error'])
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), 'requires Unix sockets')
+    def test_serve_unix(self):
+        '''
+        Test serving requests over a Unix socket.
+        '''
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'segeval.sock')
+        daemon = Daemon()
+        thread = threading.Thread(target=daemon.serve_unix, args=(path,))
+        thread.daemon = True
+        thread.start()
+        try:
+            for _ in range(0, 100):
+                if os.path.exists(path):
+                    break
+                time.sleep(0.01)
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            stream = client.makefile('rwb')
+            stream.write(__input__(REQUESTS).getvalue().encode('utf-8'))
+            stream.flush()
+            lines = [stream.readline().decode('utf-8') for _ in range(0, 5)]
+            stream.close()
+            client.close()
+            self.__check__(lines)
+        finally:
+            daemon.shutdown()
+            thread.join()
+            self.assertFalse(os.path.exists(path))
+            shutil.rmtree(directory)
@@ -6,12 +6,16 @@ files.
 '''
 from __future__ import absolute_import
 import os
+import sys
 import copy
 from collections import defaultdict
 from segeval.data.tsv import input_linear_mass_tsv
 from segeval.data.jsonutils import input_linear_mass_json
 from segeval.format import BoundaryFormat
 
+# Universal newlines are the default (and 'U' is invalid) in Python 3
+READ_MODE = 'rU' if sys.version_info[0] < 3 else 'r'
+
 FILETYPE_TSV = 'tsv'
 FILETYPE_JSON = 'json'
 
@@ -38,9 +42,11 @@ class Dataset(defaultdict):
         defaultdict.__init__(self, dict)
         self.properties = dict()
         self.boundary_format = boundary_format
+        self.__interned__ = dict()
         # Masses
         if item_coder_data is not None and item_coder_data is not dict:
             defaultdict.update(self, item_coder_data)
+            self.intern_all()
         # Properties
         if properties is not None:
             self.properties.update(properties)
@@ -73,7 +79,7 @@ class Dataset(defaultdict):
             for coder, item_masses in codings.items():
                 self.coders.add(coder)
                 if coder not in self[item]:
-                    self[item][coder] = item_masses
+                    self[item][coder] = self.intern(item_masses)
                 else:
                     raise DataIOError('Duplicate coders of same name \
 %(coder)s found for item %(item)s' % {'coder': coder, 'item': item})
@@ -96,11 +102,44 @@ class Dataset(defaultdict):
         dataset.properties = copy.deepcopy(self.properties)
         dataset.boundary_types = copy.deepcopy(self.boundary_types)
         dataset.boundary_format = copy.deepcopy(self.boundary_format)
+        dataset.__interned__ = copy.deepcopy(self.__interned__)
         return dataset
 
+    def intern(self, segmentation):
+        '''
+        Return a single shared object for all segmentations identical to the
+        one given, so that identical codings are stored once and can be
+        recognised by identity.  Unhashable segmentations are returned as-is.
+        '''
+        try:
+            return self.__interned__.setdefault(segmentation, segmentation)
+        except TypeError:
+            return segmentation
+
+    def intern_all(self):
+        '''
+        Intern every coding stored in the dataset; see :meth:`intern`.
+        '''
+        for codings in self.values():
+            for coder, segmentation in codings.items():
+                codings[coder] = self.intern(segmentation)
+
+    def identical_codings(self):
+        '''
+        Groups of ``(item, coder)`` pairs whose codings are the same interned
+        segmentation.
+        '''
+        groups = dict()
+        for item, codings in self.items():
+            for coder, segmentation in codings.items():
+                groups.setdefault(id(segmentation), list()).append(
+                    (item, coder))
+        return [group for group in groups.values() if len(group) > 1]
+
 
 def get_coders(container):
-    if isinstance(container, Dataset):
+    from segeval.data.sqlite import SqliteDataset
+    if isinstance(container, (Dataset, SqliteDataset)):
         return container.coders
     else:
         coders = set()
@@ -132,7 +171,10 @@ class DataIOError(Exception):
         :param message: Explanation for the exception.
         :type message: str
         '''
-        Exception.__init__(self, message, exception)
+        if exception is None:
+            Exception.__init__(self, message)
+        else:
+            Exception.__init__(self, message, exception)
 
 
 def load_nested_folders_dict(containing_dir, filetype, dataset=None,
@@ -55,11 +55,11 @@ def input_linear_mass_json(filepath):
     :param filepath: Path to the mass file containing segment position codings.
     :type filepath: :func:`str`
     '''
-    from segeval.data import Dataset, DataIOError
+    from segeval.data import Dataset, DataIOError, READ_MODE
     dataset = Dataset()
     data = dict()
     # Open file
-    json_file = open(filepath, 'rU')
+    json_file = open(filepath, READ_MODE)
     # Read in file
     try:
         data = json.load(json_file)
@@ -83,7 +83,8 @@ def input_linear_mass_json(filepath):
         for item, coder_masses in data.items():
             dataset[item] = dict()
             for coder, masses in coder_masses.items():
-                dataset[item][coder] = tuple(masses)
+                dataset[item][coder] = dataset.intern(tuple(masses))
+                dataset.coders.add(coder)
         # Remove from properties
         del dataset.properties[Field.items]
     else:
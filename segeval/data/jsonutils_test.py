@@ -7,6 +7,8 @@ from __future__ import absolute_import
 import unittest
 import os
 import re
+import shutil
+import tempfile
 from segeval.data import DataIOError
 from segeval.data.jsonutils import (
     output_linear_mass_json, input_linear_mass_json,
@@ -22,6 +24,23 @@ class TestJsonUtils(unittest.TestCase):
 
     test_data_dir = os.path.split(__file__)[0]
 
+    def test_input_crlf(self):
+        '''
+        Test JSON file input with Windows line endings.
+        '''
+        directory = tempfile.mkdtemp()
+        try:
+            json_file = os.path.join(directory, 'hearst1997.json')
+            with open(os.path.join(self.test_data_dir, 'hearst1997.json')) \
+                    as original:
+                lines = original.read().splitlines()
+            with open(json_file, 'wb') as crlf:
+                crlf.write('\r\n'.join(lines).encode('utf-8'))
+            self.assertEqual(HEARST_1997_STARGAZER,
+                             input_linear_mass_json(json_file))
+        finally:
+            shutil.rmtree(directory)
+
     def test_output_linear_mass_json(self):
         '''
         Test ``Dataset.add()``.
@@ -0,0 +1,167 @@
+'''
+Writers that stream metric results (see :class:`segeval.parallel.Row`) to
+TSV, JSON lines, or SQLite files as they are computed.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import json
+import os
+import sqlite3
+import sys
+
+
+RESULT_FORMAT_TSV = 'tsv'
+RESULT_FORMAT_JSONL = 'jsonl'
+RESULT_FORMAT_SQLITE = 'sqlite'
+
+RESULT_FORMATS = {RESULT_FORMAT_TSV: ['.tsv', '.csv'],
+                  RESULT_FORMAT_JSONL: ['.jsonl'],
+                  RESULT_FORMAT_SQLITE: ['.sqlite', '.sqlite3', '.db']}
+
+RESULT_FIELDS = ('item', 'hypothesis_coder', 'reference_coder', 'metric',
+                 'value')
+
+
+class ResultWriter(object):
+
+    '''
+    Base class of result writers, which write to a stream (``-`` being
+    ``sys.stdout``) and may be used as context managers.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        if path == '-':
+            self.stream = sys.stdout
+        else:
+            self.stream = open(path, 'w')
+        self.rows = 0
+
+    def write(self, row):
+        '''
+        Write one result.
+        '''
+        raise NotImplementedError()
+
+    def close(self):
+        '''
+        Flush and close the output (other than ``sys.stdout``).
+        '''
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class TsvResultWriter(ResultWriter):
+
+    '''
+    Writes results as tab-separated values under a header row.
+    '''
+
+    def __init__(self, path):
+        ResultWriter.__init__(self, path)
+        self.stream.write('\t'.join(RESULT_FIELDS) + '\n')
+
+    def write(self, row):
+        self.stream.write('\t'.join(str(value) for value in row) + '\n')
+        self.rows += 1
+
+
+class JsonLinesResultWriter(ResultWriter):
+
+    '''
+    Writes results as one JSON object per line.  Values that are not numbers
+    (e.g., tuples of parts) are written as lists or strings.
+    '''
+
+    def write(self, row):
+        record = dict(zip(RESULT_FIELDS, row))
+        record['value'] = __json_value__(record['value'])
+        self.stream.write(json.dumps(record, sort_keys=True) + '\n')
+        self.rows += 1
+
+
+def __json_value__(value):
+    if isinstance(value, (tuple, list)):
+        return [__json_value__(part) for part in value]
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+class SqliteResultWriter(object):
+
+    '''
+    Writes results to a ``results`` table of an SQLite database, committing
+    every ``commit_every`` rows.  Values are stored as text so that decimal
+    values are not rounded.
+    '''
+
+    def __init__(self, path, commit_every=1000):
+        self.path = path
+        self.commit_every = commit_every
+        self.rows = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (item TEXT, '
+            'hypothesis_coder TEXT, reference_coder TEXT, metric TEXT, '
+            'value TEXT)')
+
+    def write(self, row):
+        '''
+        Write one result.
+        '''
+        self.connection.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?)',
+                                [str(value) for value in row])
+        self.rows += 1
+        if self.rows % self.commit_every == 0:
+            self.connection.commit()
+
+    def close(self):
+        '''
+        Commit and close the database.
+        '''
+        self.connection.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+RESULT_WRITERS = {RESULT_FORMAT_TSV: TsvResultWriter,
+                  RESULT_FORMAT_JSONL: JsonLinesResultWriter,
+                  RESULT_FORMAT_SQLITE: SqliteResultWriter}
+
+
+def open_result_writer(path, result_format=None):
+    '''
+    Open a writer of results to ``path`` (``-`` for ``sys.stdout``) in the
+    format given or, if ``None``, the format implied by the path's extension
+    (TSV by default).
+    '''
+    from segeval.data import DataIOError
+    if result_format is None:
+        result_format = RESULT_FORMAT_TSV
+        ext = os.path.splitext(path)[1].lower()
+        for candidate, extensions in RESULT_FORMATS.items():
+            if ext in extensions:
+                result_format = candidate
+    if result_format not in RESULT_WRITERS:
+        raise DataIOError('Unsupported result format: {0}'.format(
+            result_format))
+    if result_format == RESULT_FORMAT_SQLITE and path == '-':
+        raise DataIOError('SQLite results cannot be written to stdout')
+    return RESULT_WRITERS[result_format](path)
@@ -0,0 +1,220 @@
+'''
+Datasets published into :mod:`multiprocessing.shared_memory` (Python 3.8+),
+so that worker processes can attach to one copy of a dataset instead of each
+unpickling their own.  Segmentations are stored as one flat array of 64-bit
+integers (with an array of offsets into it), and each segmentation of an
+attached dataset is a read-only :class:`memoryview` of that array, e.g.::
+
+    with publish_dataset(dataset) as shared:
+        # Within a worker started by this process
+        attached = attach_dataset(shared.name)
+        boundary_similarity(attached['ch1']['an1'], attached['ch1']['an2'])
+        attached.close()
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import array
+import json
+import struct
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+from segeval.data import DataIOError
+from segeval.format import BoundaryFormat
+
+
+SUPPORTED_FORMATS = (BoundaryFormat.mass, BoundaryFormat.position)
+
+HEADER = struct.Struct('<Q')
+'''
+Length of the JSON metadata that begins each block.
+'''
+
+VALUE_SIZE = 8
+
+
+def __align__(offset):
+    return offset + (-offset % VALUE_SIZE)
+
+
+class SharedDataset(object):
+
+    '''
+    A read-only :class:`segeval.data.Dataset`-compatible mapping of items to
+    coder segmentations stored in a shared memory block; see
+    :func:`publish_dataset` and :func:`attach_dataset`.
+
+    Segmentations are views of the block, and so must not be used after
+    :meth:`close` is called.
+    '''
+
+    def __init__(self, block, owner=False):
+        self.block = block
+        self.owner = owner
+        buf = memoryview(block.buf)
+        length = HEADER.unpack_from(buf, 0)[0]
+        metadata = json.loads(bytes(buf[HEADER.size:HEADER.size + length])
+                              .decode('utf-8'))
+        self.properties = metadata['properties']
+        self.boundary_types = set(metadata['boundary_types'])
+        self.boundary_format = metadata['boundary_format']
+        count = metadata['count']
+        start = __align__(HEADER.size + length)
+        offsets = buf[start:start + (count + 1) * VALUE_SIZE].cast('q')
+        start += (count + 1) * VALUE_SIZE
+        values = buf[start:start + offsets[count] * VALUE_SIZE].cast('q')
+        # Views of the block, which must be released before it is closed
+        self.__views__ = [buf, offsets, values]
+        self.__codings__ = dict()
+        self.coders = set()
+        index = 0
+        for item, coders in metadata['items']:
+            codings = dict()
+            for coder in coders:
+                view = values[offsets[index]:offsets[index + 1]].toreadonly()
+                self.__views__.append(view)
+                codings[coder] = view
+                self.coders.add(coder)
+                index += 1
+            self.__codings__[item] = codings
+
+    @property
+    def name(self):
+        '''
+        Name of the shared memory block, to give to :func:`attach_dataset`.
+        '''
+        return self.block.name
+
+    def close(self):
+        '''
+        Release this process's views of the dataset, and, if it published the
+        dataset, free the block.
+        '''
+        if self.block is None:
+            return
+        self.__codings__ = dict()
+        for view in reversed(self.__views__):
+            view.release()
+        self.__views__ = list()
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+        self.block = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, item):
+        '''
+        Return a ``dict`` of coder segmentations for an item.
+        '''
+        return self.__codings__[item]
+
+    def __contains__(self, item):
+        return item in self.__codings__
+
+    def __len__(self):
+        return len(self.__codings__)
+
+    def __iter__(self):
+        return iter(self.__codings__)
+
+    def keys(self):
+        '''
+        List of item labels in the order that they were published.
+        '''
+        return list(self.__codings__)
+
+    def items(self):
+        '''
+        Iterate over ``(item, codings)`` pairs.
+        '''
+        return iter(self.__codings__.items())
+
+    def values(self):
+        '''
+        Iterate over the codings of each item.
+        '''
+        return iter(self.__codings__.values())
+
+
+def __require_shared_memory__():
+    if shared_memory is None:
+        raise DataIOError('Shared datasets require '
+                          'multiprocessing.shared_memory (Python 3.8+)')
+
+
+def publish_dataset(dataset, name=None):
+    '''
+    Copy a dataset into a new shared memory block, returning it as a
+    :class:`SharedDataset` that frees the block when closed.
+
+    :param dataset: Dataset of mass or position segmentations.
+    :param name: Name of the block to create (default is generated).
+    :type dataset: :class:`segeval.data.Dataset`
+    :type name: str
+    '''
+    __require_shared_memory__()
+    boundary_format = getattr(dataset, 'boundary_format', BoundaryFormat.mass)
+    if boundary_format not in SUPPORTED_FORMATS:
+        raise DataIOError('Unsupported boundary format for shared datasets; '
+                          'expected one of {0}, obtained {1}'
+                          .format(SUPPORTED_FORMATS, boundary_format))
+    items = list()
+    offsets = array.array('q', [0])
+    values = array.array('q')
+    for item, codings in dataset.items():
+        coders = list(codings.keys())
+        items.append([item, coders])
+        for coder in coders:
+            values.extend(codings[coder])
+            offsets.append(len(values))
+    metadata = json.dumps({
+        'properties': getattr(dataset, 'properties', dict()),
+        'boundary_types': sorted(getattr(dataset, 'boundary_types', [1])),
+        'boundary_format': boundary_format,
+        'count': len(offsets) - 1,
+        'items': items}).encode('utf-8')
+    start = __align__(HEADER.size + len(metadata))
+    size = start + (len(offsets) + len(values)) * VALUE_SIZE
+    block = shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        HEADER.pack_into(block.buf, 0, len(metadata))
+        block.buf[HEADER.size:HEADER.size + len(metadata)] = metadata
+        for content in (offsets, values):
+            data = content.tobytes()
+            block.buf[start:start + len(data)] = data
+            start += len(data)
+        return SharedDataset(block, owner=True)
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+
+
+def attach_dataset(name):
+    '''
+    Attach to a dataset published by :func:`publish_dataset` (within this or
+    another process) without copying its segmentations.  Closing the
+    returned :class:`SharedDataset` detaches from, but does not free, the
+    block.
+
+    The block is freed when its publisher closes it, so attach from
+    processes (e.g., workers) that the publisher outlives.
+
+    :param name: Name of the block (see :attr:`SharedDataset.name`).
+    :type name: str
+    '''
+    __require_shared_memory__()
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except (OSError, ValueError) as error:
+        raise DataIOError('Unable to attach to shared dataset {0}: {1}'
+                          .format(name, error))
+    return SharedDataset(block)
@@ -0,0 +1,68 @@
+'''
+Tests datasets published into shared memory.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import unittest
+from segeval.data import DataIOError, Dataset, get_coders
+from segeval.data.shared import attach_dataset, publish_dataset, shared_memory
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.format import BoundaryFormat
+from segeval.similarity.boundary import boundary_similarity
+from segeval.agreement.kappa import fleiss_kappa_linear
+
+
+@unittest.skipIf(shared_memory is None, 'shared_memory is unavailable')
+class TestSharedDataset(unittest.TestCase):
+
+    '''
+    Test datasets published into shared memory.
+    '''
+
+    def test_attach(self):
+        '''
+        Test that an attached dataset views the published segmentations.
+        '''
+        with publish_dataset(KAZANTSEVA2012_G5) as published:
+            with attach_dataset(published.name) as dataset:
+                self.assertEqual(set(KAZANTSEVA2012_G5.keys()),
+                                 set(dataset.keys()))
+                self.assertEqual(get_coders(KAZANTSEVA2012_G5),
+                                 get_coders(dataset))
+                self.assertEqual(KAZANTSEVA2012_G5.boundary_format,
+                                 dataset.boundary_format)
+                for item, codings in KAZANTSEVA2012_G5.items():
+                    for coder, masses in codings.items():
+                        self.assertEqual(masses,
+                                         tuple(dataset[item][coder]))
+                self.assertTrue(dataset['ch1']['an1'].readonly)
+
+    def test_metrics(self):
+        '''
+        Test that metrics of an attached dataset are unchanged.
+        '''
+        with publish_dataset(KAZANTSEVA2012_G5) as published:
+            with attach_dataset(published.name) as dataset:
+                self.assertEqual(boundary_similarity(KAZANTSEVA2012_G5),
+                                 boundary_similarity(dataset))
+                self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5),
+                                 fleiss_kappa_linear(dataset))
+
+    def test_close(self):
+        '''
+        Test that a closed (published) dataset can no longer be attached to.
+        '''
+        published = publish_dataset(KAZANTSEVA2012_G5)
+        name = published.name
+        published.close()
+        published.close()
+        self.assertRaises(DataIOError, attach_dataset, name)
+
+    def test_unsupported_format(self):
+        '''
+        Test that only mass and position segmentations are shared.
+        '''
+        dataset = Dataset({'item': {'a': (frozenset([1]),)}},
+                          boundary_format=BoundaryFormat.sets)
+        self.assertRaises(DataIOError, publish_dataset, dataset)
@@ -0,0 +1,235 @@
+'''
+SQLite-backed dataset storage for corpora that are too large to be held in
+memory as a :class:`segeval.data.Dataset`.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import json
+import sqlite3
+import struct
+from segeval.data import DataIOError
+from segeval.format import BoundaryFormat
+
+
+SUPPORTED_FORMATS = (BoundaryFormat.mass, BoundaryFormat.position)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS segmentations ('
+    'item TEXT NOT NULL, coder TEXT NOT NULL, masses BLOB NOT NULL, '
+    'PRIMARY KEY (item, coder))',
+    'CREATE INDEX IF NOT EXISTS segmentations_coder ON segmentations (coder)',
+    'CREATE TABLE IF NOT EXISTS metadata ('
+    'key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+
+def pack_masses(masses):
+    '''
+    Pack a sequence of segment masses (or position labels) into a
+    little-endian blob of 32-bit integers.
+
+    :param masses: Segmentation masses.
+    :type masses: tuple
+    '''
+    return struct.pack('<{0}i'.format(len(masses)), *masses)
+
+
+def unpack_masses(blob):
+    '''
+    Unpack a blob produced by :func:`pack_masses` into a tuple.
+
+    :param blob: Packed segmentation masses.
+    :type blob: bytes
+    '''
+    blob = bytes(blob)
+    return struct.unpack('<{0}i'.format(len(blob) // 4), blob)
+
+
+class SqliteDataset(object):
+
+    '''
+    A :class:`segeval.data.Dataset`-compatible mapping of items to coder
+    segmentations that is stored in an SQLite database.  Only the codings of
+    the item most recently accessed are held in memory, and items are iterated
+    in label order using the table's index.  The codings of an item are
+    ordered as they were stored (as they are by :class:`segeval.data.Dataset`),
+    so coders are paired in the same order.  Item and coder labels are stored
+    as text.  A dataset may be read from threads other than that which opened
+    it (e.g., by :mod:`segeval.aio` executors), but by one at a time.
+    '''
+
+    def __init__(self, path=':memory:', item_coder_data=None, properties=None,
+                 boundary_types=None, boundary_format=None):
+        '''
+        Open (or create) a dataset stored at ``path``.  Metadata stored in an
+        existing database is used unless overridden.
+        '''
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        metadata = self.__read_metadata__()
+        self.properties = dict(metadata.get('properties', {}))
+        if properties is not None:
+            self.properties.update(properties)
+        if boundary_types is not None:
+            self.boundary_types = set(boundary_types)
+        else:
+            self.boundary_types = set(metadata.get('boundary_types', [1]))
+        if boundary_format is None:
+            boundary_format = metadata.get('boundary_format',
+                                           BoundaryFormat.mass)
+        if boundary_format not in SUPPORTED_FORMATS:
+            raise DataIOError('Unsupported boundary format for SQLite \
+storage; expected one of {0}, obtained {1}'.format(SUPPORTED_FORMATS,
+                                                   boundary_format))
+        self.boundary_format = boundary_format
+        self.__last__ = None
+        # Masses
+        if item_coder_data is not None:
+            self.update(item_coder_data)
+
+    def __read_metadata__(self):
+        metadata = dict()
+        cursor = self.connection.execute('SELECT key, value FROM metadata')
+        for key, value in cursor:
+            metadata[key] = json.loads(value)
+        return metadata
+
+    def __write_metadata__(self):
+        metadata = {'properties': self.properties,
+                    'boundary_types': sorted(self.boundary_types),
+                    'boundary_format': self.boundary_format}
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)',
+            [(key, json.dumps(value)) for key, value in metadata.items()])
+
+    def add(self, item, coder, masses):
+        '''
+        Store the segmentation of an item by a coder.
+        '''
+        self.update({item: {coder: masses}})
+
+    def update(self, item_coder_data, prepend_item=None):
+        '''
+        Store all codings from a :class:`segeval.data.Dataset` (or any
+        ``dict`` of ``dict`` of segmentations).
+        '''
+        def __rows__():
+            for item, codings in item_coder_data.items():
+                if prepend_item is not None:
+                    item_parts = list(prepend_item)
+                    item_parts.append(item)
+                    item = ','.join(item_parts)
+                for coder, masses in codings.items():
+                    yield (str(item), str(coder),
+                           sqlite3.Binary(pack_masses(masses)))
+        self.__last__ = None
+        try:
+            self.connection.executemany(
+                'INSERT INTO segmentations (item, coder, masses) '
+                'VALUES (?, ?, ?)', __rows__())
+        except sqlite3.IntegrityError as exception:
+            raise DataIOError('Duplicate coders of same name found for the \
+same item', exception)
+        return self
+
+    def __iadd__(self, other, prepend_item=None):
+        '''
+        Add one dataset's data to this dataset.
+        '''
+        return self.update(other, prepend_item=prepend_item)
+
+    def commit(self):
+        '''
+        Persist all changes (and dataset metadata) to the database.
+        '''
+        self.__write_metadata__()
+        self.connection.commit()
+
+    def close(self):
+        '''
+        Commit all changes and close the database.
+        '''
+        self.commit()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def coders(self):
+        '''
+        Set of all coders found in the dataset.
+        '''
+        cursor = self.connection.execute(
+            'SELECT DISTINCT coder FROM segmentations')
+        return set(row[0] for row in cursor)
+
+    def __getitem__(self, item):
+        '''
+        Return a ``dict`` of coder segmentations for an item.
+        '''
+        item = str(item)
+        if self.__last__ is not None and self.__last__[0] == item:
+            return self.__last__[1]
+        # Rows are never deleted, so rowids increase in insertion order
+        cursor = self.connection.execute(
+            'SELECT coder, masses FROM segmentations WHERE item = ? '
+            'ORDER BY rowid', (item,))
+        codings = dict((coder, unpack_masses(masses))
+                       for coder, masses in cursor)
+        if len(codings) == 0:
+            raise KeyError(item)
+        self.__last__ = (item, codings)
+        return codings
+
+    def __contains__(self, item):
+        cursor = self.connection.execute(
+            'SELECT 1 FROM segmentations WHERE item = ? LIMIT 1', (str(item),))
+        return cursor.fetchone() is not None
+
+    def __len__(self):
+        cursor = self.connection.execute(
+            'SELECT COUNT(DISTINCT item) FROM segmentations')
+        return cursor.fetchone()[0]
+
+    def __iter__(self):
+        cursor = self.connection.execute(
+            'SELECT DISTINCT item FROM segmentations ORDER BY item')
+        for row in cursor:
+            yield row[0]
+
+    def keys(self):
+        '''
+        List of item labels in index order.
+        '''
+        return list(self)
+
+    def items(self):
+        '''
+        Iterate over ``(item, codings)`` pairs in index order, holding only
+        one item's codings in memory at a time.
+        '''
+        cursor = self.connection.execute(
+            'SELECT item, coder, masses FROM segmentations '
+            'ORDER BY item, rowid')
+        item, codings = None, None
+        for row_item, coder, masses in cursor:
+            if row_item != item:
+                if codings is not None:
+                    yield item, codings
+                item, codings = row_item, dict()
+            codings[coder] = unpack_masses(masses)
+        if codings is not None:
+            yield item, codings
+
+    def values(self):
+        '''
+        Iterate over the codings of each item in index order.
+        '''
+        for _, codings in self.items():
+            yield codings
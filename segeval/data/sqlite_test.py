@@ -0,0 +1,109 @@
+'''
+Tests the SQLite-backed dataset store.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+from segeval.data import DataIOError, get_coders
+from segeval.data.sqlite import SqliteDataset, pack_masses, unpack_masses
+from segeval.data.samples import (KAZANTSEVA2012_G5, HEARST_1997_STARGAZER,
+                                  HYPOTHESIS_STARGAZER)
+from segeval.format import BoundaryFormat
+from segeval.similarity.boundary import boundary_similarity
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.pi import fleiss_pi_linear
+
+
+class TestSqliteDataset(unittest.TestCase):
+
+    '''
+    Test the SQLite-backed dataset store.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dataset.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_pack_masses(self):
+        '''
+        Test that masses survive packing.
+        '''
+        self.assertEqual((11, 2, 100000),
+                         unpack_masses(pack_masses((11, 2, 100000))))
+
+    def test_mapping(self):
+        '''
+        Test that the store behaves like the dataset it was created from.
+        '''
+        dataset = SqliteDataset(item_coder_data=KAZANTSEVA2012_G5)
+        self.assertEqual(len(KAZANTSEVA2012_G5), len(dataset))
+        self.assertEqual(sorted(KAZANTSEVA2012_G5.keys()), dataset.keys())
+        self.assertEqual(KAZANTSEVA2012_G5.coders, dataset.coders)
+        self.assertEqual(KAZANTSEVA2012_G5.coders, get_coders(dataset))
+        self.assertTrue('ch1' in dataset)
+        self.assertFalse('ch2' in dataset)
+        self.assertRaises(KeyError, dataset.__getitem__, 'ch2')
+        for item, codings in dataset.items():
+            self.assertEqual(KAZANTSEVA2012_G5[item], codings)
+        self.assertEqual(len(KAZANTSEVA2012_G5), len(list(dataset.values())))
+
+    def test_duplicate_coder(self):
+        '''
+        Test that adding a second coding by the same coder fails.
+        '''
+        dataset = SqliteDataset()
+        dataset.add('item1', 'a', (2, 3))
+        self.assertRaises(DataIOError, dataset.add, 'item1', 'a', (5,))
+
+    def test_unsupported_format(self):
+        '''
+        Test that only integer segmentation formats can be stored.
+        '''
+        self.assertRaises(DataIOError, SqliteDataset,
+                          boundary_format=BoundaryFormat.sets)
+
+    def test_persistence(self):
+        '''
+        Test that codings and metadata are persisted.
+        '''
+        with SqliteDataset(self.path, boundary_types=[1, 2],
+                           properties={'source': 'test'}) as dataset:
+            dataset += KAZANTSEVA2012_G5
+        dataset = SqliteDataset(self.path)
+        self.assertEqual(set([1, 2]), dataset.boundary_types)
+        self.assertEqual('test', dataset.properties['source'])
+        self.assertEqual(KAZANTSEVA2012_G5['ch11'], dataset['ch11'])
+        dataset.close()
+
+    def test_boundary_similarity(self):
+        '''
+        Test that pairwise values match those of an in-memory dataset.
+        '''
+        dataset = SqliteDataset(item_coder_data=KAZANTSEVA2012_G5)
+        # Coders are paired in the order stored, so pair keys match
+        expected = boundary_similarity(KAZANTSEVA2012_G5)
+        actual = boundary_similarity(dataset)
+        self.assertEqual(sorted(expected.keys()), sorted(actual.keys()))
+        self.assertEqual(expected, actual)
+        hypothesis = SqliteDataset(item_coder_data=HYPOTHESIS_STARGAZER)
+        reference = SqliteDataset(item_coder_data=HEARST_1997_STARGAZER)
+        self.assertEqual(
+            boundary_similarity(HYPOTHESIS_STARGAZER, HEARST_1997_STARGAZER),
+            boundary_similarity(hypothesis, reference))
+
+    def test_agreement(self):
+        '''
+        Test that agreement matches that of an in-memory dataset.
+        '''
+        dataset = SqliteDataset(item_coder_data=KAZANTSEVA2012_G5)
+        self.assertAlmostEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5),
+                               fleiss_kappa_linear(dataset))
+        self.assertAlmostEqual(fleiss_pi_linear(KAZANTSEVA2012_G5),
+                               fleiss_pi_linear(dataset))
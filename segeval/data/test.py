@@ -98,6 +98,37 @@ class TestDataset(unittest.TestCase):
             exception = True
         self.assertTrue(exception, 'Did not throw DataIOError')
 
+    def test_intern(self):
+        '''
+        Test that identical codings share one segmentation object.
+        '''
+        dataset = Dataset({'item1': {'a': (2, 3), 'b': tuple([2, 3]),
+                                     'c': (5,)},
+                           'item2': {'a': (1, 4), 'b': tuple([5])}})
+        self.assertTrue(dataset['item1']['a'] is dataset['item1']['b'])
+        self.assertTrue(dataset['item1']['c'] is dataset['item2']['b'])
+        self.assertEqual(
+            sorted([sorted(group) for group in dataset.identical_codings()]),
+            [[('item1', 'a'), ('item1', 'b')],
+             [('item1', 'c'), ('item2', 'b')]])
+
+    def test_intern_add(self):
+        '''
+        Test that codings added from another dataset are interned.
+        '''
+        dataset = Dataset({'item1': {'a': (2, 3)}})
+        dataset += Dataset({'item1': {'b': tuple([2, 3])}})
+        self.assertTrue(dataset['item1']['a'] is dataset['item1']['b'])
+        self.assertTrue(dataset.copy().intern((2, 3)) is not None)
+
+    def test_intern_unhashable(self):
+        '''
+        Test that unhashable codings are left as-is.
+        '''
+        dataset = Dataset({'item1': {'a': [2, 3], 'b': [2, 3]}})
+        self.assertFalse(dataset['item1']['a'] is dataset['item1']['b'])
+        self.assertEqual([], dataset.identical_codings())
+
 
 class TestUtils(unittest.TestCase):
 
@@ -22,14 +22,14 @@ def input_linear_mass_tsv(filepath, delimiter=DEFAULT_DELIMITER):
     :type delimiter: str
     '''
 
-    from segeval.data import Dataset, name_from_filepath
+    from segeval.data import Dataset, name_from_filepath, READ_MODE
     # List version of file
     header = []
     dataset = Dataset()
     item = name_from_filepath(filepath)
     dataset[item] = dict()
     # Open file
-    with open(filepath, 'rU') as csv_file:
+    with open(filepath, READ_MODE) as csv_file:
         # Read in file
         reader = csv.reader(csv_file, delimiter=delimiter)
         for i, row in enumerate(reader):
@@ -45,9 +45,11 @@ def input_linear_mass_tsv(filepath, delimiter=DEFAULT_DELIMITER):
                     if j is 0:
                         coder = str(col)
                         dataset[item][coder] = list()
+                        dataset.coders.add(coder)
                     else:
                         dataset[item][coder].append(int(col))
-                dataset[item][coder] = tuple(dataset[item][coder])
+                dataset[item][coder] = dataset.intern(
+                    tuple(dataset[item][coder]))
 
     return dataset
 
@@ -72,6 +74,7 @@ def input_linear_positions_tsv(filepath, delimiter=DEFAULT_DELIMITER):
     # Convert each segment position to masses
     for item, coder_positions in dataset.items():
         for coder, positions in coder_positions.items():
-            dataset[item][coder] = convert_positions_to_masses(positions)
+            dataset[item][coder] = dataset.intern(
+                convert_positions_to_masses(positions))
     # Return
     return dataset
@@ -6,6 +6,8 @@ Tests the data merge functions and package.
 from __future__ import absolute_import
 import unittest
 import os
+import shutil
+import tempfile
 from segeval.data.tsv import (input_linear_mass_tsv, input_linear_positions_tsv)
 from segeval.data.samples import HEARST_1997_STARGAZER
 
@@ -35,3 +37,21 @@ class TestTsv(unittest.TestCase):
         dataset = input_linear_positions_tsv(tsv_file, delimiter=',')
         self.assertEqual(dataset['hearst1997_positions'],
                          HEARST_1997_STARGAZER['stargazer'])
+
+    def test_input_crlf(self):
+        '''
+        Test mass TSV file input with Windows line endings.
+        '''
+        directory = tempfile.mkdtemp()
+        try:
+            tsv_file = os.path.join(directory, 'hearst1997.tsv')
+            with open(os.path.join(self.test_data_dir, 'hearst1997.tsv')) \
+                    as original:
+                lines = original.read().splitlines()
+            with open(tsv_file, 'wb') as crlf:
+                crlf.write('\r\n'.join(lines).encode('utf-8'))
+            dataset = input_linear_mass_tsv(tsv_file)
+            self.assertEqual(dataset['hearst1997'],
+                             HEARST_1997_STARGAZER['stargazer'])
+        finally:
+            shutil.rmtree(directory)
@@ -4,6 +4,7 @@ General metric utilities and constants.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import
+from functools import partial
 from segeval.format import BoundaryFormat
 
 
@@ -13,3 +14,183 @@ METRIC_DEFAULTS = {
     'one_minus': False,
     'return_parts': False
 }
+
+METRIC_ALIASES = {
+    'B': 'boundary_similarity',
+    'S': 'segmentation_similarity',
+    'Pk': 'pk',
+    'WD': 'window_diff'
+}
+'''
+Short names accepted by :func:`make_metric`.
+'''
+
+
+class Metric(object):
+
+    '''
+    A metric compiled by :func:`make_metric` with fixed options, called with a
+    hypothesis and a reference segmentation.
+    '''
+
+    __slots__ = ('name', 'options', 'fnc')
+
+    def __init__(self, name, options, fnc):
+        self.name = name
+        self.options = options
+        self.fnc = fnc
+
+    def __call__(self, hypothesis, reference):
+        return self.fnc(hypothesis, reference)
+
+    def __repr__(self):
+        return 'Metric({0!r}, {1!r})'.format(self.name, self.options)
+
+    def __canonical__(self):
+        '''
+        The values that identify this metric in cache keys (see
+        :func:`segeval.util.cache.pair_key`).
+        '''
+        return self.name, self.options
+
+
+def __compile_boundary_similarity__(options):
+    from segeval.similarity import __boundary_statistics__
+    from segeval.similarity.boundary import __boundary_similarity_fraction__
+    statistics_args = (options['boundary_types'], options['boundary_format'],
+                       options['n_t'], options['weight'], options['detail'])
+    detail = options['detail']
+    return_parts = options['return_parts']
+    one_minus = options['one_minus']
+
+    def boundary_similarity(hypothesis, reference):
+        statistics = __boundary_statistics__(hypothesis, reference,
+                                             *statistics_args)
+        return __boundary_similarity_fraction__(statistics, detail,
+                                                return_parts, one_minus)
+    return boundary_similarity
+
+
+def __compile_segmentation_similarity__(options):
+    from segeval.similarity import __boundary_statistics__
+    from segeval.similarity.segmentation import \
+        __segmentation_similarity_fraction__
+    statistics_args = (options['boundary_types'], options['boundary_format'],
+                       options['n_t'], options['weight'], options['detail'])
+    return_parts = options['return_parts']
+    one_minus = options['one_minus']
+
+    def segmentation_similarity(hypothesis, reference):
+        statistics = __boundary_statistics__(hypothesis, reference,
+                                             *statistics_args)
+        return __segmentation_similarity_fraction__(statistics, return_parts,
+                                                    one_minus)
+    return segmentation_similarity
+
+
+def __compile_pk__(options):
+    from segeval.window.pk import __pk__
+    return partial(__pk__, **options)
+
+
+def __compile_window_diff__(options):
+    from segeval.window.windowdiff import __window_diff__
+    return partial(__window_diff__, **options)
+
+
+def __metric_definitions__():
+    '''
+    Defaults, supported boundary formats, and compilation function of each
+    metric that :func:`make_metric` accepts.
+    '''
+    from segeval.similarity import SIMILARITY_METRIC_DEFAULTS
+    from segeval.similarity.segmentation import SEGMENTATION_METRIC_DEFAULTS
+    from segeval.window import WINDOW_METRIC_DEFAULTS
+    from segeval.window.windowdiff import WINDOWDIFF_METRIC_DEFAULTS
+    similarity_formats = (BoundaryFormat.mass, BoundaryFormat.position,
+                          BoundaryFormat.sets, BoundaryFormat.nltk)
+    window_formats = (BoundaryFormat.mass, BoundaryFormat.position,
+                      BoundaryFormat.nltk)
+    return {
+        'boundary_similarity': (SIMILARITY_METRIC_DEFAULTS,
+                                similarity_formats,
+                                __compile_boundary_similarity__),
+        'segmentation_similarity': (SEGMENTATION_METRIC_DEFAULTS,
+                                    similarity_formats,
+                                    __compile_segmentation_similarity__),
+        'pk': (WINDOW_METRIC_DEFAULTS, window_formats, __compile_pk__),
+        'window_diff': (WINDOWDIFF_METRIC_DEFAULTS, window_formats,
+                        __compile_window_diff__)
+    }
+
+
+def __validate_options__(name, options, boundary_formats):
+    '''
+    Check the values of metric options, raising
+    :class:`segeval.util.SegmentationMetricError` if any is invalid.
+    '''
+    from segeval.similarity import Detail
+    from segeval.util import SegmentationMetricError
+    if options['boundary_format'] not in boundary_formats:
+        raise SegmentationMetricError(
+            'Unsupported boundary format for {0}: {1}'.format(
+                name, options['boundary_format']))
+    if 'n_t' in options and (not isinstance(options['n_t'], int) or
+                             options['n_t'] < 0):
+        raise SegmentationMetricError(
+            'Expected n_t to be a non-negative int; obtained {0!r}'.format(
+                options['n_t']))
+    if 'weight' in options and (len(options['weight']) != 3 or not all(
+            callable(fnc_weight) for fnc_weight in options['weight'])):
+        raise SegmentationMetricError(
+            'Expected weight to be a tuple of three functions')
+    if 'detail' in options and \
+            options['detail'] not in (Detail.full, Detail.counts):
+        raise SegmentationMetricError(
+            'Unsupported detail; expected Detail.full or Detail.counts')
+    if 'window_size' in options and options['window_size'] is not None and \
+            (not isinstance(options['window_size'], int) or
+             options['window_size'] < 1):
+        raise SegmentationMetricError(
+            'Expected window_size to be a positive int; obtained {0!r}'.format(
+                options['window_size']))
+
+
+def make_metric(name, **kwargs):
+    '''
+    Create a callable that computes a metric between a hypothesis and a
+    reference segmentation, e.g.::
+
+        >>> b = make_metric('B', n_t=2, boundary_format=BoundaryFormat.mass)
+        >>> b((2, 3, 6), (5, 6))
+        Decimal('0.5')
+
+    Options are those accepted by the metric's function (e.g.,
+    :func:`segeval.boundary_similarity`), except for ``permuted`` which only
+    applies to datasets.  They are validated once here, so that each call
+    skips argument parsing and copying of defaults; this is worthwhile when
+    comparing many small pairs of segmentations.
+
+    :param name: Metric name (``B``, ``S``, ``Pk``, or ``WD``) or the name of
+        its function (e.g., ``boundary_similarity``).
+    :type name: str
+    '''
+    from segeval.util import SegmentationMetricError
+    name = METRIC_ALIASES.get(name, name)
+    definitions = __metric_definitions__()
+    if name not in definitions:
+        raise SegmentationMetricError(
+            'Unknown metric {0!r}; expected one of: {1}'.format(
+                name, ', '.join(sorted(set(definitions) |
+                                       set(METRIC_ALIASES)))))
+    defaults, boundary_formats, fnc_compile = definitions[name]
+    options = dict(defaults)
+    del options['permuted']
+    unknown = set(kwargs) - set(options)
+    if len(unknown) > 0:
+        raise SegmentationMetricError(
+            'Unknown options for {0}: {1}'.format(
+                name, ', '.join(sorted(unknown))))
+    options.update(kwargs)
+    __validate_options__(name, options, boundary_formats)
+    return Metric(name, options, fnc_compile(dict(options)))
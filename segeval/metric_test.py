@@ -0,0 +1,71 @@
+'''
+Tests compiled metrics.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+from decimal import Decimal
+from segeval.util.test import TestCase
+from segeval.util import SegmentationMetricError
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.format import BoundaryFormat
+from segeval.metric import make_metric, Metric
+from segeval.similarity import Detail
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.segmentation import segmentation_similarity
+from segeval.window.pk import pk
+from segeval.window.windowdiff import window_diff
+
+
+class TestMakeMetric(TestCase):
+
+    '''
+    Test compiled metrics.
+    '''
+
+    def __pairs__(self):
+        for codings in KAZANTSEVA2012_G5.values():
+            coders = sorted(codings)
+            for hypothesis, reference in zip(coders, coders[1:]):
+                yield codings[hypothesis], codings[reference]
+
+    def test_equivalence(self):
+        '''
+        Test that compiled metrics compute the same values as their functions.
+        '''
+        for name, fnc_metric, kwargs in (
+                ('B', boundary_similarity, {'n_t': 3}),
+                ('S', segmentation_similarity, {'one_minus': True}),
+                ('Pk', pk, {'window_size': 5}),
+                ('WD', window_diff, {'lamprier_et_al_2007_fix': True}),
+                ('boundary_similarity', boundary_similarity,
+                 {'return_parts': True, 'detail': Detail.counts})):
+            metric = make_metric(name, **kwargs)
+            for hypothesis, reference in self.__pairs__():
+                self.assertEqual(fnc_metric(hypothesis, reference, **kwargs),
+                                 metric(hypothesis, reference))
+
+    def test_value(self):
+        '''
+        Test a compiled metric's value and attributes.
+        '''
+        metric = make_metric('B', boundary_format=BoundaryFormat.mass)
+        self.assertTrue(isinstance(metric, Metric))
+        self.assertEqual('boundary_similarity', metric.name)
+        self.assertEqual(2, metric.options['n_t'])
+        self.assertAlmostEquals(Decimal('0.5'), metric((2, 3, 6), (5, 6)))
+        self.assertFalse(hasattr(metric, '__dict__'))
+
+    def test_invalid(self):
+        '''
+        Test that invalid metrics and options are rejected once.
+        '''
+        for name, kwargs in (('X', {}), ('B', {'permuted': True}),
+                             ('B', {'window_size': 3}),
+                             ('B', {'n_t': -1}),
+                             ('B', {'weight': (len,)}),
+                             ('S', {'detail': 'some'}),
+                             ('Pk', {'boundary_format': BoundaryFormat.sets}),
+                             ('WD', {'window_size': 0})):
+            self.assertRaises(SegmentationMetricError, make_metric, name,
+                              **kwargs)
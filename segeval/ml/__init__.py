@@ -6,7 +6,6 @@ learning metrics that have been adapted for use in segmentation.
 '''
 from __future__ import absolute_import, division
 from decimal import Decimal
-from collections import defaultdict
 from segeval.util import SegmentationMetricError
 from segeval.util.math import mean
 from segeval.util.lang import enum
@@ -14,19 +13,22 @@ from segeval.util.lang import enum
 
 Average = enum('micro', 'macro')
 
+Group = enum(corpus='corpus', item='item', coder='coder')
 
-def __value_micro_macro__(fnc, arguments, classification=None,
+
+def __value_micro_macro__(fnc, fnc_all, arguments, classification=None,
                           version=Average.micro):
 
-    def __compute__(fnc, classes, arguments, classification, version):
+    def __compute__(fnc, fnc_all, arguments, classification, version):
         if classification is None:
+            all_arguments = dict(arguments)
+            del all_arguments['classification']
             if version is Average.micro:
                 # Micro-average
+                all_arguments['return_parts'] = True
                 numerator, denominator = 0, 0
-                for classification in classes:
-                    arguments['classification'] = classification
-                    arguments['return_parts'] = True
-                    class_numerator, class_denominator = fnc(**arguments)
+                for class_numerator, class_denominator in \
+                        fnc_all(**all_arguments):
                     numerator += class_numerator
                     denominator += class_denominator
                 if numerator == 0:
@@ -35,59 +37,90 @@ def __value_micro_macro__(fnc, arguments, classification=None,
                     return Decimal(numerator) / denominator
             elif version is Average.macro:
                 # Macro-average
-                values = list()
-                for classification in classes:
-                    arguments['classification'] = classification
-                    value = fnc(**arguments)
-                    values.append(value)
-                return mean(values)
+                return mean(fnc_all(**all_arguments))
             else:
                 raise SegmentationMetricError('Unrecognized type of averaging;\
  expected Average.micro or Average.macro')
         else:
             return fnc(**arguments)
     if isinstance(arguments['matrix'], ConfusionMatrix):
-        classes = arguments['matrix'].classes()
-        return __compute__(fnc, classes, arguments, classification, version)
+        return __compute__(fnc, fnc_all, arguments, classification, version)
     else:
         values = dict()
         new_arguments = dict(arguments)
         for label, matrix in arguments['matrix'].items():
             new_arguments['matrix'] = matrix
-            classes = matrix.classes()
             values[label] = __compute__(
-                fnc, classes, new_arguments, classification, version)
+                fnc, fnc_all, new_arguments, classification, version)
         return values
 
 
+def __fraction__(numerator, denominator):
+    if numerator == 0:
+        return Decimal(0)
+    else:
+        return Decimal(numerator) / Decimal(denominator)
+
+
 def __precision__(matrix, classification, return_parts=False):
 
-    predicted = classification
-    denominator = 0
-    for actual in matrix.classes():
-        denominator += matrix[predicted][actual]
     numerator = matrix[classification][classification]
+    denominator = matrix.predicted_total(classification)
     if return_parts:
         return numerator, denominator
     else:
-        if numerator is 0:
-            return Decimal(0)
-        else:
-            return Decimal(numerator) / Decimal(denominator)
+        return __fraction__(numerator, denominator)
+
+
+def __precision_all__(matrix, return_parts=False):
+    '''
+    Compute precision for every class at once from the diagonal and row totals
+    of the matrix.
+    '''
+
+    parts = list(zip(matrix.diagonal(), matrix.predicted_totals()))
+    if return_parts:
+        return parts
+    else:
+        return [__fraction__(numerator, denominator)
+                for numerator, denominator in parts]
 
 
 def __recall__(matrix, classification, return_parts=False):
 
-    actual = classification
-    denominator = 0
-    for predicted in matrix.classes():
-        denominator += matrix[predicted][actual]
     numerator = matrix[classification][classification]
+    denominator = matrix.actual_total(classification)
     if return_parts:
         return numerator, denominator
     else:
-        if numerator is 0:
-            return Decimal(0)
+        return __fraction__(numerator, denominator)
+
+
+def __recall_all__(matrix, return_parts=False):
+    '''
+    Compute recall for every class at once from the diagonal and column totals
+    of the matrix.
+    '''
+
+    parts = list(zip(matrix.diagonal(), matrix.actual_totals()))
+    if return_parts:
+        return parts
+    else:
+        return [__fraction__(numerator, denominator)
+                for numerator, denominator in parts]
+
+
+def __fmeasure_parts__(class_precision, class_recall, beta, return_parts):
+    if not return_parts and (class_precision == 0 or class_recall == 0):
+        return 0
+    else:
+        # Calculate terms
+        beta2 = beta ** 2
+        beta2_1 = Decimal('1.0') + beta2
+        numerator = beta2_1 * class_precision * class_recall
+        denominator = (beta2 * class_precision) + class_recall
+        if return_parts:
+            return numerator, denominator
         else:
             return Decimal(numerator) / Decimal(denominator)
 
@@ -112,20 +145,20 @@ def __fmeasure__(matrix, classification=None, beta=Decimal('1.0'),
 
     class_precision = __precision__(matrix, classification)
     class_recall = __recall__(matrix, classification)
-    if not return_parts and (class_precision == 0 or class_recall == 0):
-        return 0
-    else:
-        # Convert to Decimal
-        beta = Decimal(str(beta))
-        # Calculate terms
-        beta2 = beta ** 2
-        beta2_1 = Decimal('1.0') + beta2
-        numerator = beta2_1 * class_precision * class_recall
-        denominator = (beta2 * class_precision) + class_recall
-        if return_parts:
-            return numerator, denominator
-        else:
-            return Decimal(numerator) / Decimal(denominator)
+    return __fmeasure_parts__(class_precision, class_recall,
+                              Decimal(str(beta)), return_parts)
+
+
+def __fmeasure_all__(matrix, beta=Decimal('1.0'), return_parts=False):
+    '''
+    Compute F-measure for every class at once; see :func:`__fmeasure__`.
+    '''
+
+    beta = Decimal(str(beta))
+    return [__fmeasure_parts__(class_precision, class_recall, beta,
+                               return_parts)
+            for class_precision, class_recall in
+            zip(__precision_all__(matrix), __recall_all__(matrix))]
 
 
 def precision(matrix, classification=None, version=Average.micro):
@@ -144,7 +177,7 @@ def precision(matrix, classification=None, version=Average.micro):
     arguments = dict()
     arguments['matrix'] = matrix
     arguments['classification'] = classification
-    return __value_micro_macro__(__precision__, arguments, classification, version)
+    return __value_micro_macro__(__precision__, __precision_all__, arguments, classification, version)
 
 
 def recall(matrix, classification=None, version=Average.micro):
@@ -163,7 +196,7 @@ def recall(matrix, classification=None, version=Average.micro):
     arguments = dict()
     arguments['matrix'] = matrix
     arguments['classification'] = classification
-    return __value_micro_macro__(__recall__, arguments, classification, version)
+    return __value_micro_macro__(__recall__, __recall_all__, arguments, classification, version)
 
 
 def fmeasure(matrix, classification=None, beta=Decimal('1.0'),
@@ -184,40 +217,148 @@ def fmeasure(matrix, classification=None, beta=Decimal('1.0'),
     arguments['matrix'] = matrix
     arguments['classification'] = classification
     arguments['beta'] = beta
-    return __value_micro_macro__(__fmeasure__, arguments, classification, version)
+    return __value_micro_macro__(__fmeasure__, __fmeasure_all__, arguments, classification, version)
+
 
+def __group_of__(key, group):
+    '''
+    Obtain the group that a pair key (i.e., ``item,coder_m,coder_n``)
+    produced by pairwise comparison belongs to.
+    '''
+    if group == Group.corpus:
+        return None
+    parts = key.split(',')
+    if group == Group.item:
+        return ','.join(parts[:-2])
+    elif group == Group.coder:
+        return parts[-2]
+    else:
+        raise SegmentationMetricError('Unrecognized grouping; expected \
+Group.corpus, Group.item, or Group.coder')
 
-class _InnerConfusionMatrix(defaultdict):
 
+def reduce_confusion_matrices(matrices, group=Group.corpus):
     '''
-    Inner dict of the confusion matrix; used to determine when the classes list
-    is dirty.
+    Sum the confusion matrices produced for each pair of a dataset (e.g., by
+    :func:`segeval.boundary_confusion_matrix`) in one pass, either into one
+    corpus-level matrix or into one matrix per item or per (hypothesis)
+    coder.  Reductions are themselves mergeable; see :func:`merge_reductions`.
+
+    :param matrices: Confusion matrices keyed by pair.
+    :param group: Grouping to reduce by.
+
+    :type matrices: :func:`dict`
+    :type group: :class:`Group`
+
+    :returns: A matrix for ``Group.corpus``, otherwise a :func:`dict` of
+              matrices per group.
     '''
+    reduced = dict()
+    for key, matrix in matrices.items():
+        label = __group_of__(key, group)
+        if label not in reduced:
+            reduced[label] = ConfusionMatrix()
+        reduced[label] += matrix
+    if group == Group.corpus:
+        return reduced.get(None, ConfusionMatrix())
+    else:
+        return reduced
+
 
-    def __init__(self, parent):
+def merge_reductions(reductions):
+    '''
+    Merge reductions produced by :func:`reduce_confusion_matrices` upon
+    separate parts of a dataset (e.g., by parallel workers).
+
+    :param reductions: Matrices, or :func:`dict` of matrices per group.
+    :type reductions: :func:`list`
+    '''
+    merged = None
+    for reduction in reductions:
+        if isinstance(reduction, ConfusionMatrix):
+            if merged is None:
+                merged = ConfusionMatrix()
+            merged += reduction
+        else:
+            if merged is None:
+                merged = dict()
+            for label, matrix in reduction.items():
+                if label not in merged:
+                    merged[label] = ConfusionMatrix()
+                merged[label] += matrix
+    return merged
+
+
+class _InnerConfusionMatrix(object):
+
+    '''
+    Row of the confusion matrix for a predicted class; reads and writes go
+    directly to the parent's count array.
+    '''
+    __slots__ = ('__parent__', '__cells__')
+
+    def __init__(self, parent, cells):
         self.__parent__ = parent
-        defaultdict.__init__(self, int)
+        self.__cells__ = cells
+
+    def __getitem__(self, key):
+        return self.__cells__[self.__parent__.index(key)]
 
     def __setitem__(self, key, value):
-        self.__parent__.__dirty_classes__ = True
-        defaultdict.__setitem__(self, key, value)
+        self.__cells__[self.__parent__.index(key)] = value
+
+    def __iter__(self):
+        return iter(self.__parent__.labels())
+
+    def __len__(self):
+        return len(self.__cells__)
+
+    def keys(self):
+        return self.__parent__.labels()
 
+    def values(self):
+        return list(self.__cells__)
 
-class ConfusionMatrix(dict):
+    def items(self):
+        return list(zip(self.__parent__.labels(), self.__cells__))
+
+
+class ConfusionMatrix(object):
 
     '''
     A :func:`dict`-like representation of a confusion matrix offering some automation.
     To access/store values, use: ``matrix[predicted][actual]``.
+
+    Counts are stored in a square array indexed by class, so increments are
+    constant-time and totals can be computed for all classes at once.
     '''
-    __classes__ = set()
-    __dirty_classes__ = False
+
+    def __init__(self):
+        self.__indices__ = dict()
+        self.__labels__ = list()
+        self.__counts__ = list()
+
+    def index(self, label):
+        '''
+        Retrieve the array index of a class, adding the class if it is new.
+        '''
+        try:
+            return self.__indices__[label]
+        except KeyError:
+            index = len(self.__labels__)
+            self.__indices__[label] = index
+            self.__labels__.append(label)
+            for cells in self.__counts__:
+                cells.append(0)
+            self.__counts__.append([0] * (index + 1))
+            return index
 
     def __setitem__(self, key, value):
         raise AttributeError('no such method')
 
     def __getitem__(self, key):
         '''
-        Return default dicts and store them so that the following is possible:
+        Return a row of the matrix so that the following is possible:
 
         >>> matrix = ConfusionMatrix()
         >>> matrix['a']['b'] += 1
@@ -230,23 +371,109 @@ class ConfusionMatrix(dict):
         0
 
         '''
-        value = None
-        if key not in self:
-            value = _InnerConfusionMatrix(self)
-            dict.__setitem__(self, key, value)
-        else:
-            value = dict.__getitem__(self, key)
-        return value
+        return _InnerConfusionMatrix(self, self.__counts__[self.index(key)])
+
+    def __contains__(self, key):
+        return key in self.__indices__
+
+    def __iter__(self):
+        return iter(self.labels())
+
+    def __len__(self):
+        return len(self.__labels__)
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfusionMatrix):
+            return NotImplemented
+        return self.__cells__() == other.__cells__()
+
+    def __iadd__(self, other):
+        '''
+        Add the counts of another matrix to this matrix.
+        '''
+        indices = [self.index(label) for label in other.__labels__]
+        for i, cells in zip(indices, other.__counts__):
+            target = self.__counts__[i]
+            for j, value in zip(indices, cells):
+                if value != 0:
+                    target[j] += value
+        return self
+
+    def __add__(self, other):
+        '''
+        Create a new matrix containing the counts of both matrices.
+        '''
+        matrix = ConfusionMatrix()
+        matrix += self
+        matrix += other
+        return matrix
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __cells__(self):
+        cells = dict()
+        for predicted, row in zip(self.__labels__, self.__counts__):
+            for actual, value in zip(self.__labels__, row):
+                if value != 0:
+                    cells[(predicted, actual)] = value
+        return cells
+
+    def __repr__(self):
+        return 'ConfusionMatrix({0})'.format(self.__cells__())
+
+    def labels(self):
+        '''
+        Retrieve the list of all classes in array index order.
+        '''
+        return list(self.__labels__)
+
+    def keys(self):
+        return self.labels()
+
+    def values(self):
+        return [self[label] for label in self.__labels__]
+
+    def items(self):
+        return [(label, self[label]) for label in self.__labels__]
 
     def classes(self):
         '''
         Retrieve the set of all classes.
         '''
-        if self.__dirty_classes__:
-            self.__classes__ = set()
-            for predicted, values in self.items():
-                self.__classes__.add(predicted)
-                for actual in values.keys():
-                    self.__classes__.add(actual)
-            self.__dirty_classes__ = False
-        return self.__classes__
+        return set(self.__labels__)
+
+    def diagonal(self):
+        '''
+        Retrieve the counts of correct classifications of each class in array
+        index order.
+        '''
+        return [cells[i] for i, cells in enumerate(self.__counts__)]
+
+    def predicted_totals(self):
+        '''
+        Retrieve the total count of each predicted class in array index order.
+        '''
+        return [sum(cells) for cells in self.__counts__]
+
+    def actual_totals(self):
+        '''
+        Retrieve the total count of each actual class in array index order.
+        '''
+        return [sum(column) for column in zip(*self.__counts__)]
+
+    def predicted_total(self, label):
+        '''
+        Retrieve the total count of a predicted class.
+        '''
+        return sum(self.__counts__[self.index(label)])
+
+    def actual_total(self, label):
+        '''
+        Retrieve the total count of an actual class.
+        '''
+        index = self.index(label)
+        return sum(cells[index] for cells in self.__counts__)
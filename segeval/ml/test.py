@@ -8,7 +8,8 @@ import unittest
 from decimal import Decimal
 from segeval.ml import (
     __precision__, precision, __recall__, recall, __fmeasure__,
-    fmeasure, ConfusionMatrix as cm, Average)
+    fmeasure, ConfusionMatrix as cm, Average, Group,
+    reduce_confusion_matrices, merge_reductions)
 from segeval.util import SegmentationMetricError
 
 
@@ -56,6 +57,125 @@ class TestConfusionMatrix(unittest.TestCase):
 
         self.assertEqual(matrix.classes(), set(['p', 'n', 'a', 'b', 'f']))
 
+    def test_matrix_index(self):
+        '''
+        Test that classes are indexed in the order that they are seen.
+        '''
+        matrix = cm()
+        matrix['p']['n'] += 1
+        matrix[None]['p'] += 2
+        self.assertEqual(matrix.labels(), ['p', 'n', None])
+        self.assertEqual(matrix.index(None), 2)
+        self.assertEqual(matrix.index('f'), 3)
+        self.assertTrue('f' in matrix)
+        self.assertEqual(4, len(matrix))
+
+    def test_matrix_totals(self):
+        '''
+        Test totals computed for all classes at once.
+        '''
+        matrix = cm()
+        matrix['p']['p'] += 5
+        matrix['p']['f'] += 2
+        matrix['f']['p'] += 1
+        matrix['f']['f'] += Decimal('1.5')
+        self.assertEqual(matrix.diagonal(), [5, Decimal('1.5')])
+        self.assertEqual(matrix.predicted_totals(), [7, Decimal('2.5')])
+        self.assertEqual(matrix.actual_totals(), [6, Decimal('3.5')])
+        self.assertEqual(matrix.predicted_total('f'), Decimal('2.5'))
+        self.assertEqual(matrix.actual_total('p'), 6)
+
+    def test_matrix_rows(self):
+        '''
+        Test dict-like access to rows.
+        '''
+        matrix = cm()
+        matrix['p']['p'] += 5
+        matrix['p']['f'] += 2
+        self.assertEqual(dict(matrix['p'].items()), {'p': 5, 'f': 2})
+        self.assertEqual(dict(matrix['f'].items()), {'p': 0, 'f': 0})
+        self.assertEqual(matrix.keys(), ['p', 'f'])
+
+    def test_matrix_equality(self):
+        '''
+        Test that matrices with the same counts are equal.
+        '''
+        matrix_a = cm()
+        matrix_a['p']['f'] += 2
+        matrix_b = cm()
+        matrix_b['f']['f'] += 0
+        matrix_b['p']['f'] += 2
+        self.assertEqual(matrix_a, matrix_b)
+        matrix_b['p']['p'] += 1
+        self.assertNotEqual(matrix_a, matrix_b)
+
+
+class TestReduction(unittest.TestCase):
+
+    '''
+    Confusion matrix reduction tests.
+    '''
+
+    def matrices(self):
+        matrix_a = cm()
+        matrix_a['p']['p'] += 1
+        matrix_a['p']['f'] += 1
+        matrix_b = cm()
+        matrix_b['f']['f'] += 2
+        matrix_b[None]['p'] += 1
+        matrix_c = cm()
+        matrix_c['p']['p'] += 3
+        return {'item1,a,b': matrix_a, 'item1,b,a': matrix_b,
+                'item2,a,b': matrix_c}
+
+    def test_add(self):
+        '''
+        Test adding matrices with differing classes.
+        '''
+        matrices = self.matrices()
+        matrix = matrices['item1,a,b'] + matrices['item1,b,a']
+        self.assertEqual(matrix['p']['p'], 1)
+        self.assertEqual(matrix['p']['f'], 1)
+        self.assertEqual(matrix['f']['f'], 2)
+        self.assertEqual(matrix[None]['p'], 1)
+        self.assertEqual(matrices['item1,a,b']['f']['f'], 0)
+
+    def test_reduce_corpus(self):
+        '''
+        Test reducing all pairs into one matrix.
+        '''
+        matrix = reduce_confusion_matrices(self.matrices())
+        self.assertEqual(matrix['p']['p'], 4)
+        self.assertEqual(precision(matrix), Decimal('0.75'))
+        self.assertEqual(reduce_confusion_matrices({}), cm())
+
+    def test_reduce_groups(self):
+        '''
+        Test reducing pairs per item and per coder.
+        '''
+        items = reduce_confusion_matrices(self.matrices(), Group.item)
+        self.assertEqual(set(['item1', 'item2']), set(items.keys()))
+        self.assertEqual(items['item1']['f']['f'], 2)
+        coders = reduce_confusion_matrices(self.matrices(), Group.coder)
+        self.assertEqual(coders['a']['p']['p'], 4)
+        self.assertEqual(coders['b']['f']['f'], 2)
+        self.assertEqual(recall(coders)['a'], Decimal('0.8'))
+        self.assertRaises(SegmentationMetricError, reduce_confusion_matrices,
+                          self.matrices(), 'incorrect')
+
+    def test_merge_reductions(self):
+        '''
+        Test that reductions of parts merge into the reduction of the whole.
+        '''
+        matrices = self.matrices()
+        parts = [dict(list(matrices.items())[:1]),
+                 dict(list(matrices.items())[1:])]
+        for group in (Group.corpus, Group.item, Group.coder):
+            self.assertEqual(
+                reduce_confusion_matrices(matrices, group),
+                merge_reductions([reduce_confusion_matrices(part, group)
+                                  for part in parts]))
+
 
 class TestML(unittest.TestCase):
 
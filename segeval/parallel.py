@@ -0,0 +1,268 @@
+'''
+Parallel evaluation of many pairs of segmentations using a pool of worker
+processes.  Pairs are sent to workers in chunks and each worker compiles the
+metrics requested once (see :func:`segeval.metric.make_metric`), so that the
+cost of each comparison is little more than that of the metric itself.
+Datasets may instead be published into shared memory once (see
+:func:`evaluate_datasets`), so that chunks only name the pairs to compare.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import multiprocessing
+import os
+import timeit
+from collections import namedtuple
+from functools import partial
+from itertools import combinations
+from segeval.data.shared import (SUPPORTED_FORMATS, attach_dataset,
+                                 publish_dataset, shared_memory)
+from segeval.metric import make_metric
+from segeval.similarity.distance.multipleboundary import memoize_edits
+
+
+Pair = namedtuple('Pair', 'item hypothesis_coder reference_coder \
+hypothesis reference')
+'''
+A pair of codings of an item to compare.
+'''
+
+Row = namedtuple('Row', 'item hypothesis_coder reference_coder metric value')
+'''
+The value of a metric for one pair.
+'''
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Metrics compiled by the current (worker) process
+__worker_metrics__ = list()
+# Shared datasets attached to by the current (worker) process
+__worker_datasets__ = list()
+
+
+def iter_pairs(hypothesis, reference=None, permuted=False):
+    '''
+    Yield each :class:`Pair` of codings to compare.  Given one dataset, every
+    combination of coders of each item is paired (and, if ``permuted``, in
+    both orders); given two datasets, every coder of an item in
+    ``hypothesis`` is paired with every coder of the same item in
+    ``reference``.  Coders are paired in the same order as by
+    :func:`segeval.compute.compute_pairwise_values`, which matters for
+    asymmetric metrics (e.g., those whose window size is computed from the
+    reference).
+    '''
+    for item in sorted(hypothesis.keys()):
+        codings_m = hypothesis[item]
+        if reference is not None:
+            if item not in reference:
+                continue
+            codings_n = reference[item]
+            for m in codings_m:
+                for n in codings_n:
+                    yield Pair(item, m, n, codings_m[m], codings_n[n])
+        else:
+            for m, n in combinations(codings_m, 2):
+                yield Pair(item, m, n, codings_m[m], codings_m[n])
+                if permuted:
+                    yield Pair(item, n, m, codings_m[n], codings_m[m])
+
+
+def __chunks__(iterable, chunk_size):
+    chunk = list()
+    for value in iterable:
+        chunk.append(value)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = list()
+    if len(chunk) > 0:
+        yield chunk
+
+
+def __compile__(metrics):
+    return [(name, make_metric(name, **options)) for name, options in metrics]
+
+
+def __init_worker__(metrics):
+    '''
+    Compile ``(name, options)`` metric specifications within a worker.
+    '''
+    __worker_metrics__[:] = __compile__(metrics)
+
+
+def __evaluate_chunk__(chunk, compiled=None):
+    '''
+    Compute every compiled metric (by default, those of the worker) for each
+    pair of a chunk.  The boundary edits of a pair are computed once for
+    every BED-based metric, and discarded before the next pair.
+    '''
+    compiled = compiled if compiled is not None else __worker_metrics__
+    rows = list()
+    for pair in chunk:
+        with memoize_edits():
+            for name, metric in compiled:
+                rows.append(Row(pair.item, pair.hypothesis_coder,
+                                pair.reference_coder, name,
+                                metric(pair.hypothesis, pair.reference)))
+    return rows
+
+
+def __init_shared_worker__(metrics, names):
+    '''
+    Compile metric specifications and attach to shared datasets (hypothesis
+    and then reference) within a worker.
+    '''
+    __init_worker__(metrics)
+    __worker_datasets__[:] = [attach_dataset(name) for name in names]
+
+
+def __evaluate_shared_chunk__(chunk):
+    '''
+    Compute every metric of the worker for each pair of a chunk, whose
+    segmentations are viewed from the worker's shared datasets.
+    '''
+    hypothesis, reference = __worker_datasets__[0], __worker_datasets__[-1]
+    return __evaluate_chunk__([pair._replace(
+        hypothesis=hypothesis[pair.item][pair.hypothesis_coder],
+        reference=reference[pair.item][pair.reference_coder])
+        for pair in chunk])
+
+
+def __timed_chunk__(fnc_chunk, chunk):
+    '''
+    Evaluate a scheduled chunk of ``(index, pair)`` tuples, returning the
+    worker's process ID, the seconds spent, the indices of the pairs, and
+    their rows.
+    '''
+    started = timeit.default_timer()
+    rows = fnc_chunk([pair for _, pair in chunk])
+    return (os.getpid(), timeit.default_timer() - started,
+            [index for index, _ in chunk], rows)
+
+
+def __pool_rows__(pool, fnc_chunk, pairs, metrics, chunk_size, scheduler,
+                  strip=False):
+    '''
+    Evaluate chunks of pairs using a pool, yielding rows in the order that the
+    pairs were given.  With a scheduler, chunks are scheduled by estimated
+    cost and completed rows are held until those of every preceding pair
+    have been yielded.  If ``strip``, segmentations are removed from pairs
+    before they are sent to workers.
+    '''
+    def __strip__(pair):
+        return pair._replace(hypothesis=None, reference=None) if strip \
+            else pair
+
+    if scheduler is None:
+        chunks = __chunks__((__strip__(pair) for pair in pairs), chunk_size)
+        for rows in pool.imap(fnc_chunk, chunks):
+            for row in rows:
+                yield row
+        return
+    chunks = [[(index, __strip__(pair)) for index, pair in chunk]
+              for chunk in scheduler.chunks(list(pairs))]
+    scheduler.start()
+    pending = dict()
+    position = 0
+    for worker, seconds, indices, rows in pool.imap_unordered(
+            partial(__timed_chunk__, fnc_chunk), chunks):
+        scheduler.record(worker, seconds, len(indices))
+        for offset, index in enumerate(indices):
+            pending[index] = rows[offset * len(metrics):
+                                  (offset + 1) * len(metrics)]
+        while position in pending:
+            for row in pending.pop(position):
+                yield row
+            position += 1
+    scheduler.finish()
+
+
+def evaluate(pairs, metrics, processes=1, chunk_size=DEFAULT_CHUNK_SIZE,
+             scheduler=None):
+    '''
+    Compute metrics for each pair, yielding a :class:`Row` per metric and
+    pair in the order that the pairs were given.  Rows are yielded as chunks
+    complete, so results can be written out as they are computed.
+
+    :param pairs: Iterable of :class:`Pair`; see :func:`iter_pairs`.
+    :param metrics: List of ``(name, options)`` tuples accepted by
+        :func:`segeval.metric.make_metric`.
+    :param processes: Number of worker processes, or ``None`` for one per
+        CPU; with one, pairs are evaluated within the calling process.
+    :param chunk_size: Pairs sent to a worker at a time.
+    :param scheduler: Scheduler that sends the costliest pairs to worker
+        processes first, and records their utilization (see
+        :class:`segeval.schedule.Scheduler`); it sizes chunks instead of
+        ``chunk_size``, and is unused without worker processes.
+    :type metrics: list
+    :type processes: int
+    :type chunk_size: int
+    :type scheduler: :class:`segeval.schedule.Scheduler`
+    '''
+    metrics = [(name, dict(options)) for name, options in metrics]
+    # Validate options before any workers are started
+    compiled = __compile__(metrics)
+    if processes == 1:
+        for chunk in __chunks__(pairs, chunk_size):
+            for row in __evaluate_chunk__(chunk, compiled):
+                yield row
+        return
+    pool = multiprocessing.Pool(processes, __init_worker__, (metrics,))
+    try:
+        for row in __pool_rows__(pool, __evaluate_chunk__, pairs, metrics,
+                                 chunk_size, scheduler):
+            yield row
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def evaluate_datasets(hypothesis, metrics, reference=None, permuted=False,
+                      processes=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                      scheduler=None):
+    '''
+    Compute metrics for each pair of codings of one or two datasets (see
+    :func:`iter_pairs`), yielding rows as :func:`evaluate` does.
+
+    With worker processes, each dataset is published into shared memory once
+    (see :func:`segeval.data.shared.publish_dataset`) and attached to by each
+    worker, so chunks only name the pairs to compare instead of carrying
+    their segmentations.  Datasets of formats that cannot be shared (or
+    without :mod:`multiprocessing.shared_memory`) are evaluated as by
+    :func:`evaluate`.
+    '''
+    pairs = iter_pairs(hypothesis, reference, permuted)
+    datasets = [hypothesis] if reference is None else [hypothesis, reference]
+    if processes == 1 or shared_memory is None or any(
+            getattr(dataset, 'boundary_format', None) not in SUPPORTED_FORMATS
+            for dataset in datasets):
+        for row in evaluate(pairs, metrics, processes, chunk_size,
+                            scheduler):
+            yield row
+        return
+    metrics = [(name, dict(options)) for name, options in metrics]
+    # Validate options before any datasets are published
+    __compile__(metrics)
+    published = list()
+    try:
+        for dataset in datasets:
+            published.append(publish_dataset(dataset))
+        pool = multiprocessing.Pool(
+            processes, __init_shared_worker__,
+            (metrics, [dataset.name for dataset in published]))
+        try:
+            for row in __pool_rows__(pool, __evaluate_shared_chunk__, pairs,
+                                     metrics, chunk_size, scheduler,
+                                     strip=True):
+                yield row
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    finally:
+        for dataset in published:
+            dataset.close()
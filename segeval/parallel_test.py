@@ -0,0 +1,78 @@
+'''
+Tests parallel evaluation.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+from segeval.util.test import TestCase
+from segeval.data.samples import KAZANTSEVA2012_G5, HYPOTHESIS_STARGAZER, \
+    HEARST_1997_STARGAZER
+from segeval.parallel import iter_pairs, evaluate, evaluate_datasets
+from segeval.similarity.boundary import boundary_similarity
+from segeval.util import SegmentationMetricError
+from segeval.window.windowdiff import window_diff
+
+
+class TestParallel(TestCase):
+
+    '''
+    Test parallel evaluation.
+    '''
+
+    def test_iter_pairs(self):
+        '''
+        Test pairing coders within one dataset and across two.
+        '''
+        pairs = list(iter_pairs(KAZANTSEVA2012_G5))
+        self.assertEqual(len(boundary_similarity(KAZANTSEVA2012_G5)),
+                         len(pairs))
+        self.assertEqual(2 * len(pairs), len(list(
+            iter_pairs(KAZANTSEVA2012_G5, permuted=True))))
+        pairs = list(iter_pairs(HYPOTHESIS_STARGAZER, HEARST_1997_STARGAZER))
+        self.assertEqual(len(boundary_similarity(HYPOTHESIS_STARGAZER,
+                                                 HEARST_1997_STARGAZER)),
+                         len(pairs))
+
+    def test_evaluate(self):
+        '''
+        Test that values equal those of the metric functions, in order, both
+        within this process and within workers.
+        '''
+        expected_b = boundary_similarity(KAZANTSEVA2012_G5)
+        expected_wd = window_diff(KAZANTSEVA2012_G5)
+        metrics = [('B', {}), ('WD', {})]
+        for processes in (1, 2):
+            rows = list(evaluate(iter_pairs(KAZANTSEVA2012_G5), metrics,
+                                 processes=processes, chunk_size=7))
+            self.assertEqual(2 * len(expected_b), len(rows))
+            self.assertEqual(['B', 'WD'] * len(expected_b),
+                             [row.metric for row in rows])
+            for row in rows:
+                key = ','.join((row.item, row.hypothesis_coder,
+                                row.reference_coder))
+                expected = expected_b if row.metric == 'B' else expected_wd
+                self.assertEqual(expected[key], row.value)
+
+    def test_evaluate_datasets(self):
+        '''
+        Test that workers given shared datasets compute the same rows.
+        '''
+        metrics = [('boundary_similarity', {}), ('window_diff', {})]
+        self.assertEqual(
+            list(evaluate(iter_pairs(KAZANTSEVA2012_G5, permuted=True),
+                          metrics)),
+            list(evaluate_datasets(KAZANTSEVA2012_G5, metrics, permuted=True,
+                                   processes=2, chunk_size=5)))
+        self.assertEqual(
+            list(evaluate(iter_pairs(HYPOTHESIS_STARGAZER,
+                                     HEARST_1997_STARGAZER), metrics)),
+            list(evaluate_datasets(HYPOTHESIS_STARGAZER, metrics,
+                                   HEARST_1997_STARGAZER, processes=2)))
+
+    def test_evaluate_invalid(self):
+        '''
+        Test that invalid metric options are raised before evaluation.
+        '''
+        rows = evaluate(iter_pairs(KAZANTSEVA2012_G5), [('B', {'n_t': -1})],
+                        processes=2)
+        self.assertRaises(SegmentationMetricError, list, rows)
@@ -0,0 +1,182 @@
+'''
+Load-balanced scheduling of pairs across worker processes (see
+:func:`segeval.parallel.evaluate`).  The cost of comparing a pair varies by
+orders of magnitude between short items and long ones with many boundaries
+(or many boundary types, which widen the search for substitutions), so pairs
+are sent to workers largest-first, in chunks that shrink as the remaining
+work does, rather than in the order given and in chunks of equal size::
+
+    scheduler = Scheduler(processes=4)
+    rows = list(evaluate(pairs, metrics, processes=4, scheduler=scheduler))
+    sys.stderr.write(scheduler.report())
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import multiprocessing
+import timeit
+from segeval.format import BoundaryFormat
+
+
+DEFAULT_MAX_CHUNK_SIZE = 64
+
+CHUNKS_PER_WORKER = 2
+'''
+Each chunk is sized to hold about ``1 / (CHUNKS_PER_WORKER * processes)`` of
+the work that remains when it is scheduled (guided self-scheduling).
+'''
+
+
+def __shape__(segmentation, boundary_format):
+    '''
+    Return the length, number of boundaries, and boundary types of a
+    segmentation.
+    '''
+    if boundary_format == BoundaryFormat.mass:
+        return sum(segmentation), len(segmentation) - 1, set([1])
+    if boundary_format == BoundaryFormat.position:
+        boundaries = sum(1 for i in range(1, len(segmentation))
+                         if segmentation[i] != segmentation[i - 1])
+        return len(segmentation), boundaries, set([1])
+    if boundary_format == BoundaryFormat.sets:
+        types = set()
+        for position in segmentation:
+            types.update(position)
+        return (len(segmentation) + 1,
+                sum(len(position) for position in segmentation), types)
+    # NLTK strings of 0s and 1s
+    return len(segmentation) + 1, segmentation.count('1'), set([1])
+
+
+def estimate_cost(pair, boundary_format=BoundaryFormat.mass):
+    '''
+    Estimate the relative cost of comparing a pair of segmentations (see
+    :class:`segeval.parallel.Pair`) from their length, their number of
+    boundaries, and the number of boundary types they use.  Converting
+    segmentations costs time linear in their length, and aligning their
+    boundaries costs time linear in the number of boundaries times the
+    square of the number of types that each may be substituted with.
+    '''
+    length_a, boundaries_a, types_a = __shape__(pair.hypothesis,
+                                                boundary_format)
+    length_b, boundaries_b, types_b = __shape__(pair.reference,
+                                                boundary_format)
+    types = len(types_a | types_b)
+    return length_a + length_b + (boundaries_a + boundaries_b) * types ** 2
+
+
+class Scheduler(object):
+
+    '''
+    Orders pairs largest-first by estimated cost (see :func:`estimate_cost`,
+    or ``fnc_cost``) and groups them into chunks of at most
+    ``max_chunk_size`` pairs that shrink as the remaining work does, so that
+    no worker is left comparing a long pair after the others have finished.
+    While pairs are evaluated, the time that each worker spends comparing
+    pairs is recorded; see :meth:`utilization` and :meth:`report`.  Records
+    accumulate over every evaluation that uses the scheduler (e.g., one per
+    group of metrics) until :meth:`reset`.
+    '''
+
+    def __init__(self, processes=None, max_chunk_size=DEFAULT_MAX_CHUNK_SIZE,
+                 boundary_format=BoundaryFormat.mass, fnc_cost=estimate_cost,
+                 clock=timeit.default_timer):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.max_chunk_size = max_chunk_size
+        self.boundary_format = boundary_format
+        self.fnc_cost = fnc_cost
+        self.clock = clock
+        self.started = None
+        self.finished = None
+        self.workers = dict()
+        # Seconds elapsed during earlier evaluations
+        self.__previous__ = 0
+
+    def chunks(self, pairs):
+        '''
+        Return chunks of ``(index, pair)`` tuples, where ``index`` is the
+        position of the pair within ``pairs``, to send to workers in order.
+        '''
+        costs = [(self.fnc_cost(pair, self.boundary_format), index, pair)
+                 for index, pair in enumerate(pairs)]
+        # Largest first; ties in the order given
+        costs.sort(key=lambda cost: (-cost[0], cost[1]))
+        remaining = sum(cost for cost, _, _ in costs)
+        chunks = list()
+        chunk, chunk_cost = list(), 0
+        target = remaining / (CHUNKS_PER_WORKER * self.processes)
+        for cost, index, pair in costs:
+            chunk.append((index, pair))
+            chunk_cost += cost
+            if chunk_cost >= target or len(chunk) >= self.max_chunk_size:
+                chunks.append(chunk)
+                remaining -= chunk_cost
+                chunk, chunk_cost = list(), 0
+                target = remaining / (CHUNKS_PER_WORKER * self.processes)
+        if len(chunk) > 0:
+            chunks.append(chunk)
+        return chunks
+
+    def start(self):
+        '''
+        Record that an evaluation has started.
+        '''
+        self.__previous__ = self.elapsed()
+        self.started = self.clock()
+        self.finished = None
+
+    def reset(self):
+        '''
+        Discard the records of all evaluations.
+        '''
+        self.started = None
+        self.finished = None
+        self.workers = dict()
+        self.__previous__ = 0
+
+    def record(self, worker, seconds, pairs):
+        '''
+        Record that ``worker`` spent ``seconds`` comparing a chunk of
+        ``pairs`` pairs.
+        '''
+        chunks, busy, compared = self.workers.get(worker, (0, 0, 0))
+        self.workers[worker] = (chunks + 1, busy + seconds, compared + pairs)
+
+    def finish(self):
+        '''
+        Record that an evaluation has finished.
+        '''
+        self.finished = self.clock()
+
+    def elapsed(self):
+        '''
+        Seconds from the start of each evaluation until it finished (or now).
+        '''
+        if self.started is None:
+            return self.__previous__
+        finished = self.finished if self.finished is not None else \
+            self.clock()
+        return self.__previous__ + finished - self.started
+
+    def utilization(self):
+        '''
+        The fraction of the time elapsed that each worker spent comparing
+        pairs, as a :func:`dict` keyed by worker (process ID).
+        '''
+        elapsed = self.elapsed()
+        return dict((worker, busy / elapsed if elapsed > 0 else 0)
+                    for worker, (_, busy, _) in self.workers.items())
+
+    def report(self):
+        '''
+        Describe the chunks, pairs, busy time, and utilization of each worker,
+        one line per worker.
+        '''
+        utilization = self.utilization()
+        lines = list()
+        for worker in sorted(self.workers):
+            chunks, busy, compared = self.workers[worker]
+            lines.append('worker {0}: {1} chunks, {2} pairs, {3:.2f}s busy '
+                         '({4:.0%})\n'.format(worker, chunks, compared, busy,
+                                              utilization[worker]))
+        return ''.join(lines)
@@ -0,0 +1,102 @@
+'''
+Tests load-balanced scheduling.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+from segeval.util.test import TestCase
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.format import BoundaryFormat
+from segeval.parallel import Pair, evaluate, iter_pairs
+from segeval.schedule import Scheduler, estimate_cost
+
+
+class Clock(object):
+
+    '''
+    A clock that only moves when told to.
+    '''
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSchedule(TestCase):
+
+    '''
+    Test load-balanced scheduling.
+    '''
+
+    def test_estimate_cost(self):
+        '''
+        Test that longer pairs, and those with more types, cost more.
+        '''
+        short = Pair('a', 1, 2, (2, 3), (5,))
+        long_pair = Pair('b', 1, 2, (20, 30, 10), (25, 35))
+        self.assertTrue(estimate_cost(short) < estimate_cost(long_pair))
+        one_type = Pair('c', 1, 2, (frozenset([1]), frozenset()),
+                        (frozenset([1]), frozenset([1])))
+        three_types = Pair('c', 1, 2, (frozenset([1, 2]), frozenset()),
+                           (frozenset([3]), frozenset([1])))
+        self.assertTrue(estimate_cost(one_type, BoundaryFormat.sets) <
+                        estimate_cost(three_types, BoundaryFormat.sets))
+
+    def test_chunks(self):
+        '''
+        Test that every pair is scheduled once, largest first.
+        '''
+        pairs = list(iter_pairs(KAZANTSEVA2012_G5))
+        scheduler = Scheduler(processes=2, max_chunk_size=4)
+        chunks = scheduler.chunks(pairs)
+        scheduled = [index for chunk in chunks for index, _ in chunk]
+        self.assertEqual(list(range(len(pairs))), sorted(scheduled))
+        costs = [estimate_cost(pairs[index]) for index in scheduled]
+        self.assertEqual(sorted(costs, reverse=True), costs)
+        self.assertTrue(all(len(chunk) <= 4 for chunk in chunks))
+        self.assertEqual(1, len(chunks[-1]))
+
+    def test_evaluate(self):
+        '''
+        Test that scheduled rows are yielded in the order given.
+        '''
+        metrics = [('boundary_similarity', {}), ('pk', {})]
+        pairs = list(iter_pairs(KAZANTSEVA2012_G5, permuted=True))
+        scheduler = Scheduler(processes=2, max_chunk_size=3)
+        self.assertEqual(list(evaluate(pairs, metrics)),
+                         list(evaluate(pairs, metrics, processes=2,
+                                       scheduler=scheduler)))
+        self.assertEqual(len(pairs), sum(compared for _, _, compared in
+                                         scheduler.workers.values()))
+        self.assertEqual(len(scheduler.workers),
+                         len(scheduler.report().splitlines()))
+
+    def test_utilization(self):
+        '''
+        Test the fraction of time that each worker was busy.
+        '''
+        clock = Clock()
+        scheduler = Scheduler(processes=2, clock=clock)
+        scheduler.start()
+        scheduler.record(1, 3.0, 10)
+        scheduler.record(2, 1.0, 2)
+        scheduler.record(1, 1.0, 5)
+        clock.now = 4.0
+        scheduler.finish()
+        self.assertEqual({1: 1.0, 2: 0.25}, scheduler.utilization())
+        self.assertEqual('worker 1: 2 chunks, 15 pairs, 4.00s busy (100%)',
+                         scheduler.report().splitlines()[0])
+        # A second evaluation accumulates with the first
+        clock.now = 10.0
+        scheduler.start()
+        scheduler.record(2, 3.0, 4)
+        clock.now = 14.0
+        scheduler.finish()
+        self.assertEqual({1: 0.5, 2: 0.5}, scheduler.utilization())
+        self.assertEqual('worker 2: 2 chunks, 6 pairs, 4.00s busy (50%)',
+                         scheduler.report().splitlines()[1])
+        scheduler.reset()
+        self.assertEqual('', scheduler.report())
+        self.assertEqual(0, scheduler.elapsed())
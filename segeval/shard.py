@@ -0,0 +1,332 @@
+'''
+Sharded evaluation of a dataset across machines (or containers) that share
+nothing but files.  Items are assigned to one of ``N`` shards by a stable
+hash of their label, each shard is evaluated independently into a shard file,
+and the shard files are merged into the same results, summaries, and
+agreement coefficients that evaluating the whole dataset at once produces::
+
+    $ segeval-shard run dataset.json --shard 0 --shards 4 --metrics B \\
+        --agreement pi kappa --output shard-0.pickle
+    ...
+    $ segeval-shard merge dataset.json shard-*.pickle --output results.tsv
+
+Agreement is merged from the parts of each comparison of coders (numerators,
+denominators, potential boundaries, and boundaries per coder), which are
+reassembled in the order that a single run compares them, so merged
+coefficients are identical rather than merely close.  Each node (and the
+merge) loads the whole dataset; only the comparisons of its items are made.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import argparse
+import os
+import pickle
+import sys
+import zlib
+from collections import namedtuple
+from segeval.data import DataIOError, Dataset, FILETYPES, FILETYPE_JSON
+from segeval.agreement import (AGREEMENT_METRIC_DEFAULTS, __compare_kwargs__,
+                               __agreement_comparisons__, __agreement_parts__,
+                               actual_agreement_linear)
+from segeval.agreement.bias import artstein_poesio_bias_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.pi import fleiss_pi_linear
+from segeval.cli import (add_dataset_arguments, add_metric_arguments,
+                         add_output_arguments, load_dataset,
+                         metric_specifications, permuted_groups,
+                         write_summaries)
+from segeval.data.results import open_result_writer
+from segeval.parallel import evaluate, iter_pairs, DEFAULT_CHUNK_SIZE
+from segeval.util import SegmentationMetricError
+from segeval.util.checkpoint import run_fingerprint
+
+
+AGREEMENT_COEFFICIENTS = {
+    'actual': actual_agreement_linear,
+    'pi': fleiss_pi_linear,
+    'kappa': fleiss_kappa_linear,
+    'bias': artstein_poesio_bias_linear
+}
+'''
+Agreement coefficients that can be merged from shards, by name.
+'''
+
+Merged = namedtuple('Merged', 'rows values agreement')
+'''
+The results of merged shards: every :class:`segeval.parallel.Row` in the
+order that a single run produces them, the values of each metric keyed by
+``'item,hypothesis_coder,reference_coder'`` (see
+:func:`segeval.compute.summarize`), and each agreement coefficient by name.
+'''
+
+
+def shard_of(item, shards):
+    '''
+    Return the shard (from ``0`` to ``shards - 1``) that an item label is
+    assigned to.  Labels are hashed using CRC-32, which (unlike :func:`hash`)
+    is the same in every process and upon every machine.
+    '''
+    return (zlib.crc32(str(item).encode('utf-8')) & 0xffffffff) % shards
+
+
+def shard_dataset(dataset, shard, shards):
+    '''
+    Return a :class:`segeval.data.Dataset` of only the items of ``dataset``
+    assigned to ``shard``.
+    '''
+    return Dataset(dict((item, codings) for item, codings in dataset.items()
+                        if shard_of(item, shards) == shard),
+                   properties=dataset.properties,
+                   boundary_types=dataset.boundary_types,
+                   boundary_format=dataset.boundary_format)
+
+
+def __agreement_kwargs__(dataset, kwargs):
+    '''
+    Keyword arguments of agreement coefficients, as completed by
+    :func:`segeval.agreement.__fnc_metric__`.
+    '''
+    metric_kwargs = dict(AGREEMENT_METRIC_DEFAULTS)
+    metric_kwargs.update(kwargs)
+    metric_kwargs['boundary_types'] = dataset.boundary_types
+    metric_kwargs['boundary_format'] = dataset.boundary_format
+    return metric_kwargs
+
+
+def __fingerprint__(shards, reference, hypothesis, metrics, permuted,
+                    agreement, agreement_kwargs):
+    return run_fingerprint(run_shard, reference, hypothesis, shards=shards,
+                           metrics=metrics, permuted=permuted,
+                           agreement=sorted(agreement),
+                           agreement_kwargs=agreement_kwargs)
+
+
+def run_shard(shard, shards, reference, hypothesis=None, metrics=(),
+              permuted=None, agreement=(), processes=1,
+              chunk_size=DEFAULT_CHUNK_SIZE, **agreement_kwargs):
+    '''
+    Evaluate the items of one shard, returning a shard (a :func:`dict`) to
+    save using :func:`write_shard` and merge using :func:`merge_shards`.
+
+    :param shard: Shard to evaluate, from ``0`` to ``shards - 1``.
+    :param shards: Number of shards that the dataset is split into.
+    :param reference: Reference dataset (see :func:`iter_pairs`).
+    :param hypothesis: Hypothesis dataset, if any.
+    :param metrics: List of ``(name, options)`` tuples accepted by
+        :func:`segeval.metric.make_metric`.
+    :param permuted: Whether to compare reference coders in both orders;
+        by default, that of each metric (see
+        :func:`segeval.cli.permuted_groups`).
+    :param agreement: Names of agreement coefficients of ``reference`` to
+        merge (see :data:`AGREEMENT_COEFFICIENTS`).
+    :param processes: Number of worker processes (see
+        :func:`segeval.parallel.evaluate`).
+    :param agreement_kwargs: Keyword arguments of the agreement coefficients.
+    :type shard: int
+    :type shards: int
+    :type metrics: list
+    :type agreement: list
+    '''
+    if not 0 <= shard < shards:
+        raise SegmentationMetricError(
+            'Shard {0} is not within 0 to {1}'.format(shard, shards - 1))
+    for name in agreement:
+        if name not in AGREEMENT_COEFFICIENTS:
+            raise SegmentationMetricError(
+                'Unknown agreement coefficient: {0}'.format(name))
+    metrics = [(name, dict(options)) for name, options in metrics]
+    if hypothesis is not None:
+        groups = [(False, metrics)] if len(metrics) > 0 else list()
+    else:
+        groups = permuted_groups(metrics, permuted)
+    rows = list()
+    for group_index, (group_permuted, group) in enumerate(groups):
+        # Number each pair as a single run would, and keep those of this shard
+        if hypothesis is not None:
+            pairs = iter_pairs(hypothesis, reference)
+        else:
+            pairs = iter_pairs(reference, permuted=group_permuted)
+        indexed = [(index, pair) for index, pair in enumerate(pairs)
+                   if shard_of(pair.item, shards) == shard]
+        # Each pair yields a row per metric
+        rows.extend(((group_index, indexed[position // len(group)][0]), row)
+                    for position, row in enumerate(evaluate(
+                        [pair for _, pair in indexed], group, processes,
+                        chunk_size)))
+    parts = dict()
+    if len(agreement) > 0:
+        metric_kwargs = __agreement_kwargs__(reference, agreement_kwargs)
+        comparisons = [comparison for comparison in
+                       __agreement_comparisons__(reference)
+                       if shard_of(comparison[2], shards) == shard]
+        values = __agreement_parts__(
+            reference, comparisons, metric_kwargs['fnc_compare'],
+            __compare_kwargs__(metric_kwargs))
+        parts = dict((','.join((str(item), str(coder_m), str(coder_n))),
+                      part) for (coder_m, coder_n, item), part in
+                     zip(comparisons, values))
+    return {'shard': shard, 'shards': shards,
+            'fingerprint': __fingerprint__(
+                shards, reference, hypothesis, metrics, permuted, agreement,
+                agreement_kwargs),
+            'agreement': sorted(agreement),
+            'agreement_kwargs': agreement_kwargs,
+            'rows': rows, 'parts': parts}
+
+
+def write_shard(result, path):
+    '''
+    Save a shard returned by :func:`run_shard`.  The file is written under a
+    temporary name and then renamed, so that a node which is interrupted
+    never leaves a partial shard behind to be merged.
+    '''
+    temporary = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temporary, 'wb') as shard_file:
+        pickle.dump(result, shard_file, 2)
+    os.rename(temporary, path)
+
+
+def read_shard(path):
+    '''
+    Load a shard saved by :func:`write_shard`.
+    '''
+    try:
+        with open(path, 'rb') as shard_file:
+            return pickle.load(shard_file)
+    except (IOError, EOFError, pickle.UnpicklingError) as error:
+        raise DataIOError('Unable to read shard {0}: {1}'.format(path,
+                                                                error))
+
+
+def merge_shards(results, reference):
+    '''
+    Merge every shard of a run (as returned by :func:`run_shard` or
+    :func:`read_shard`, in any order) into a :class:`Merged` result identical
+    to that of evaluating the whole dataset at once.
+
+    :param results: Shards of one run.
+    :param reference: Reference dataset that the shards were evaluated upon,
+        from which the order of agreement comparisons is recovered.
+    :type results: list
+    '''
+    results = list(results)
+    if len(results) == 0:
+        raise DataIOError('No shards to merge')
+    first = results[0]
+    shards = first['shards']
+    found = set()
+    for result in results:
+        if result['shards'] != shards or \
+                result['fingerprint'] != first['fingerprint']:
+            raise DataIOError('Shard {0} is of a different run'.format(
+                result['shard']))
+        if result['shard'] in found:
+            raise DataIOError('Shard {0} was given more than once'.format(
+                result['shard']))
+        found.add(result['shard'])
+    missing = sorted(set(range(shards)) - found)
+    if len(missing) > 0:
+        raise DataIOError('Missing shards: {0}'.format(
+            ', '.join(str(shard) for shard in missing)))
+    # Restore the order in which a single run computes each row
+    indexed = sorted((row for result in results for row in result['rows']),
+                     key=lambda row: row[0])
+    rows = [row for _, row in indexed]
+    values = dict()
+    for row in rows:
+        key = ','.join((row.item, str(row.hypothesis_coder),
+                        str(row.reference_coder)))
+        values.setdefault(row.metric, dict())[key] = row.value
+    agreement = dict()
+    if len(first['agreement']) > 0:
+        merged_parts = dict()
+        for result in results:
+            merged_parts.update(result['parts'])
+        parts = list()
+        for coder_m, coder_n, item in __agreement_comparisons__(reference):
+            entry = ','.join((str(item), str(coder_m), str(coder_n)))
+            if entry not in merged_parts:
+                raise DataIOError(
+                    'No shard compared {0}; the reference dataset differs '
+                    'from that of the run'.format(entry))
+            parts.append(merged_parts[entry])
+        for name in first['agreement']:
+            agreement[name] = AGREEMENT_COEFFICIENTS[name](
+                reference, parts=parts, **first['agreement_kwargs'])
+    return Merged(rows, values, agreement)
+
+
+def parse_args(argv=None):
+    '''
+    Parse command-line arguments.
+    '''
+    parser = argparse.ArgumentParser(
+        prog='segeval-shard',
+        description='Evaluate one shard of a dataset, or merge shards.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    run = commands.add_parser('run', help='evaluate the items of one shard')
+    add_dataset_arguments(run)
+    add_metric_arguments(run)
+    run.add_argument('--shard', type=int, required=True,
+                     help='shard to evaluate, from 0')
+    run.add_argument('--shards', type=int, required=True,
+                     help='number of shards')
+    run.add_argument('--agreement', nargs='+', default=[],
+                     choices=sorted(AGREEMENT_COEFFICIENTS),
+                     help='agreement coefficients of the reference dataset')
+    run.add_argument('--processes', type=int, default=1,
+                     help='worker processes (default 1)')
+    run.add_argument('--output', required=True, help='shard file to write')
+    merge = commands.add_parser('merge', help='merge the shards of a run')
+    merge.add_argument('reference',
+                       help='reference dataset file or directory')
+    merge.add_argument('shards', nargs='+', help='shard files')
+    merge.add_argument('--filetype', default=FILETYPE_JSON,
+                       choices=sorted(FILETYPES),
+                       help='type of files to load from directories')
+    add_output_arguments(merge)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''
+    Evaluate one shard, or merge shards and write their results, then
+    summaries and agreement coefficients (to stderr), returning 1 upon error.
+    '''
+    args = parse_args(argv)
+    try:
+        if args.command == 'run':
+            reference = load_dataset(args.reference, args.filetype)
+            hypothesis = None
+            if args.hypothesis is not None:
+                hypothesis = load_dataset(args.hypothesis, args.filetype)
+            boundary_format = args.boundary_format or \
+                reference.boundary_format
+            agreement_kwargs = dict()
+            if args.n_t is not None:
+                agreement_kwargs['n_t'] = args.n_t
+            write_shard(run_shard(
+                args.shard, args.shards, reference, hypothesis,
+                metric_specifications(args, boundary_format), args.permuted,
+                args.agreement, args.processes, **agreement_kwargs),
+                args.output)
+            return 0
+        reference = load_dataset(args.reference, args.filetype)
+        merged = merge_shards([read_shard(path) for path in args.shards],
+                              reference)
+        with open_result_writer(args.output, args.output_format) as writer:
+            for row in merged.rows:
+                writer.write(row)
+    except (DataIOError, SegmentationMetricError, IOError) as error:
+        sys.stderr.write('segeval-shard: error: {0}\n'.format(error))
+        return 1
+    write_summaries(merged.values, sys.stderr)
+    for name in sorted(merged.agreement):
+        sys.stderr.write('{0}\t{1}\n'.format(name, merged.agreement[name]))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
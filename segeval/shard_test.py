@@ -0,0 +1,166 @@
+'''
+Tests sharded evaluation.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from segeval.util.test import TestCase
+import segeval
+from segeval.data import DataIOError
+from segeval.data.jsonutils import (input_linear_mass_json,
+                                    output_linear_mass_json)
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.agreement.bias import artstein_poesio_bias_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.pi import fleiss_pi_linear
+from segeval.parallel import evaluate, iter_pairs
+from segeval.shard import (main, merge_shards, read_shard, run_shard,
+                           shard_dataset, shard_of)
+
+
+METRICS = [('boundary_similarity', {'n_t': 2}), ('window_diff', {})]
+
+
+class TestShard(TestCase):
+
+    '''
+    Test sharded evaluation.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def __path__(self, name):
+        return os.path.join(self.directory, name)
+
+    def __run__(self, shards, **kwargs):
+        return [run_shard(shard, shards, KAZANTSEVA2012_G5, **kwargs)
+                for shard in range(shards)]
+
+    def test_shard_of(self):
+        '''
+        Test that items are assigned to shards stably and completely.
+        '''
+        self.assertEqual(shard_of('item1', 4), shard_of(u'item1', 4))
+        items = set()
+        for shard in range(3):
+            items.update(shard_dataset(KAZANTSEVA2012_G5, shard, 3).keys())
+        self.assertEqual(set(KAZANTSEVA2012_G5.keys()), items)
+
+    def test_merge(self):
+        '''
+        Test that merged shards equal a single run.
+        '''
+        merged = merge_shards(reversed(self.__run__(
+            3, metrics=METRICS, agreement=['pi', 'kappa', 'bias'])),
+            KAZANTSEVA2012_G5)
+        # WD compares reference coders in both orders by default
+        self.assertEqual(
+            list(evaluate(iter_pairs(KAZANTSEVA2012_G5), METRICS[:1])) +
+            list(evaluate(iter_pairs(KAZANTSEVA2012_G5, permuted=True),
+                          METRICS[1:])), merged.rows)
+        self.assertEqual(fleiss_pi_linear(KAZANTSEVA2012_G5),
+                         merged.agreement['pi'])
+        self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5),
+                         merged.agreement['kappa'])
+        self.assertEqual(artstein_poesio_bias_linear(KAZANTSEVA2012_G5),
+                         merged.agreement['bias'])
+        merged = merge_shards(self.__run__(3, metrics=METRICS, permuted=False),
+                              KAZANTSEVA2012_G5)
+        self.assertEqual(list(evaluate(iter_pairs(KAZANTSEVA2012_G5),
+                                       METRICS)), merged.rows)
+
+    def test_merge_options(self):
+        '''
+        Test that agreement options are applied when merging.
+        '''
+        merged = merge_shards(self.__run__(2, agreement=['kappa'], n_t=3),
+                              KAZANTSEVA2012_G5)
+        self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5, n_t=3),
+                         merged.agreement['kappa'])
+        self.assertEqual(dict(), merged.values)
+
+    def test_merge_errors(self):
+        '''
+        Test that incomplete or mismatched shards are not merged.
+        '''
+        results = self.__run__(3, metrics=METRICS)
+        try:
+            merge_shards(results[1:], KAZANTSEVA2012_G5)
+            self.fail('Expected a DataIOError')
+        except DataIOError as error:
+            self.assertEqual('Missing shards: 0', str(error))
+        self.assertRaises(DataIOError, merge_shards,
+                          results + results[:1], KAZANTSEVA2012_G5)
+        other = run_shard(0, 3, KAZANTSEVA2012_G5, metrics=METRICS[:1])
+        self.assertRaises(DataIOError, merge_shards,
+                          [other] + results[1:], KAZANTSEVA2012_G5)
+
+    def test_main(self):
+        '''
+        Test running and merging shards using files.
+        '''
+        dataset_path = self.__path__('dataset.json')
+        output_linear_mass_json(dataset_path, KAZANTSEVA2012_G5)
+        paths = [self.__path__('shard-{0}.pickle'.format(shard))
+                 for shard in range(2)]
+        for shard, path in enumerate(paths):
+            self.assertEqual(0, main(['run', dataset_path, '--shard',
+                                      str(shard), '--shards', '2',
+                                      '--metrics', 'B', '--agreement', 'pi',
+                                      '--output', path]))
+        self.assertEqual(0, read_shard(paths[0])['shard'])
+        stderr = sys.stderr
+        sys.stderr = open(self.__path__('stderr'), 'w')
+        try:
+            status = main(['merge', dataset_path] + paths +
+                          ['--output', self.__path__('results.tsv')])
+        finally:
+            sys.stderr.close()
+            sys.stderr = stderr
+        self.assertEqual(0, status)
+        with open(self.__path__('stderr')) as summaries:
+            lines = summaries.read().splitlines()
+        self.assertEqual('pi\t{0}'.format(fleiss_pi_linear(KAZANTSEVA2012_G5)),
+                         lines[-1])
+        with open(self.__path__('results.tsv')) as results:
+            self.assertEqual(1 + len(list(iter_pairs(KAZANTSEVA2012_G5))),
+                             len(results.read().splitlines()))
+
+    def test_hash_seeds(self):
+        '''
+        Test merging shards run by processes with differing hash seeds.
+        '''
+        dataset_path = os.path.join(os.path.dirname(__file__), 'data',
+                                    'hearst1997.json')
+        directory = os.path.dirname(os.path.dirname(segeval.__file__))
+
+        def __shard__(seed, *args):
+            environment = dict(os.environ, PYTHONHASHSEED=str(seed))
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'segeval.shard'] + list(args),
+                cwd=directory, env=environment, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, universal_newlines=True)
+            stderr = process.communicate()[1]
+            self.assertEqual(0, process.returncode, stderr)
+            return stderr.splitlines()
+
+        paths = [self.__path__('shard-{0}.pickle'.format(shard))
+                 for shard in range(3)]
+        for shard, path in enumerate(paths):
+            __shard__(10 + shard, 'run', dataset_path, '--shard', str(shard),
+                      '--shards', '3', '--agreement', 'pi',
+                      '--output', path)
+        lines = __shard__(0, 'merge', dataset_path, *paths + [
+            '--output', self.__path__('results.tsv')])
+        dataset = input_linear_mass_json(dataset_path)
+        self.assertEqual('pi\t{0}'.format(fleiss_pi_linear(dataset)),
+                         lines[-1])
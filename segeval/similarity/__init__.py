@@ -5,29 +5,42 @@ Similarity utility functions based upon boundary edit distance.
 '''
 from __future__ import absolute_import, division
 from segeval.similarity.distance import identify_types
-from segeval.similarity.distance.multipleboundary import boundary_edit_distance
+from segeval.similarity.distance.multipleboundary import (
+    boundary_edit_distance, memoized_boundary_edit_distance)
 from segeval.similarity.weight import weight_a, weight_s_scale, weight_t_scale
 from segeval.metric import METRIC_DEFAULTS
 from segeval.ml import ConfusionMatrix as cm
 from segeval.format import (BoundaryFormat, boundary_string_from_masses,
                             convert_positions_to_masses, convert_nltk_to_masses)
 from segeval.util import __fnc_metric__, SegmentationMetricError
+from segeval.util.lang import enum
 
 
+Detail = enum(full='full', counts='counts')
+
 SIMILARITY_METRIC_DEFAULTS = dict(METRIC_DEFAULTS)
 SIMILARITY_METRIC_DEFAULTS.update({
     'n_t': 2,
     'boundary_types': None,
-    'weight': (weight_a, weight_s_scale, weight_t_scale)
+    'weight': (weight_a, weight_s_scale, weight_t_scale),
+    'detail': Detail.full
 })
 
 
-def __boundary_statistics__(
-        segs_a, segs_b, boundary_types, boundary_format, n_t, weight):
+def __type_range__(boundary_types):
     '''
-    Compute boundary similarity applying the weighting functions specified.
+    Maximum and minimum boundary types, or ``(1, 1)`` if neither segmentation
+    contains a boundary (and so there are no substitutions to weight).
     '''
+    if len(boundary_types) == 0:
+        return 1, 1
+    return max(boundary_types), min(boundary_types)
 
+
+def __boundary_strings__(segs_a, segs_b, boundary_format):
+    '''
+    Convert a pair of segmentations into boundary strings of equal length.
+    '''
     # Convert from NLTK types
     if boundary_format == BoundaryFormat.nltk:
         segs_a = convert_nltk_to_masses(segs_a)
@@ -51,19 +64,49 @@ def __boundary_statistics__(
         raise SegmentationMetricError(
             'Segmentations differ in length ({0} != {1})'.format(
                 len(segs_a), len(segs_b)))
+    return segs_a, segs_b
+
+
+def __boundary_statistics__(
+        segs_a, segs_b, boundary_types, boundary_format, n_t, weight,
+        detail=Detail.full):
+    '''
+    Compute boundary similarity applying the weighting functions specified.
+
+    With ``detail=Detail.counts``, edits and matches are returned as integer
+    counts and ``full_misses`` is omitted, which avoids materializing
+    addition edits and match lists.
+    '''
+
+    segs_a, segs_b = __boundary_strings__(segs_a, segs_b, boundary_format)
     # Determine the boundary types
     boundary_types = identify_types(segs_a, segs_b)
+    if detail == Detail.counts:
+        return __boundary_statistics_counts__(segs_a, segs_b, boundary_types,
+                                              n_t, weight)
+    elif detail != Detail.full:
+        raise SegmentationMetricError('Unsupported detail; expected \
+Detail.full or Detail.counts')
+    # Compute edits
+    edits = memoized_boundary_edit_distance(segs_a, segs_b, n_t=n_t)
+    return __boundary_statistics_full__(segs_a, segs_b, boundary_types, n_t,
+                                        weight, edits)
+
+
+def __boundary_statistics_full__(segs_a, segs_b, boundary_types, n_t, weight,
+                                 edits):
+    '''
+    Compute weighted edit totals, matches, and misses between two boundary
+    strings given the edits between them.
+    '''
+    additions, substitutions, transpositions = edits
     # Calculate the total pbs
     pbs = len(segs_b) * len(boundary_types)
-    # Compute edits
-    additions, substitutions, transpositions = \
-        boundary_edit_distance(segs_a, segs_b, n_t=n_t)
     # Apply weighting functions
     fnc_weight_a, fnc_weight_s, fnc_weight_t = weight
     count_additions = fnc_weight_a(additions)
     count_substitutions = fnc_weight_s(substitutions,
-                                       max(boundary_types),
-                                       min(boundary_types))
+                                       *__type_range__(boundary_types))
     count_transpositions = fnc_weight_t(transpositions, n_t)
     count_edits = count_additions + count_substitutions + count_transpositions
     # Compute
@@ -80,6 +123,44 @@ def __boundary_statistics__(
             'matches': matches, 'pbs': pbs, 'boundary_types': boundary_types}
 
 
+def __boundary_statistics_counts__(segs_a, segs_b, boundary_types, n_t,
+                                   weight):
+    '''
+    Compute edit and match counts, and weighted edit totals, between two
+    boundary strings without constructing per-edit objects.
+    '''
+
+    fnc_weight_a, fnc_weight_s, fnc_weight_t = weight
+    # Addition edits are only required by custom weighting functions
+    count_only = fnc_weight_a is weight_a
+    additions, substitutions, transpositions = \
+        memoized_boundary_edit_distance(segs_a, segs_b, n_t=n_t,
+                                        count_additions=count_only)
+    # Apply weighting functions
+    if count_only:
+        count_additions = additions
+    else:
+        count_additions = fnc_weight_a(additions)
+        additions = len(additions)
+    count_substitutions = fnc_weight_s(substitutions,
+                                       *__type_range__(boundary_types))
+    count_transpositions = fnc_weight_t(transpositions, n_t)
+    count_edits = count_additions + count_substitutions + count_transpositions
+    # Compute
+    matches = 0
+    boundaries_all = 0
+    for set_a, set_b in zip(segs_a, segs_b):
+        if set_a or set_b:
+            matches += len(set_a & set_b)
+            boundaries_all += len(set_a) + len(set_b)
+    return {'count_edits': count_edits, 'additions': additions,
+            'substitutions': len(substitutions),
+            'transpositions': len(transpositions),
+            'boundaries_all': boundaries_all, 'matches': matches,
+            'pbs': len(segs_b) * len(boundary_types),
+            'boundary_types': boundary_types}
+
+
 def __boundary_confusion_matrix__(*args, **kwargs):
     '''
     Create a confusion matrix using boundary edit distance.
@@ -89,6 +170,8 @@ def __boundary_confusion_matrix__(*args, **kwargs):
     metric_kwargs = dict(kwargs)
     del metric_kwargs['return_parts']
     del metric_kwargs['one_minus']
+    # Individual edits are required to populate the matrix
+    metric_kwargs['detail'] = Detail.full
     # Obtain statistics
     statistics = __boundary_statistics__(*args, **metric_kwargs)
     # Get parameters
@@ -4,7 +4,8 @@ Boundary Similarity (B) package.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import, division
-from segeval.similarity import __boundary_statistics__, SIMILARITY_METRIC_DEFAULTS
+from segeval.similarity import (__boundary_statistics__, Detail,
+                                SIMILARITY_METRIC_DEFAULTS)
 from segeval.util import __fnc_metric__
 from decimal import Decimal
 
@@ -19,12 +20,28 @@ def __boundary_similarity__(*args, **kwargs):
     one_minus = kwargs['one_minus']
     # Compute
     statistics = __boundary_statistics__(*args, **metric_kwargs)
+    return __boundary_similarity_fraction__(statistics,
+                                            metric_kwargs['detail'],
+                                            return_parts, one_minus)
+
+
+def __boundary_similarity_fraction__(statistics, detail, return_parts,
+                                     one_minus):
+    '''
+    Compute B from boundary statistics.
+    '''
     additions = statistics['additions']
     substitutions = statistics['substitutions']
     transpositions = statistics['transpositions']
-    count_unweighted = len(additions) + len(substitutions) + len(transpositions)
+    if detail == Detail.counts:
+        count_unweighted = additions + substitutions + transpositions
+        count_matches = statistics['matches']
+    else:
+        count_unweighted = len(additions) + len(substitutions) + \
+            len(transpositions)
+        count_matches = len(statistics['matches'])
     # Fraction
-    denominator = count_unweighted + len(statistics['matches'])
+    denominator = count_unweighted + count_matches
     numerator = denominator - statistics['count_edits']
     if return_parts:
         return numerator, denominator, additions, substitutions, transpositions
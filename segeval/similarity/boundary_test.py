@@ -6,6 +6,7 @@ Tests boundary similarity (B).
 from __future__ import absolute_import
 import unittest
 from decimal import Decimal
+from segeval.similarity import Detail
 from segeval.similarity.boundary import boundary_similarity
 from segeval.similarity.weight import weight_a, weight_s, weight_t
 from segeval.util import SegmentationMetricError
@@ -113,6 +114,37 @@ class TestBoundary(unittest.TestCase):
                                     weight=(weight_a, weight_s, weight_t))
         self.assertEqual(0.5, value)
 
+    def test_detail_counts(self):
+        '''
+        Test that counts-only statistics produce the same values.
+        '''
+        self.assertEqual(
+            boundary_similarity(MULTIPLE_BOUNDARY_TYPES),
+            boundary_similarity(MULTIPLE_BOUNDARY_TYPES, detail=Detail.counts))
+        weight = (weight_a, weight_s, weight_t)
+        self.assertEqual(
+            boundary_similarity(MULTIPLE_BOUNDARY_TYPES, weight=weight),
+            boundary_similarity(MULTIPLE_BOUNDARY_TYPES, weight=weight,
+                                detail=Detail.counts))
+
+    def test_detail_counts_return_parts(self):
+        '''
+        Test that counts-only statistics return edit counts as parts.
+        '''
+        value = boundary_similarity([2, 3, 6], [5, 6], return_parts=True)
+        self.assertEqual((Decimal('1'), 2, [(1, 'a')], [], []), value)
+        value = boundary_similarity([2, 3, 6], [5, 6], return_parts=True,
+                                    detail=Detail.counts)
+        self.assertEqual((Decimal('1'), 2, 1, 0, 0), value)
+
+    def test_no_boundaries(self):
+        '''
+        Test segmentations that both lack boundaries.
+        '''
+        self.assertEqual(1, boundary_similarity([5], [5]))
+        self.assertEqual(1, boundary_similarity([5], [5],
+                                                detail=Detail.counts))
+
     def test_multiple_boundary_types(self):
         '''
         Test multiple boundary types with auto boundary type identification.
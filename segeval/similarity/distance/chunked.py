@@ -0,0 +1,151 @@
+'''
+Boundary edit distance (and Boundary Similarity) of a single, extremely long
+pair of boundary strings computed in independent chunks, optionally using a
+pool of worker processes.
+
+A transposition only joins two positions that both differ between the
+strings, and that are fewer than ``n_t`` positions apart, while additions
+and substitutions are found per position.  The strings can therefore be cut
+between any two consecutive differing positions that are at least ``n_t``
+positions apart, and the edits of each chunk are exactly those that
+:func:`segeval.similarity.distance.multipleboundary.boundary_edit_distance`
+would find within it.  Merged edits are identical, including their order.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import multiprocessing
+from segeval.similarity.distance.multipleboundary import (
+    Transposition, __boundary_edit_distance__)
+
+
+DEFAULT_MIN_CHUNK_SIZE = 10000
+'''
+Minimum number of positions per chunk; smaller chunks cost more to send to
+workers than to compare.
+'''
+
+
+def chunk_ranges(boundary_string_a, boundary_string_b, n_t=2,
+                 min_chunk_size=DEFAULT_MIN_CHUNK_SIZE):
+    '''
+    Return the ``(start, end)`` ranges of positions into which a pair of
+    boundary strings can be cut without changing their edits, each of at
+    least ``min_chunk_size`` positions (other than the last) where possible.
+    '''
+    ranges = list()
+    start = 0
+    previous = None
+    for position, (set_a, set_b) in enumerate(zip(boundary_string_a,
+                                                  boundary_string_b)):
+        if set_a == set_b:
+            continue
+        # No transposition can join this position with the previous one
+        if previous is not None and position - previous >= n_t and \
+                position - start >= min_chunk_size:
+            ranges.append((start, position))
+            start = position
+        previous = position
+    ranges.append((start, len(boundary_string_a)))
+    return ranges
+
+
+def __chunk_edits__(arguments):
+    '''
+    Compute the edits of one chunk, offsetting the positions of its
+    transpositions by its start.
+    '''
+    boundary_string_a, boundary_string_b, n_t, count_additions, start = \
+        arguments
+    additions, substitutions, transpositions = __boundary_edit_distance__(
+        boundary_string_a, boundary_string_b, range(2, n_t + 1),
+        count_additions=count_additions)
+    return additions, substitutions, [
+        Transposition(transposition.start + start, transposition.end + start,
+                      transposition.type)
+        for transposition in transpositions]
+
+
+def chunked_boundary_edit_distance(boundary_string_a, boundary_string_b,
+                                   n_t=2, processes=1,
+                                   min_chunk_size=DEFAULT_MIN_CHUNK_SIZE,
+                                   count_additions=False):
+    '''
+    Compute boundary edit distance as per
+    :func:`segeval.similarity.distance.multipleboundary.boundary_edit_distance`
+    by cutting the boundary strings into independent chunks (see
+    :func:`chunk_ranges`), comparing them using ``processes`` worker processes
+    (or ``None`` for one per CPU; with one, chunks are compared within the
+    calling process), and merging their edits.
+
+    :param count_additions: return the number of additions instead of a \
+        list of :class:`Addition` edits
+    :type n_t: int
+    :type processes: int
+    :type min_chunk_size: int
+    :type count_additions: bool
+    '''
+    boundary_string_a = tuple(frozenset(position)
+                              for position in boundary_string_a)
+    boundary_string_b = tuple(frozenset(position)
+                              for position in boundary_string_b)
+    chunks = [(boundary_string_a[start:end], boundary_string_b[start:end],
+               n_t, count_additions, start) for start, end in
+              chunk_ranges(boundary_string_a, boundary_string_b, n_t,
+                           min_chunk_size)]
+    if processes == 1 or len(chunks) == 1:
+        results = [__chunk_edits__(chunk) for chunk in chunks]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(__chunk_edits__, chunks)
+            pool.close()
+        except BaseException:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    additions = 0 if count_additions else list()
+    substitutions = list()
+    transpositions = list()
+    for chunk_additions, chunk_substitutions, chunk_transpositions in results:
+        additions += chunk_additions
+        substitutions.extend(chunk_substitutions)
+        transpositions.extend(chunk_transpositions)
+    # Transpositions are found by span, and then by start (a stable sort
+    # preserves the order of those of the same span and start)
+    transpositions.sort(key=lambda transposition: (
+        transposition.end - transposition.start, transposition.start))
+    return additions, substitutions, transpositions
+
+
+def chunked_boundary_similarity(hypothesis, reference, n_t=2, processes=1,
+                                min_chunk_size=DEFAULT_MIN_CHUNK_SIZE,
+                                **kwargs):
+    '''
+    Boundary Similarity (B) of one pair of segmentations, with edits computed
+    by :func:`chunked_boundary_edit_distance`.  Accepts the keyword arguments
+    of :func:`segeval.boundary_similarity` (other than ``detail``), and
+    returns the same value (or parts).
+    '''
+    from segeval.similarity import (
+        SIMILARITY_METRIC_DEFAULTS, Detail, __boundary_strings__,
+        __boundary_statistics_full__)
+    from segeval.similarity.boundary import __boundary_similarity_fraction__
+    from segeval.similarity.distance import identify_types
+    metric_kwargs = dict(SIMILARITY_METRIC_DEFAULTS)
+    metric_kwargs.update(kwargs)
+    if isinstance(hypothesis, int):
+        hypothesis = (hypothesis,)
+    if isinstance(reference, int):
+        reference = (reference,)
+    segs_a, segs_b = __boundary_strings__(hypothesis, reference,
+                                          metric_kwargs['boundary_format'])
+    edits = chunked_boundary_edit_distance(segs_a, segs_b, n_t, processes,
+                                           min_chunk_size)
+    statistics = __boundary_statistics_full__(
+        segs_a, segs_b, identify_types(segs_a, segs_b), n_t,
+        metric_kwargs['weight'], edits)
+    return __boundary_similarity_fraction__(
+        statistics, Detail.full, metric_kwargs['return_parts'],
+        metric_kwargs['one_minus'])
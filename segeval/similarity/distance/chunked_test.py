@@ -0,0 +1,92 @@
+'''
+Tests chunked boundary edit distance.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import random
+import unittest
+from segeval.format import BoundaryFormat
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.distance.chunked import (
+    chunk_ranges, chunked_boundary_edit_distance, chunked_boundary_similarity)
+from segeval.similarity.distance.multipleboundary import boundary_edit_distance
+
+
+def __random_string__(rnd, length, types, probability):
+    return tuple(frozenset(boundary_type for boundary_type in types
+                           if rnd.random() < probability)
+                 for _ in range(length))
+
+
+class TestChunked(unittest.TestCase):
+
+    '''
+    Test chunked boundary edit distance.
+    '''
+
+    def test_chunk_ranges(self):
+        '''
+        Test that strings are only cut where transpositions cannot span.
+        '''
+        a = [set([1]), set(), set(), set(), set([1]), set(), set([1])]
+        b = [set(), set([1]), set(), set(), set(), set([1]), set()]
+        self.assertEqual([(0, 4), (4, 7)], chunk_ranges(a, b, 2, 1))
+        self.assertEqual([(0, 7)], chunk_ranges(a, b, 4, 1))
+        self.assertEqual([(0, 7)], chunk_ranges(a, b, 2, 5))
+
+    def test_edit_distance(self):
+        '''
+        Test that merged edits equal those of whole random strings.
+        '''
+        rnd = random.Random(13)
+        for _ in range(500):
+            length = rnd.randint(1, 50)
+            types = range(1, rnd.randint(1, 3) + 1)
+            probability = rnd.choice([0.05, 0.2, 0.5])
+            a = __random_string__(rnd, length, types, probability)
+            b = __random_string__(rnd, length, types, probability)
+            n_t = rnd.randint(2, 5)
+            self.assertEqual(
+                boundary_edit_distance(a, b, n_t),
+                chunked_boundary_edit_distance(a, b, n_t,
+                                               min_chunk_size=2))
+
+    def test_processes(self):
+        '''
+        Test comparing chunks using worker processes.
+        '''
+        rnd = random.Random(7)
+        a = __random_string__(rnd, 5000, [1, 2], 0.05)
+        b = __random_string__(rnd, 5000, [1, 2], 0.05)
+        self.assertTrue(len(chunk_ranges(a, b, 2, 500)) > 1)
+        self.assertEqual(
+            boundary_edit_distance(a, b, 2),
+            chunked_boundary_edit_distance(a, b, 2, processes=2,
+                                           min_chunk_size=500))
+        additions = chunked_boundary_edit_distance(
+            a, b, 2, min_chunk_size=500, count_additions=True)[0]
+        self.assertEqual(len(boundary_edit_distance(a, b, 2)[0]), additions)
+
+    def test_boundary_similarity(self):
+        '''
+        Test that chunked B equals B.
+        '''
+        for codings in KAZANTSEVA2012_G5.values():
+            hypothesis, reference = codings['an1'], codings['an2']
+            for n_t in (2, 3):
+                self.assertEqual(
+                    boundary_similarity(hypothesis, reference, n_t=n_t),
+                    chunked_boundary_similarity(hypothesis, reference,
+                                                n_t=n_t, min_chunk_size=1))
+        a = tuple(frozenset(position) for position in
+                  ((1, 2), (), (2,), (), (1,)))
+        b = tuple(frozenset(position) for position in
+                  ((), (1,), (1,), (), ()))
+        self.assertEqual(
+            boundary_similarity(a, b, boundary_format=BoundaryFormat.sets,
+                                return_parts=True),
+            chunked_boundary_similarity(a, b, min_chunk_size=1,
+                                        boundary_format=BoundaryFormat.sets,
+                                        return_parts=True))
@@ -4,8 +4,11 @@ Multiple-boundary edit distance.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import, division
-from itertools import permutations
+import hashlib
+import threading
 from collections import namedtuple
+from contextlib import contextmanager
+from segeval.util.cache import LruMemo
 
 
 Addition = namedtuple('Addition', 'type side')  # For side; a = from a, b = from b
@@ -13,6 +16,14 @@ Substitution = namedtuple('Substitution', 'type_a type_b')
 Transposition = namedtuple('Transposition', 'start end type')
 Difference = namedtuple('Difference', 'sim a_b b_a')
 
+DEFAULT_EDIT_MEMO_BYTES = 16 * 1024 * 1024
+'''
+Approximate bytes of edits that :func:`memoize_edits` holds by default.
+'''
+
+# Memos of edits opened by memoize_edits within each thread, innermost last
+__edit_memos__ = threading.local()
+
 
 def __additions_substitutions__(d, a, b):
     '''
@@ -32,6 +43,95 @@ def __additions_substitutions__(d, a, b):
     return additions, substitutions
 
 
+def __optimal_substitutions__(a, b):
+    '''
+    Find the pairs of boundary types from ``a`` and ``b`` (as many as the
+    smaller set contains) whose total absolute difference is minimal.
+
+    On a line, an optimal pairing can always be found that pairs the chosen
+    types of each set in sorted order, so costs are computed by dynamic
+    programming over sorted types rather than by enumerating permutations.
+    Ties are broken as an exhaustive search over the permutations of
+    ``sorted(a)`` and ``sorted(b)`` would break them: by the lexicographically
+    smallest sorted types chosen from ``a``, then from ``b``.
+    '''
+    sorted_a = sorted(a)
+    sorted_b = sorted(b)
+    len_a = len(sorted_a)
+    len_b = len(sorted_b)
+    pairs = min(len_a, len_b)
+    if pairs == 0:
+        return list()
+    # Minimum cost of k in-order pairs from sorted_a[i:] and sorted_b[j:]
+    costs = dict()
+
+    def __cost__(i, j, k):
+        if k == 0:
+            return 0
+        if len_a - i < k or len_b - j < k:
+            return None
+        key = (i, j, k)
+        if key not in costs:
+            options = [__cost__(i + 1, j, k), __cost__(i, j + 1, k)]
+            paired = __cost__(i + 1, j + 1, k - 1)
+            if paired is not None:
+                options.append(abs(sorted_a[i] - sorted_b[j]) + paired)
+            options = [option for option in options if option is not None]
+            costs[key] = min(options) if len(options) > 0 else None
+        return costs[key]
+    optimum = __cost__(0, 0, pairs)
+    # Choose the smallest types of a that permit an optimal pairing, keeping
+    # every (next b index, cost so far) state that does so
+    chosen_a = list()
+    states = set([(0, 0)])
+    start_a = 0
+    for k in range(pairs, 0, -1):
+        for i in range(start_a, len_a):
+            next_states = set()
+            for j_start, cost in states:
+                for j in range(j_start, len_b):
+                    remaining = __cost__(i + 1, j + 1, k - 1)
+                    pair_cost = cost + abs(sorted_a[i] - sorted_b[j])
+                    if remaining is not None and \
+                            pair_cost + remaining == optimum:
+                        next_states.add((j + 1, pair_cost))
+            if len(next_states) > 0:
+                chosen_a.append(sorted_a[i])
+                states = next_states
+                start_a = i + 1
+                break
+    # Choose the smallest types of b that optimally pair with those chosen
+    costs_b = dict()
+
+    def __cost_b__(t, j):
+        if t == pairs:
+            return 0
+        if len_b - j < pairs - t:
+            return None
+        key = (t, j)
+        if key not in costs_b:
+            options = [__cost_b__(t, j + 1)]
+            paired = __cost_b__(t + 1, j + 1)
+            if paired is not None:
+                options.append(abs(chosen_a[t] - sorted_b[j]) + paired)
+            options = [option for option in options if option is not None]
+            costs_b[key] = min(options) if len(options) > 0 else None
+        return costs_b[key]
+    substitutions = list()
+    j = 0
+    for t in range(0, pairs):
+        target = __cost_b__(t, j)
+        while True:
+            paired = __cost_b__(t + 1, j + 1)
+            if paired is not None and \
+                    abs(chosen_a[t] - sorted_b[j]) + paired == target:
+                break
+            j += 1
+        substitutions.append((chosen_a[t], sorted_b[j]))
+        j += 1
+    return substitutions
+
+
 def __additions_substitutions_sets__(d, a, b):
     '''
     Compute the sets of additions and substitutions for a given pair of
@@ -45,17 +145,7 @@ def __additions_substitutions_sets__(d, a, b):
     :type b: set
     '''
 
-    substitutions = list()
-    delta = None
-    for perm_a in permutations(sorted(a)):
-        for perm_b in permutations(sorted(b)):
-            current_substitutions = zip(perm_a, perm_b)
-            current_substitutions = set(current_substitutions)
-            current_delta = sum(abs(a_i - b_i)
-                                for a_i, b_i in current_substitutions)
-            if delta is None or current_delta < delta:
-                delta = current_delta
-                substitutions = current_substitutions
+    substitutions = __optimal_substitutions__(a, b)
     # Collect all substitutions
     substituted = list()
     added = list()
@@ -178,14 +268,18 @@ def __optional_set_edits__(boundary_string_a, boundary_string_b):
     return options_set
 
 
-def __boundary_edit_distance__(boundary_string_a, boundary_string_b, n_t):
+def __boundary_edit_distance__(boundary_string_a, boundary_string_b, n_t,
+                               count_additions=False):
     '''
     Identify the minimum set of additions, substitutions, and transpositions
     that could be applied between two boundary strings for a given set
     of transpositions spanning lengths 'n_t'.
 
     :param n_t: transposition spanning sizes allowed
+    :param count_additions: return the number of additions instead of a \
+        list of :class:`Addition` edits
     :type n_t:  list or set
+    :type count_additions: bool
     '''
 
     # Find potential addition/deletion/substitution operations
@@ -195,12 +289,19 @@ def __boundary_edit_distance__(boundary_string_a, boundary_string_b, n_t):
     transpositions = __transpositions__(boundary_string_a,
                                         boundary_string_b, n_t, options_set)
     # Construct additions and substitutions
-    additions = list()
+    additions = 0 if count_additions else list()
     substitutions = list()
     for option in options_set.values():
+        if count_additions and not (option.a_b and option.b_a):
+            # Without boundaries on both sides, there is nothing to substitute
+            additions += len(option.sim)
+            continue
         current_additions, current_substitutions = \
             __additions_substitutions_sets__(option.sim, option.a_b, option.b_a)
-        additions.extend(current_additions)
+        if count_additions:
+            additions += len(current_additions)
+        else:
+            additions.extend(current_additions)
         substitutions.extend(current_substitutions)
     # Return
     return additions, substitutions, transpositions
@@ -223,3 +324,112 @@ def boundary_edit_distance(boundary_string_a, boundary_string_b, n_t=2):
 
     n_t = range(2, n_t + 1)
     return __boundary_edit_distance__(boundary_string_a, boundary_string_b, n_t)
+
+
+def __edits_size__(edits):
+    '''
+    Estimate the bytes held by a tuple of edits.
+    '''
+    additions, substitutions, transpositions = edits
+    count = len(substitutions) + len(transpositions)
+    if not isinstance(additions, int):
+        count += len(additions)
+    # An edit tuple of small integers and its list slot
+    return 256 + 72 * count
+
+
+def __pair_digest__(boundary_string_a, boundary_string_b):
+    '''
+    Digest a pair of boundary strings, so that memoized edits do not hold
+    references to the strings themselves.
+    '''
+    digest = hashlib.sha1()
+    for boundary_string in (boundary_string_a, boundary_string_b):
+        digest.update(';'.join(','.join(str(boundary_type) for boundary_type
+                                        in sorted(position))
+                               for position in boundary_string)
+                      .encode('utf-8'))
+        digest.update(b'|')
+    return digest.hexdigest()
+
+
+def edit_memo(max_bytes=DEFAULT_EDIT_MEMO_BYTES):
+    '''
+    Create a memo of edits totalling at most about ``max_bytes``, to use
+    within :func:`memoize_edits`.
+    '''
+    return LruMemo(max_size=float('inf'), max_bytes=max_bytes,
+                   fnc_size=__edits_size__)
+
+
+@contextmanager
+def memoize_edits(max_bytes=DEFAULT_EDIT_MEMO_BYTES, memo=None):
+    '''
+    Within this context (and thread), BED-based metrics reuse the edits of
+    pairs already compared within it, e.g., so that computing B, S, and a
+    confusion matrix of the same pairs computes their edits once::
+
+        with memoize_edits():
+            boundary_similarity(dataset)
+            boundary_confusion_matrix(dataset)
+
+    Memoized edits total at most about ``max_bytes``, and are discarded when
+    the context exits.  Alternatively, edits are held in ``memo`` (see
+    :func:`edit_memo`) and kept when the context exits, e.g., to reuse them
+    between contexts of a long-running process.  Yields the
+    :class:`segeval.util.cache.LruMemo` used.
+    '''
+    owned = memo is None
+    if owned:
+        memo = edit_memo(max_bytes)
+    memos = getattr(__edit_memos__, 'memos', None)
+    if memos is None:
+        memos = __edit_memos__.memos = list()
+    memos.append(memo)
+    try:
+        yield memo
+    finally:
+        memos.pop()
+        if owned:
+            memo.clear()
+
+
+def memoized_boundary_edit_distance(boundary_string_a, boundary_string_b,
+                                    n_t=2, count_additions=False):
+    '''
+    Computes boundary edit distance as per :func:`boundary_edit_distance`,
+    reusing the edits of pairs already compared by any metric within
+    :func:`memoize_edits` (if any).  Returned lists are copies that may be
+    modified.
+
+    :param count_additions: return the number of additions instead of a \
+        list of :class:`Addition` edits
+    :type count_additions: bool
+    '''
+    boundary_string_a = tuple(frozenset(position)
+                              for position in boundary_string_a)
+    boundary_string_b = tuple(frozenset(position)
+                              for position in boundary_string_b)
+    memos = getattr(__edit_memos__, 'memos', None)
+    if not memos:
+        return __boundary_edit_distance__(boundary_string_a,
+                                          boundary_string_b,
+                                          range(2, n_t + 1),
+                                          count_additions=count_additions)
+    memo = memos[-1]
+    key = (__pair_digest__(boundary_string_a, boundary_string_b), n_t)
+    found, edits = memo.get(key + (False,))
+    if not found and count_additions:
+        found, edits = memo.get(key + (True,))
+    if not found:
+        edits = __boundary_edit_distance__(boundary_string_a,
+                                           boundary_string_b,
+                                           range(2, n_t + 1),
+                                           count_additions=count_additions)
+        memo.set(key + (count_additions,), edits)
+    additions, substitutions, transpositions = edits
+    if count_additions and not isinstance(additions, int):
+        additions = len(additions)
+    elif not count_additions:
+        additions = list(additions)
+    return additions, list(substitutions), list(transpositions)
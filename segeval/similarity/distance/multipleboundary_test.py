@@ -6,7 +6,9 @@ Tests multiple-boundary edit distance.
 from __future__ import absolute_import
 import unittest
 from segeval.similarity.distance.multipleboundary import (
-    boundary_edit_distance, __additions_substitutions__,
+    boundary_edit_distance, __boundary_edit_distance__,
+    memoized_boundary_edit_distance, memoize_edits, edit_memo,
+    __additions_substitutions__,
     __additions_substitutions_sets__, __has_substitutions__)
 
 
@@ -49,6 +51,66 @@ class TestMultipleBoundaries(unittest.TestCase):
         self.assertEqual(([(3, 'b'), (3, 'b')], [(1, 2)], [(4, 5, 1)]),
                          (additions, substitutions, transpositions))
 
+    def test_edit_distance_count_additions(self):
+        '''
+        Test counting additions instead of listing them.
+        '''
+        a = [set(), set([1]), set(), set(), set([1]), set(), set(), set(), set(), set()]
+        b = [set(), set([2, 3]), set(), set(), set(), set([1]), set(), set(), set([3]), set()]
+
+        additions, substitutions, transpositions = \
+            __boundary_edit_distance__(a, b, [2], count_additions=True)
+        self.assertEqual((2, [(1, 2)], [(4, 5, 1)]),
+                         (additions, substitutions, transpositions))
+
+    def test_memoized_edit_distance(self):
+        '''
+        Test that memoized edits match and are shared across detail levels.
+        '''
+        a = [set(), set([1]), set(), set(), set([1]), set(), set(), set(), set(), set()]
+        b = [set(), set([2, 3]), set(), set(), set(), set([1]), set(), set(), set([3]), set()]
+
+        with memoize_edits() as memo:
+            edits = memoized_boundary_edit_distance(a, b)
+            self.assertEqual(boundary_edit_distance(a, b), edits)
+            edits[0].append((1, 'a'))
+            self.assertEqual(boundary_edit_distance(a, b),
+                             memoized_boundary_edit_distance(a, b))
+            self.assertEqual((2, [(1, 2)], [(4, 5, 1)]),
+                             memoized_boundary_edit_distance(
+                                 a, b, count_additions=True))
+            self.assertEqual((1, 2), (memo.misses, memo.hits))
+            self.assertEqual(1, len(memo))
+        # Discarded once the context exits
+        self.assertEqual(0, len(memo))
+        self.assertEqual(boundary_edit_distance(a, b),
+                         memoized_boundary_edit_distance(a, b))
+
+    def test_memoize_edits_kept(self):
+        '''
+        Test that edits held in a given memo are kept between contexts.
+        '''
+        a = [set(), set([1]), set(), set()]
+        b = [set(), set(), set([1]), set()]
+        memo = edit_memo()
+        for _ in range(2):
+            with memoize_edits(memo=memo):
+                memoized_boundary_edit_distance(a, b)
+        self.assertEqual((1, 1), (memo.misses, memo.hits))
+        self.assertEqual(1, len(memo))
+
+    def test_memoize_edits_bounded(self):
+        '''
+        Test that memoized edits are bounded by their approximate size.
+        '''
+        with memoize_edits(max_bytes=400) as memo:
+            for length in range(2, 12):
+                a = [set([1])] + [set()] * length
+                b = [set()] * length + [set([1])]
+                memoized_boundary_edit_distance(a, b)
+            self.assertTrue(0 < memo.size <= 400)
+            self.assertEqual(1, len(memo))
+
     def test_edit_distance_two_transpositions(self):
         '''
         Test two transpositions
@@ -168,3 +230,20 @@ class TestInnerFncOfMultipleBoundaries(unittest.TestCase):
 
         self.assertEqual(([(2, 'a'), (3, 'a')], set([(4, 6)])),
                          __additions_substitutions_sets__(d, a, b))
+
+    def test_additions_substitutions_sets_ties(self):
+        '''
+        Test that ties are broken in favour of the smallest types.
+        '''
+        self.assertEqual(([(3, 'b')], set([(2, 1)])),
+                         __additions_substitutions_sets__(
+                             set([1, 2, 3]), set([2]), set([1, 3])))
+
+    def test_additions_substitutions_sets_many_types(self):
+        '''
+        Test many boundary types (which previously grew factorially).
+        '''
+        a = set(range(1, 20, 2))
+        b = set(range(2, 21, 2))
+        self.assertEqual(([], set((i, i + 1) for i in range(1, 20, 2))),
+                         __additions_substitutions_sets__(a ^ b, a, b))
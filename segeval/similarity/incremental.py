@@ -0,0 +1,307 @@
+'''
+Boundary Similarity (B) and agreement refreshed after local edits to a
+segmentation (e.g., an annotator adding, removing, or moving one boundary in
+an annotation tool) without recomputing boundary edit distance over whole
+documents::
+
+    state = AgreementEditState(dataset)
+    state.move_boundary('item1', 'an1', 9, 11)
+    state.boundary_similarity('item1', 'an1', 'an2')
+    state.agreement(fleiss_pi_linear)
+
+A transposition only joins two positions that both differ between the
+segmentations, and that are fewer than ``n_t`` positions apart.  Edits are
+held for each cluster of differing positions (separated from the next by at
+least ``n_t`` positions), so an edit at one position recomputes only the
+clusters within ``n_t - 1`` positions of it, and updates counts of edits by
+type (and transpositions by span).  Values equal those of
+:func:`segeval.boundary_similarity` (and of agreement coefficients) given
+the edited segmentations.
+
+Boundaries are addressed by their position within a boundary string, i.e.,
+position ``i`` lies between the ``i + 1``-th unit and the next.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+from segeval.format import BoundaryFormat
+from segeval.similarity import SIMILARITY_METRIC_DEFAULTS, __boundary_strings__
+from segeval.similarity.distance.multipleboundary import (
+    __boundary_edit_distance__)
+from segeval.similarity.stream import __count__, __new_counts__, __weigh__
+from segeval.util import SegmentationMetricError
+
+
+class BoundaryEditState(object):
+
+    '''
+    The edits between a hypothesis and reference segmentation, updated as
+    boundaries of either are added, removed, or moved.
+
+    Weighting functions are given edits rebuilt from counts, so
+    transpositions span the correct distance but start at position 0.
+    '''
+
+    def __init__(self, hypothesis, reference, n_t=2,
+                 boundary_format=BoundaryFormat.mass,
+                 weight=SIMILARITY_METRIC_DEFAULTS['weight']):
+        self.n_t = n_t
+        self.weight = weight
+        strings = __boundary_strings__(hypothesis, reference, boundary_format)
+        self.strings = tuple([frozenset(position) for position in string]
+                             for string in strings)
+        self.boundaries = [sum(len(position) for position in string)
+                           for string in self.strings]
+        # Occurrences of each boundary type within either segmentation
+        self.type_counts = Counter()
+        self.matches = 0
+        for set_a, set_b in zip(*self.strings):
+            self.type_counts.update(set_a)
+            self.type_counts.update(set_b)
+            self.matches += len(set_a & set_b)
+        # Counts of additions, substitutions, and (span, type) of
+        # transpositions, and running totals updated as clusters are counted
+        # and removed (see segeval.similarity.stream.__count__)
+        self.counts = __new_counts__()
+        # Sorted starts of clusters of differing positions, and the end and
+        # edits of each
+        self.__clusters__ = dict()
+        self.__starts__ = self.__cluster__(0, len(self.strings[0]) - 1)
+
+    def __cluster__(self, start, end):
+        '''
+        Compute and count the edits of each cluster of differing positions
+        from ``start`` to ``end``, returning their starts.
+        '''
+        string_a, string_b = self.strings
+        starts = list()
+        first = last = None
+        for position in range(start, end + 1):
+            if string_a[position] == string_b[position]:
+                continue
+            if last is not None and position - last >= self.n_t:
+                starts.append(self.__edits__(first, last))
+                first = None
+            if first is None:
+                first = position
+            last = position
+        if last is not None:
+            starts.append(self.__edits__(first, last))
+        return starts
+
+    def __edits__(self, start, end):
+        string_a, string_b = self.strings
+        edits = __boundary_edit_distance__(
+            string_a[start:end + 1], string_b[start:end + 1],
+            range(2, self.n_t + 1))
+        __count__(self.counts, edits)
+        self.__clusters__[start] = (end, edits)
+        return start
+
+    def __set__(self, side, position, boundaries):
+        '''
+        Replace the boundaries at a position of one segmentation, and
+        recompute the edits of the clusters near it.
+        '''
+        string = self.strings[side]
+        other = self.strings[1 - side][position]
+        previous = string[position]
+        string[position] = boundaries
+        self.matches += len(boundaries & other) - len(previous & other)
+        self.boundaries[side] += len(boundaries) - len(previous)
+        self.type_counts.update(boundaries)
+        self.type_counts.subtract(previous)
+        # Clusters that a transposition from this position could reach
+        starts = self.__starts__
+        upper = bisect_right(starts, position + self.n_t - 1)
+        lower = upper
+        while lower > 0 and \
+                self.__clusters__[starts[lower - 1]][0] > \
+                position - self.n_t:
+            lower -= 1
+        start, end = position, position
+        for cluster in starts[lower:upper]:
+            cluster_end, edits = self.__clusters__.pop(cluster)
+            __count__(self.counts, edits, -1)
+            start, end = min(start, cluster), max(end, cluster_end)
+        starts[lower:upper] = self.__cluster__(start, end)
+
+    def __check__(self, position):
+        if position < 0 or position >= len(self.strings[0]):
+            raise SegmentationMetricError(
+                'Position {0} is not within the segmentations (0 to {1})'
+                .format(position, len(self.strings[0]) - 1))
+
+    def add_boundary(self, position, boundary_type=1, reference=False):
+        '''
+        Add a boundary to the hypothesis (or reference) segmentation.
+        '''
+        self.__check__(position)
+        side = 1 if reference else 0
+        boundaries = self.strings[side][position]
+        if boundary_type in boundaries:
+            raise SegmentationMetricError(
+                'A boundary of type {0} is already at position {1}'
+                .format(boundary_type, position))
+        self.__set__(side, position, boundaries | frozenset([boundary_type]))
+
+    def remove_boundary(self, position, boundary_type=1, reference=False):
+        '''
+        Remove a boundary from the hypothesis (or reference) segmentation.
+        '''
+        self.__check__(position)
+        side = 1 if reference else 0
+        boundaries = self.strings[side][position]
+        if boundary_type not in boundaries:
+            raise SegmentationMetricError(
+                'No boundary of type {0} is at position {1}'
+                .format(boundary_type, position))
+        self.__set__(side, position, boundaries - frozenset([boundary_type]))
+
+    def move_boundary(self, source, target, boundary_type=1,
+                      reference=False):
+        '''
+        Move a boundary of the hypothesis (or reference) segmentation.
+        '''
+        self.__check__(target)
+        if boundary_type in self.strings[1 if reference else 0][target]:
+            raise SegmentationMetricError(
+                'A boundary of type {0} is already at position {1}'
+                .format(boundary_type, target))
+        self.remove_boundary(source, boundary_type, reference)
+        self.add_boundary(target, boundary_type, reference)
+
+    def boundary_types(self):
+        '''
+        The boundary types within either segmentation.
+        '''
+        return set(boundary_type for boundary_type, count in
+                   self.type_counts.items() if count > 0)
+
+    def boundary_parts(self):
+        '''
+        The numerator and denominator of B.
+        '''
+        count_unweighted, count_edits = __weigh__(
+            self.counts, self.boundary_types(), self.n_t, self.weight)
+        denominator = count_unweighted + self.matches
+        return denominator - count_edits, denominator
+
+    def boundary_similarity(self, one_minus=False):
+        '''
+        B of the segmentations as edited.
+        '''
+        numerator, denominator = self.boundary_parts()
+        value = numerator / denominator if denominator > 0 else 1
+        if one_minus:
+            return Decimal('1') - value
+        return value
+
+    def agreement_part(self):
+        '''
+        The numerator and denominator of B, potential boundaries, and
+        boundaries of each segmentation, from which agreement is computed
+        (see :func:`segeval.agreement.__agreement_part__`).
+        '''
+        numerator, denominator = self.boundary_parts()
+        pbs = len(self.strings[0]) * len(self.boundary_types())
+        return (numerator, denominator, pbs, self.boundaries[0],
+                self.boundaries[1])
+
+
+class AgreementEditState(object):
+
+    '''
+    The edits between each pair of coders of each item of a dataset (as
+    compared by :func:`segeval.actual_agreement_linear`), updated as
+    boundaries of a coder's segmentation are added, removed, or moved.
+    Each edit updates one :class:`BoundaryEditState` per other coder.
+
+    The dataset given is not modified; agreement is computed from the parts
+    of each edit state, and so only the items and coders of the dataset are
+    used.
+    '''
+
+    def __init__(self, dataset, n_t=2,
+                 weight=SIMILARITY_METRIC_DEFAULTS['weight']):
+        from segeval.agreement import __agreement_comparisons__
+        self.dataset = dataset
+        self.n_t = n_t
+        self.weight = weight
+        boundary_format = getattr(dataset, 'boundary_format',
+                                  BoundaryFormat.mass)
+        self.comparisons = __agreement_comparisons__(dataset)
+        self.states = dict()
+        # Edit states (and whether the coder is the reference) by item and
+        # coder
+        self.__codings__ = dict()
+        for coder_m, coder_n, item in self.comparisons:
+            state = BoundaryEditState(dataset[item][coder_m],
+                                      dataset[item][coder_n], n_t,
+                                      boundary_format, weight)
+            self.states[(item, coder_m, coder_n)] = state
+            self.__codings__.setdefault((item, coder_m), list()).append(
+                (state, False))
+            self.__codings__.setdefault((item, coder_n), list()).append(
+                (state, True))
+
+    def __codings_of__(self, item, coder):
+        if (item, coder) not in self.__codings__:
+            raise SegmentationMetricError(
+                'No comparisons of coder {0} for item {1}'.format(coder, item))
+        return self.__codings__[(item, coder)]
+
+    def add_boundary(self, item, coder, position, boundary_type=1):
+        '''
+        Add a boundary to a coder's segmentation of an item.
+        '''
+        for state, reference in self.__codings_of__(item, coder):
+            state.add_boundary(position, boundary_type, reference)
+
+    def remove_boundary(self, item, coder, position, boundary_type=1):
+        '''
+        Remove a boundary from a coder's segmentation of an item.
+        '''
+        for state, reference in self.__codings_of__(item, coder):
+            state.remove_boundary(position, boundary_type, reference)
+
+    def move_boundary(self, item, coder, source, target, boundary_type=1):
+        '''
+        Move a boundary of a coder's segmentation of an item.
+        '''
+        for state, reference in self.__codings_of__(item, coder):
+            state.move_boundary(source, target, boundary_type, reference)
+
+    def boundary_similarity(self, item, coder_m, coder_n, one_minus=False):
+        '''
+        B between two coders' segmentations of an item.
+        '''
+        state = self.states.get((item, coder_m, coder_n),
+                                self.states.get((item, coder_n, coder_m)))
+        if state is None:
+            raise SegmentationMetricError(
+                'No comparison of coders {0} and {1} for item {2}'.format(
+                    coder_m, coder_n, item))
+        return state.boundary_similarity(one_minus)
+
+    def parts(self):
+        '''
+        The parts of each comparison, in the order listed by
+        :func:`segeval.agreement.__agreement_comparisons__`.
+        '''
+        return [self.states[(item, coder_m, coder_n)].agreement_part()
+                for coder_m, coder_n, item in self.comparisons]
+
+    def agreement(self, fnc_coefficient=None, **kwargs):
+        '''
+        An agreement coefficient (by default,
+        :func:`segeval.actual_agreement_linear`) of the dataset as edited.
+        '''
+        if fnc_coefficient is None:
+            from segeval.agreement import actual_agreement_linear
+            fnc_coefficient = actual_agreement_linear
+        return fnc_coefficient(self.dataset, parts=self.parts(), n_t=self.n_t,
+                               weight=self.weight, **kwargs)
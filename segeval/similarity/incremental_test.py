@@ -0,0 +1,146 @@
+'''
+Tests similarity and agreement refreshed after local edits.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import random
+from segeval.agreement import actual_agreement_linear
+from segeval.agreement.bias import artstein_poesio_bias_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.agreement.pi import fleiss_pi_linear
+from segeval.data import Dataset
+from segeval.format import BoundaryFormat
+from segeval.similarity import SIMILARITY_METRIC_DEFAULTS
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.incremental import (BoundaryEditState,
+                                            AgreementEditState)
+from segeval.similarity.weight import weight_a, weight_s, weight_t
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.util import SegmentationMetricError
+from segeval.util.test import TestCase
+
+
+def __weight_t_squared__(transpositions, max_n):
+    '''
+    Weight transpositions by the square of their span (one that is not
+    applied to running totals).
+    '''
+    return sum((transposition[1] - transposition[0]) ** 2
+               for transposition in transpositions) / max_n
+
+
+WEIGHTS = (SIMILARITY_METRIC_DEFAULTS['weight'],
+           (weight_a, weight_s, weight_t),
+           (weight_a, weight_s, __weight_t_squared__))
+
+
+def __dataset__(codings):
+    '''
+    Copy a dataset of masses.
+    '''
+    return Dataset(dict((item, dict((coder, list(masses))
+                                    for coder, masses in coders.items()))
+                        for item, coders in codings.items()))
+
+
+class TestBoundaryEditState(TestCase):
+
+    '''
+    Test edit states of pairs of segmentations.
+    '''
+
+    def test_edits(self):
+        '''
+        Test that B after random edits equals B of the edited segmentations.
+        '''
+        generator = random.Random(11)
+        for _ in range(100):
+            length = generator.randint(1, 30)
+            strings = [[frozenset(boundary_type for boundary_type in (1, 2, 3)
+                                  if generator.random() < 0.2)
+                        for _ in range(length)] for _ in range(2)]
+            n_t = generator.randint(1, 4)
+            weight = generator.choice(WEIGHTS)
+            state = BoundaryEditState(strings[0], strings[1], n_t,
+                                      BoundaryFormat.sets, weight)
+            for _ in range(10):
+                side = generator.randint(0, 1)
+                position = generator.randrange(length)
+                boundary_type = generator.randint(1, 3)
+                boundaries = strings[side][position]
+                if boundary_type in boundaries:
+                    state.remove_boundary(position, boundary_type, side == 1)
+                    boundaries = boundaries - frozenset([boundary_type])
+                else:
+                    state.add_boundary(position, boundary_type, side == 1)
+                    boundaries = boundaries | frozenset([boundary_type])
+                strings[side][position] = boundaries
+                self.assertEqual(
+                    boundary_similarity(strings[0], strings[1], n_t=n_t,
+                                        boundary_format=BoundaryFormat.sets,
+                                        weight=weight),
+                    state.boundary_similarity())
+                self.assertEqual(
+                    BoundaryEditState(strings[0], strings[1], n_t,
+                                      BoundaryFormat.sets,
+                                      weight).agreement_part(),
+                    state.agreement_part())
+
+    def test_move_boundary(self):
+        '''
+        Test moving a boundary of masses.
+        '''
+        state = BoundaryEditState((2, 3, 6), (5, 6))
+        state.move_boundary(1, 2)
+        self.assertEqual(boundary_similarity((3, 2, 6), (5, 6)),
+                         state.boundary_similarity())
+        state.move_boundary(4, 3, reference=True)
+        self.assertEqual(boundary_similarity((3, 2, 6), (4, 7)),
+                         state.boundary_similarity())
+
+    def test_errors(self):
+        '''
+        Test edits of absent, present, and out of range boundaries.
+        '''
+        state = BoundaryEditState((2, 3, 6), (5, 6))
+        self.assertRaises(SegmentationMetricError, state.add_boundary, 1)
+        self.assertRaises(SegmentationMetricError, state.remove_boundary, 0)
+        self.assertRaises(SegmentationMetricError, state.add_boundary, 10)
+        self.assertRaises(SegmentationMetricError, state.move_boundary, 1, 4)
+        self.assertEqual(boundary_similarity((2, 3, 6), (5, 6)),
+                         state.boundary_similarity())
+
+
+class TestAgreementEditState(TestCase):
+
+    '''
+    Test edit states of datasets.
+    '''
+
+    def test_agreement(self):
+        '''
+        Test that agreement after an edit equals that of the edited dataset.
+        '''
+        dataset = __dataset__(KAZANTSEVA2012_G5)
+        state = AgreementEditState(dataset)
+        coefficients = (actual_agreement_linear, fleiss_pi_linear,
+                        fleiss_kappa_linear, artstein_poesio_bias_linear)
+        for fnc_coefficient in coefficients:
+            self.assertEqual(fnc_coefficient(dataset),
+                             state.agreement(fnc_coefficient))
+        item = sorted(dataset)[0]
+        masses = dataset[item]['an1']
+        # Move the first boundary one unit later
+        state.move_boundary(item, 'an1', masses[0] - 1, masses[0])
+        edited = __dataset__(dataset)
+        edited[item]['an1'] = [masses[0] + 1, masses[1] - 1] + \
+            list(masses[2:])
+        for fnc_coefficient in coefficients:
+            self.assertEqual(fnc_coefficient(edited),
+                             state.agreement(fnc_coefficient))
+        self.assertEqual(
+            boundary_similarity(edited[item]['an1'], edited[item]['an2']),
+            state.boundary_similarity(item, 'an2', 'an1'))
+        self.assertRaises(SegmentationMetricError, state.add_boundary, item,
+                          'an5', 0)
@@ -4,11 +4,19 @@ Segmentation Similarity (S) package.
 .. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
 '''
 from __future__ import absolute_import, division
-from segeval.similarity import __boundary_statistics__, SIMILARITY_METRIC_DEFAULTS
+from segeval.similarity import (__boundary_statistics__, Detail,
+                                SIMILARITY_METRIC_DEFAULTS)
 from segeval.util import __fnc_metric__
 from decimal import Decimal
 
 
+# S only requires edit counts, so individual edits are not collected
+SEGMENTATION_METRIC_DEFAULTS = dict(SIMILARITY_METRIC_DEFAULTS)
+SEGMENTATION_METRIC_DEFAULTS.update({
+    'detail': Detail.counts
+})
+
+
 def __segmentation_similarity__(*args, **kwargs):
     '''
     Segmentation Similarity (S).
@@ -22,7 +30,15 @@ def __segmentation_similarity__(*args, **kwargs):
     one_minus = kwargs['one_minus']
     # Compute
     statistics = __boundary_statistics__(*args, **metric_kwargs)
-    # Process
+    return __segmentation_similarity_fraction__(statistics, return_parts,
+                                                one_minus)
+
+
+def __segmentation_similarity_fraction__(statistics, return_parts,
+                                         one_minus):
+    '''
+    Compute S from boundary statistics.
+    '''
     pbs = statistics['pbs'] * len(statistics['boundary_types'])
     # Fraction
     denominator = pbs
@@ -42,4 +58,4 @@ def segmentation_similarity(*args, **kwargs):
     Segmentation Similarity (S).
     '''
     return __fnc_metric__(__segmentation_similarity__, args, kwargs,
-                          SIMILARITY_METRIC_DEFAULTS)
+                          SEGMENTATION_METRIC_DEFAULTS)
@@ -6,6 +6,7 @@ Tests segmentation similarity (S).
 from __future__ import absolute_import, division
 import unittest
 from decimal import Decimal
+from segeval.similarity import Detail
 from segeval.similarity.segmentation import segmentation_similarity
 from segeval.util import SegmentationMetricError
 from segeval.format import BoundaryFormat
@@ -91,6 +92,18 @@ class TestSegmentation(unittest.TestCase):
         self.assertRaises(SegmentationMetricError, segmentation_similarity,
                           a, b)
 
+    def test_detail(self):
+        '''
+        Test that full and counts-only statistics produce the same values.
+        '''
+        self.assertEqual(
+            segmentation_similarity(HYPOTHESIS_STARGAZER,
+                                    HEARST_1997_STARGAZER,
+                                    detail=Detail.full),
+            segmentation_similarity(HYPOTHESIS_STARGAZER,
+                                    HEARST_1997_STARGAZER,
+                                    detail=Detail.counts))
+
     def test_s_datasets(self):
         '''
         Test S upon two datasets.
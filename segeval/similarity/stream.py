@@ -0,0 +1,293 @@
+'''
+Boundary Similarity (B) and Segmentation Similarity (S) of segmentations that
+arrive as streams (e.g., from a live captioning segmenter), updated as units
+arrive instead of recomputing boundary edit distance over each prefix::
+
+    stream = SimilarityStream(n_t=2)
+    for hypothesis_masses, reference_masses in segmenter:
+        stream.push(hypothesis_masses, reference_masses)
+        print(stream.boundary_similarity())
+    print(stream.finish().boundary_similarity())
+
+One stream may run ahead of the other; values are those of the positions
+received from both streams so far (positions of one stream are held until
+the other catches up), and :meth:`SimilarityStream.finish` checks that both
+streams ended at the same length.
+
+A transposition only joins two positions that both differ between the
+segmentations, and that are fewer than ``n_t`` positions apart.  Once the
+positions received extend ``n_t`` positions past the last differing
+position, no later position can join it, so the edits of the differing
+positions held since the previous such gap are computed, counted, and
+discarded.  Only those differing positions are held, along with counts of
+edits by type (and transpositions by span), and values equal those of
+:func:`segeval.boundary_similarity` and
+:func:`segeval.segmentation_similarity` given the whole segmentations.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+from collections import Counter, deque
+from decimal import Decimal
+from segeval.format import BoundaryFormat
+from segeval.similarity import SIMILARITY_METRIC_DEFAULTS, __type_range__
+from segeval.similarity.distance.multipleboundary import (
+    Transposition, __boundary_edit_distance__)
+from segeval.similarity.weight import (weight_a, weight_s, weight_s_scale,
+                                       weight_t, weight_t_scale)
+from segeval.util import SegmentationMetricError
+
+
+SUPPORTED_FORMATS = (BoundaryFormat.mass, BoundaryFormat.position,
+                     BoundaryFormat.sets)
+
+EMPTY = frozenset()
+
+
+def __count__(counts, edits, sign=1):
+    '''
+    Add (or, with ``sign=-1``, remove) edits to counts of additions,
+    substitutions, and the ``(span, type)`` of transpositions, and to running
+    totals of each kind of edit, of the distance between substituted types,
+    and of the span of transpositions.
+    '''
+    additions, substitutions, transpositions = edits
+    keys = (additions, substitutions,
+            [(transposition.end - transposition.start, transposition.type)
+             for transposition in transpositions])
+    for counter, values in zip(counts, keys):
+        for value in values:
+            counter[value] += sign
+            if counter[value] == 0:
+                del counter[value]
+    totals = counts[3]
+    totals['additions'] += sign * len(additions)
+    totals['substitutions'] += sign * len(substitutions)
+    totals['transpositions'] += sign * len(transpositions)
+    totals['distance'] += sign * sum(abs(substitution[0] - substitution[1])
+                                     for substitution in substitutions)
+    totals['span'] += sign * sum(span for span, _ in keys[2])
+
+
+def __new_counts__():
+    '''
+    Empty counts of edits (see :func:`__count__`).
+    '''
+    return Counter(), Counter(), Counter(), Counter()
+
+
+def __weigh__(counts, boundary_types, n_t, weight):
+    '''
+    Return the unweighted and weighted edit counts of counted edits (see
+    :func:`__count__`).  The default weighting functions are applied to the
+    running totals, and others to edits rebuilt from the counts.
+    '''
+    additions, substitutions, transpositions, totals = counts
+    fnc_weight_a, fnc_weight_s, fnc_weight_t = weight
+    max_s, min_s = __type_range__(boundary_types)
+    if fnc_weight_a is weight_a:
+        count_a = totals['additions']
+    else:
+        count_a = fnc_weight_a(list(additions.elements()))
+    if fnc_weight_s is weight_s:
+        count_s = totals['substitutions']
+    elif fnc_weight_s is weight_s_scale:
+        count_s = Decimal(totals['distance']) / (max_s - min_s + 1)
+    else:
+        count_s = fnc_weight_s(list(substitutions.elements()), max_s, min_s)
+    if fnc_weight_t is weight_t:
+        count_t = totals['transpositions']
+    elif fnc_weight_t is weight_t_scale:
+        count_t = Decimal(totals['span']) / n_t
+    else:
+        count_t = fnc_weight_t(
+            [Transposition(0, span, boundary_type)
+             for span, boundary_type in transpositions.elements()], n_t)
+    count_unweighted = totals['additions'] + totals['substitutions'] + \
+        totals['transpositions']
+    return count_unweighted, count_a + count_s + count_t
+
+
+class SimilarityStream(object):
+
+    '''
+    B and S of a pair of streams of segment masses (or position labels, or
+    boundary sets per position, depending upon ``boundary_format``).
+
+    Weighting functions are given edits rebuilt from counts, so
+    transpositions span the correct distance but start at position 0.
+    '''
+
+    def __init__(self, n_t=2, boundary_format=BoundaryFormat.mass,
+                 weight=SIMILARITY_METRIC_DEFAULTS['weight']):
+        if boundary_format not in SUPPORTED_FORMATS:
+            raise SegmentationMetricError('Unsupported boundary format')
+        self.n_t = n_t
+        self.boundary_format = boundary_format
+        self.weight = weight
+        self.positions = 0
+        self.matches = 0
+        self.boundary_types = set()
+        # Counts of additions, substitutions, and (span, type) of
+        # transpositions, and running totals (see __count__)
+        self.counts = __new_counts__()
+        # Runs of [boundary set, count] not yet aligned with the other stream
+        self.__pending__ = (deque(), deque())
+        # The last position label (or whether a segment was received) of each
+        # stream
+        self.__last__ = [None, None]
+        # Differing positions whose edits may still change
+        self.__differing__ = list()
+
+    def push(self, hypothesis=(), reference=()):
+        '''
+        Append segment masses (or position labels, or boundary sets) to
+        either stream.
+        '''
+        for side, values in enumerate((hypothesis, reference)):
+            for value in values:
+                self.__append__(side, value)
+        self.__align__()
+        return self
+
+    def __append__(self, side, value):
+        '''
+        Append the boundary positions implied by one value of a stream.
+        '''
+        pending = self.__pending__[side]
+
+        def __run__(position, count):
+            if count <= 0:
+                return
+            if len(pending) > 0 and pending[-1][0] == position:
+                pending[-1][1] += count
+            else:
+                pending.append([position, count])
+
+        if self.boundary_format == BoundaryFormat.mass:
+            if value <= 0:
+                return
+            # A boundary ends the previous segment
+            if self.__last__[side] is not None:
+                __run__(frozenset([1]), 1)
+            self.__last__[side] = True
+            __run__(EMPTY, value - 1)
+        elif self.boundary_format == BoundaryFormat.position:
+            if self.__last__[side] is not None:
+                __run__(frozenset([1]) if value != self.__last__[side]
+                        else EMPTY, 1)
+            self.__last__[side] = value
+        else:
+            __run__(frozenset(value), 1)
+
+    def __align__(self):
+        pending_hyp, pending_ref = self.__pending__
+        while len(pending_hyp) > 0 and len(pending_ref) > 0:
+            run_hyp, run_ref = pending_hyp[0], pending_ref[0]
+            count = min(run_hyp[1], run_ref[1])
+            set_a, set_b = run_hyp[0], run_ref[0]
+            self.boundary_types.update(set_a)
+            self.boundary_types.update(set_b)
+            if set_a == set_b:
+                self.matches += len(set_a) * count
+                self.positions += count
+            else:
+                # Consecutive positions, so none are n_t positions apart
+                for _ in range(count):
+                    self.__differing__.append((self.positions, set_a, set_b))
+                    self.positions += 1
+                self.matches += len(set_a & set_b) * count
+            for pending, run in ((pending_hyp, run_hyp),
+                                 (pending_ref, run_ref)):
+                run[1] -= count
+                if run[1] == 0:
+                    pending.popleft()
+            differing = self.__differing__
+            # No later position can be transposed with those held
+            if len(differing) > 0 and \
+                    self.positions - differing[-1][0] >= self.n_t:
+                __count__(self.counts, self.__edits__())
+                self.__differing__ = list()
+
+    def __edits__(self):
+        '''
+        Compute the edits of the differing positions held.
+        '''
+        differing = self.__differing__
+        if len(differing) == 0:
+            return list(), list(), list()
+        start = differing[0][0]
+        length = differing[-1][0] - start + 1
+        string_a = [EMPTY] * length
+        string_b = [EMPTY] * length
+        for position, set_a, set_b in differing:
+            string_a[position - start] = set_a
+            string_b[position - start] = set_b
+        return __boundary_edit_distance__(string_a, string_b,
+                                          range(2, self.n_t + 1))
+
+    def finish(self):
+        '''
+        Check that both streams have ended at the same length, raising
+        :class:`segeval.util.SegmentationMetricError` otherwise, and return
+        the stream.
+        '''
+        lengths = [sum(run[1] for run in pending)
+                   for pending in self.__pending__]
+        if lengths[0] != lengths[1]:
+            raise SegmentationMetricError(
+                'Segmentations differ in length ({0} != {1})'.format(
+                    self.positions + lengths[0],
+                    self.positions + lengths[1]))
+        return self
+
+    def __statistics__(self):
+        '''
+        Return the unweighted and weighted edit counts of the positions
+        received from both streams so far.
+        '''
+        edits = self.__edits__()
+        __count__(self.counts, edits)
+        try:
+            return __weigh__(self.counts, self.boundary_types, self.n_t,
+                             self.weight)
+        finally:
+            # Those edits may still change as positions arrive
+            __count__(self.counts, edits, -1)
+
+    def boundary_parts(self):
+        '''
+        The numerator and denominator of B so far.
+        '''
+        count_unweighted, count_edits = self.__statistics__()
+        denominator = count_unweighted + self.matches
+        return denominator - count_edits, denominator
+
+    def boundary_similarity(self, one_minus=False):
+        '''
+        B of the positions received from both streams so far.
+        '''
+        numerator, denominator = self.boundary_parts()
+        value = numerator / denominator if denominator > 0 else 1
+        if one_minus:
+            return Decimal('1') - value
+        return value
+
+    def segmentation_parts(self):
+        '''
+        The numerator and denominator of S so far.
+        '''
+        count_edits = self.__statistics__()[1]
+        # As computed by segeval.similarity.segmentation
+        pbs = self.positions * len(self.boundary_types) ** 2
+        return pbs - count_edits, pbs
+
+    def segmentation_similarity(self, one_minus=False):
+        '''
+        S of the positions received from both streams so far.
+        '''
+        numerator, denominator = self.segmentation_parts()
+        value = numerator / denominator if denominator > 0 else 1
+        if one_minus:
+            return Decimal('1') - value
+        return value
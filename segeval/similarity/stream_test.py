@@ -0,0 +1,139 @@
+'''
+Tests similarity metrics of streams.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import random
+from segeval.format import BoundaryFormat, convert_masses_to_positions
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.segmentation import segmentation_similarity
+from segeval.similarity.stream import SimilarityStream
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.util import SegmentationMetricError
+from segeval.util.test import TestCase
+
+
+def __codings__():
+    '''
+    Yield each pair of codings of the same item.
+    '''
+    for codings in KAZANTSEVA2012_G5.values():
+        coders = sorted(codings)
+        for i, coder_m in enumerate(coders):
+            for coder_n in coders[i + 1:]:
+                yield codings[coder_m], codings[coder_n]
+
+
+def __push__(stream, hypothesis, reference, size_hyp, size_ref):
+    '''
+    Push a pair of segmentations into a stream in chunks of the sizes given.
+    '''
+    i = j = 0
+    while i < len(hypothesis) or j < len(reference):
+        stream.push(hypothesis[i:i + size_hyp], reference[j:j + size_ref])
+        i += size_hyp
+        j += size_ref
+    return stream
+
+
+class TestSimilarityStream(TestCase):
+
+    '''
+    Test similarity metrics of streams.
+    '''
+
+    def test_masses(self):
+        '''
+        Test that B and S of streams of masses equal B and S.
+        '''
+        for hypothesis, reference in __codings__():
+            for n_t in (1, 2, 3, 5):
+                stream = __push__(SimilarityStream(n_t), hypothesis,
+                                  reference, 2, 3)
+                self.assertEqual(
+                    boundary_similarity(hypothesis, reference, n_t=n_t,
+                                        return_parts=True)[:2],
+                    stream.boundary_parts())
+                self.assertEqual(
+                    boundary_similarity(hypothesis, reference, n_t=n_t,
+                                        one_minus=True),
+                    stream.boundary_similarity(one_minus=True))
+                self.assertEqual(
+                    segmentation_similarity(hypothesis, reference, n_t=n_t,
+                                            return_parts=True),
+                    stream.segmentation_parts())
+                self.assertEqual(
+                    segmentation_similarity(hypothesis, reference, n_t=n_t),
+                    stream.segmentation_similarity())
+
+    def test_positions(self):
+        '''
+        Test streams of position labels.
+        '''
+        hypothesis, reference = next(__codings__())
+        hypothesis = convert_masses_to_positions(hypothesis)
+        reference = convert_masses_to_positions(reference)
+        stream = __push__(
+            SimilarityStream(boundary_format=BoundaryFormat.position),
+            hypothesis, reference, 7, 4)
+        self.assertEqual(
+            boundary_similarity(hypothesis, reference,
+                                boundary_format=BoundaryFormat.position),
+            stream.boundary_similarity())
+
+    def test_sets(self):
+        '''
+        Test streams of random boundary strings with many boundary types.
+        '''
+        generator = random.Random(7)
+        for _ in range(200):
+            length = generator.randint(1, 40)
+
+            def __string__():
+                return [frozenset(boundary_type for boundary_type in (1, 2, 3)
+                                  if generator.random() < 0.2)
+                        for _ in range(length)]
+            hypothesis, reference = __string__(), __string__()
+            n_t = generator.randint(1, 4)
+            stream = __push__(
+                SimilarityStream(n_t, boundary_format=BoundaryFormat.sets),
+                hypothesis, reference, generator.randint(1, 5),
+                generator.randint(1, 5))
+            self.assertEqual(
+                boundary_similarity(hypothesis, reference, n_t=n_t,
+                                    boundary_format=BoundaryFormat.sets),
+                stream.boundary_similarity())
+
+    def test_push(self):
+        '''
+        Test values of prefixes while segments are pushed.
+        '''
+        hypothesis, reference = (2, 3, 6), (5, 6)
+        stream = SimilarityStream()
+        stream.push(hypothesis[:2], reference[:1])
+        self.assertEqual(boundary_similarity((2, 3), (5,)),
+                         stream.boundary_similarity())
+        # The hypothesis is ahead, so only the positions of both are scored
+        stream.push(hypothesis[2:])
+        self.assertEqual(boundary_similarity((2, 3), (5,)),
+                         stream.boundary_similarity())
+        self.assertEqual(segmentation_similarity((2, 3), (5,)),
+                         stream.segmentation_similarity())
+        stream.push(reference=reference[1:])
+        self.assertEqual(boundary_similarity(hypothesis, reference),
+                         stream.finish().boundary_similarity())
+        stream = SimilarityStream().push((3,), (2,))
+        self.assertEqual(boundary_similarity((2,), (2,)),
+                         stream.boundary_similarity())
+
+    def test_errors(self):
+        '''
+        Test streams that end at differing lengths and unsupported formats.
+        '''
+        stream = SimilarityStream().push((2, 3), (6,))
+        self.assertEqual(boundary_similarity((2, 3), (5,)),
+                         stream.boundary_similarity())
+        self.assertRaises(SegmentationMetricError, stream.finish)
+        self.assertRaises(SegmentationMetricError, SimilarityStream, 2,
+                          BoundaryFormat.nltk)
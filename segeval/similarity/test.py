@@ -6,10 +6,13 @@ Tests similarity functions.
 from __future__ import absolute_import
 import unittest
 from decimal import Decimal
-from segeval.similarity import boundary_confusion_matrix, boundary_statistics
+from segeval.similarity import (boundary_confusion_matrix, boundary_statistics,
+                                Detail)
 from segeval.format import BoundaryFormat
+from segeval.util import SegmentationMetricError
 from segeval.data.samples import HEARST_1997_STARGAZER, HYPOTHESIS_STARGAZER
-from segeval.ml import precision, recall, fmeasure
+from segeval.ml import (precision, recall, fmeasure, Group,
+                        reduce_confusion_matrices)
 
 
 class TestSimilarity(unittest.TestCase):
@@ -53,6 +56,35 @@ class TestSimilarity(unittest.TestCase):
              'count_edits': Decimal('1'),
              'substitutions': []}, value)
 
+    def test_boundary_statistics_counts(self):
+        '''
+        Test that counts-only boundary statistics agree with full statistics.
+        '''
+        a = [set(), set([1]), set(), set(), set([1]), set(), set(), set([2]),
+             set(), set()]
+        b = [set(), set([2, 3]), set(), set(), set(), set([1]), set(),
+             set(), set([3]), set()]
+        full = boundary_statistics(a, b,
+                                   boundary_format=BoundaryFormat.sets)
+        counts = boundary_statistics(a, b, boundary_format=BoundaryFormat.sets,
+                                     detail=Detail.counts)
+        self.assertEqual(
+            {'matches': len(full['matches']),
+             'boundaries_all': full['boundaries_all'],
+             'boundary_types': full['boundary_types'],
+             'pbs': full['pbs'],
+             'transpositions': len(full['transpositions']),
+             'additions': len(full['additions']),
+             'count_edits': full['count_edits'],
+             'substitutions': len(full['substitutions'])}, counts)
+
+    def test_boundary_statistics_detail_exception(self):
+        '''
+        Test an unsupported level of statistics detail.
+        '''
+        self.assertRaises(SegmentationMetricError, boundary_statistics,
+                          [2, 3, 6], [5, 6], detail='partial')
+
     def test_bed_confusion_matrix(self):
         '''
         Test BED-based confusion matrix upon two segmentations.
@@ -89,3 +121,25 @@ class TestSimilarity(unittest.TestCase):
         self.assertAlmostEquals(float(hyp_f['stargazer,h2,1']), 0.58333333)
         self.assertAlmostEquals(float(hyp_f['stargazer,h1,2']), 0.6)
         self.assertAlmostEquals(float(hyp_f['stargazer,h2,2']), 0.5)
+
+    def test_bed_confusion_matrix_reduction(self):
+        '''
+        Test corpus- and coder-level reductions of BED-based confusion
+        matrices upon a dataset.
+        '''
+        value = boundary_confusion_matrix(HYPOTHESIS_STARGAZER,
+                                          HEARST_1997_STARGAZER)
+        corpus = reduce_confusion_matrices(value)
+        # Micro-averaged precision is the trace over the sum of all counts
+        numerator = sum(sum(matrix.diagonal()) for matrix in value.values())
+        denominator = sum(sum(matrix.predicted_totals())
+                          for matrix in value.values())
+        self.assertAlmostEquals(float(precision(corpus)),
+                                float(numerator) / float(denominator))
+        coders = reduce_confusion_matrices(value, Group.coder)
+        self.assertEqual(set(['h1', 'h2']), set(coders.keys()))
+        self.assertAlmostEquals(
+            float(precision(coders['h1'])),
+            float(precision(reduce_confusion_matrices(dict(
+                (key, matrix) for key, matrix in value.items()
+                if key.startswith('stargazer,h1,'))))))
@@ -23,7 +23,7 @@ class TestModule(unittest.TestCase):
     '''
 
     def test_dir(self):
-        self.assertEquals(50, len(dir(segeval)))
+        self.assertEquals(51, len(dir(segeval)))
         self.assertEquals(set(dir(segeval)),
                           set([
                               'Average', 'BoundaryFormat', 'COMPLETE_AGREEMENT',
@@ -39,7 +39,8 @@ class TestModule(unittest.TestCase):
                               'convert_masses_to_positions', 'convert_positions_to_masses',
                               'convert_nltk_to_masses', 'fleiss_kappa_linear', 'fleiss_pi_linear',
                               'fmeasure', 'input_linear_mass_json', 'input_linear_mass_tsv',
-                              'load_nested_folders_dict', 'output_linear_mass_json', 'pk',
+                              'load_nested_folders_dict', 'make_metric',
+                              'output_linear_mass_json', 'pk',
                               'precision', 'recall', 'summarize', 'weight_t', 'weight_s_scale',
                               'weight_t_scale', 'weight_s', 'weight_a', 'window_diff']))
 
@@ -54,7 +55,7 @@ class TestImport(unittest.TestCase):
     '''
 
     def test_import_data(self):
-        self.assertEquals(40, len(segeval.__all__))
+        self.assertEquals(41, len(segeval.__all__))
         for item in segeval.__all__:
             self.assertNotEquals(None, getattr(segeval, item))
 
@@ -31,9 +31,15 @@ class SegmentationMetricError(Exception):
 def __fnc_metric__(fnc_metric, args, kwargs, kw_defaults):
 
     from segeval.data import Dataset
+    from segeval.data.sqlite import SqliteDataset
     # Create default keyword arguments
     metric_kwargs = dict(kw_defaults)
     metric_kwargs.update(kwargs)
+    # Results are only cached per pair, and progress and checkpoints only
+    # apply to datasets
+    cache = metric_kwargs.pop('cache', None)
+    progress = metric_kwargs.pop('progress', None)
+    checkpoint = metric_kwargs.pop('checkpoint', None)
     # Initialize arguments
     hypothesis = None
     reference = None
@@ -63,21 +69,30 @@ def __fnc_metric__(fnc_metric, args, kwargs, kw_defaults):
     if dataset:
         # Compute pairwise values over all coders in a dataset
         metric_kwargs['boundary_format'] = dataset.boundary_format
-        return compute_pairwise_values(fnc_metric, dataset, **metric_kwargs)
+        return compute_pairwise_values(fnc_metric, dataset, cache=cache,
+                                       progress=progress,
+                                       checkpoint=checkpoint, **metric_kwargs)
     elif hypothesis and reference:
         # Compute values between hypotheses (i.e, automatic) and reference
         # (i.e., manual) coder segmentations
-        if isinstance(hypothesis, Dataset) and isinstance(reference, Dataset):
+        if isinstance(hypothesis, (Dataset, SqliteDataset)) and \
+                isinstance(reference, (Dataset, SqliteDataset)):
             # Compare pairwise values between coders paired from two datasets
             metric_kwargs['boundary_format'] = hypothesis.boundary_format
             if hypothesis.boundary_format is not reference.boundary_format:
                 raise SegmentationMetricError(
                     'Datasets contain differing boundary formats; {0} != {1}'
                     .format(hypothesis.boundary_format, reference.boundary_format))
-            return compute_pairwise_values(fnc_metric, hypothesis, reference, **metric_kwargs)
+            return compute_pairwise_values(fnc_metric, hypothesis, reference,
+                                           cache=cache, progress=progress,
+                                           checkpoint=checkpoint,
+                                           **metric_kwargs)
         else:
             # Compare a single pair of segmentations
             del metric_kwargs['permuted']
+            if cache is not None:
+                return cache.compute(fnc_metric, hypothesis, reference,
+                                     **metric_kwargs)
             return fnc_metric(hypothesis, reference, **metric_kwargs)
     # Except if insufficient arguments supplied
     raise SegmentationMetricError('Incorrect arguments specified; expected 1 or 2, obtained {0} of value: {1}'.format(str(len(args)), str(args)))
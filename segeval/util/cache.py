@@ -0,0 +1,295 @@
+'''
+Persistent, content-addressed storage of pairwise metric results so that
+unchanged segmentation pairs need not be compared again between runs, and a
+bounded in-process memo for intermediate results.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+
+SCHEMA_VERSION = 1
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS results ('
+    'key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, '
+    'accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+
+class UncacheableError(ValueError):
+
+    '''
+    Indicates that a value (e.g., a lambda or closure) has no representation
+    that is stable across runs, and so cannot be part of a cache key.
+    '''
+    pass
+
+
+def __canonical__(value):
+    '''
+    Produce a string representation of a value that is identical for equal
+    values across runs.  Functions are represented by their module and
+    qualified name, partial functions by their function and arguments,
+    objects that define a ``__canonical__`` method by the values that it
+    returns, and sets by their sorted members.  Raises :class:`UncacheableError` for
+    callables that are not found by name within a module (e.g., lambdas and
+    closures), whose names do not identify them.
+    '''
+    if hasattr(value, 'items'):
+        return '{' + ','.join(sorted(
+            __canonical__(key) + ':' + __canonical__(inner_value)
+            for key, inner_value in value.items())) + '}'
+    elif isinstance(value, (set, frozenset)):
+        return 'set(' + ','.join(sorted(__canonical__(inner_value)
+                                        for inner_value in value)) + ')'
+    elif isinstance(value, (list, tuple)):
+        return '(' + ','.join(__canonical__(inner_value)
+                              for inner_value in value) + ')'
+    elif isinstance(value, partial):
+        return 'partial(' + ','.join((
+            __canonical__(value.func), __canonical__(value.args),
+            __canonical__(value.keywords or dict()))) + ')'
+    elif callable(getattr(value, '__canonical__', None)):
+        return '{0}{1}'.format(type(value).__name__,
+                               __canonical__(value.__canonical__()))
+    elif callable(value):
+        module = getattr(value, '__module__', None)
+        name = getattr(value, '__qualname__', getattr(value, '__name__', None))
+        if module is None or name is None or '<' in name:
+            raise UncacheableError(
+                'No stable representation of {0!r}'.format(value))
+        return 'fnc:{0}.{1}'.format(module, name)
+    return repr(value)
+
+
+def pair_key(fnc_metric, segmentation_a, segmentation_b, **kwargs):
+    '''
+    Hash a metric, a pair of segmentations, and the metric's keyword
+    arguments (e.g., boundary format, ``n_t``, weighting functions, and window
+    settings) into a cache key.
+
+    :param fnc_metric: Metric function applied to the pair.
+    :type fnc_metric: func
+    '''
+    content = __canonical__((SCHEMA_VERSION, fnc_metric, segmentation_a,
+                             segmentation_b, kwargs))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class PairwiseCache(object):
+
+    '''
+    An SQLite-backed cache of pairwise metric results keyed by
+    :func:`pair_key`.  When the pickled results stored exceed ``max_size``
+    bytes, the least recently used results are evicted.  Pass an instance as
+    the ``cache`` keyword argument of a metric (or agreement coefficient) to
+    serve unchanged pairs from the cache.
+    '''
+
+    def __init__(self, path=':memory:', max_size=256 * 1024 * 1024):
+        '''
+        Open (or create) a cache stored at ``path`` that holds at most
+        ``max_size`` bytes of results.
+        '''
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+        self.connection = sqlite3.connect(path)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        cursor = self.connection.execute('SELECT SUM(size) FROM results')
+        self.size = cursor.fetchone()[0] or 0
+
+    def get(self, key):
+        '''
+        Return a tuple of whether ``key`` was found and its result.
+        '''
+        cursor = self.connection.execute(
+            'SELECT value FROM results WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        if row is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        self.connection.execute(
+            'UPDATE results SET accessed = ? WHERE key = ?',
+            (time.time(), key))
+        return True, pickle.loads(bytes(row[0]))
+
+    def set(self, key, value):
+        '''
+        Store a result, evicting least recently used results if necessary.
+        '''
+        blob = pickle.dumps(value, 2)
+        cursor = self.connection.execute(
+            'SELECT size FROM results WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        if row is not None:
+            self.size -= row[0]
+        self.connection.execute(
+            'INSERT OR REPLACE INTO results (key, value, size, accessed) '
+            'VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(blob), len(blob), time.time()))
+        self.size += len(blob)
+        if self.size > self.max_size:
+            self.__evict__()
+
+    def __evict__(self):
+        cursor = self.connection.execute(
+            'SELECT key, size FROM results ORDER BY accessed, rowid')
+        evicted = list()
+        for key, size in cursor:
+            if self.size <= self.max_size:
+                break
+            evicted.append((key,))
+            self.size -= size
+        self.connection.executemany('DELETE FROM results WHERE key = ?',
+                                    evicted)
+        self.evictions += len(evicted)
+
+    def compute(self, fnc_metric, segmentation_a, segmentation_b, **kwargs):
+        '''
+        Return the cached result of ``fnc_metric`` upon a pair of
+        segmentations, computing and storing it if absent.  Results of
+        metrics (or arguments) without a stable key (see
+        :class:`UncacheableError`) are computed but not stored.
+        '''
+        try:
+            key = pair_key(fnc_metric, segmentation_a, segmentation_b,
+                           **kwargs)
+        except UncacheableError:
+            self.uncacheable += 1
+            return fnc_metric(segmentation_a, segmentation_b, **kwargs)
+        found, value = self.get(key)
+        if not found:
+            value = fnc_metric(segmentation_a, segmentation_b, **kwargs)
+            self.set(key, value)
+        return value
+
+    @property
+    def hit_rate(self):
+        '''
+        Proportion of lookups served from the cache.
+        '''
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    def stats(self):
+        '''
+        Return a ``dict`` of hit, miss, and eviction counts, the hit rate, and
+        the number and size of results stored.
+        '''
+        cursor = self.connection.execute('SELECT COUNT(*) FROM results')
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'uncacheable': self.uncacheable,
+                'hit_rate': self.hit_rate,
+                'entries': cursor.fetchone()[0], 'size': self.size}
+
+    def clear(self):
+        '''
+        Remove all stored results.
+        '''
+        self.connection.execute('DELETE FROM results')
+        self.size = 0
+
+    def commit(self):
+        '''
+        Persist all stored results to the database.
+        '''
+        self.connection.commit()
+
+    def close(self):
+        '''
+        Commit all stored results and close the database.
+        '''
+        self.commit()
+        self.connection.close()
+
+    def __len__(self):
+        cursor = self.connection.execute('SELECT COUNT(*) FROM results')
+        return cursor.fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LruMemo(object):
+
+    '''
+    A thread-safe, in-memory mapping that holds at most ``max_size`` values
+    (and, if ``max_bytes`` is given, values whose sizes as estimated by
+    ``fnc_size`` total at most ``max_bytes``), discarding the least recently
+    used values when full.  A ``max_size`` of zero disables memoization.
+    '''
+
+    def __init__(self, max_size=1024, max_bytes=None, fnc_size=None):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.fnc_size = fnc_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Values and their sizes, least recently used first
+        self.__values__ = OrderedDict()
+        self.__lock__ = threading.Lock()
+
+    def get(self, key):
+        '''
+        Return a tuple of whether ``key`` was found and its value.
+        '''
+        with self.__lock__:
+            try:
+                entry = self.__values__.pop(key)
+            except KeyError:
+                self.misses += 1
+                return False, None
+            self.__values__[key] = entry
+            self.hits += 1
+            return True, entry[0]
+
+    def set(self, key, value):
+        '''
+        Store a value, discarding least recently used values if full.  Values
+        larger than ``max_bytes`` are not stored.
+        '''
+        size = self.fnc_size(value) if self.fnc_size is not None else 0
+        with self.__lock__:
+            entry = self.__values__.pop(key, None)
+            if entry is not None:
+                self.size -= entry[1]
+            if self.max_size <= 0 or \
+                    (self.max_bytes is not None and size > self.max_bytes):
+                return
+            while len(self.__values__) >= self.max_size or \
+                    (self.max_bytes is not None and
+                     self.size + size > self.max_bytes):
+                self.size -= self.__values__.popitem(last=False)[1][1]
+            self.__values__[key] = (value, size)
+            self.size += size
+
+    def clear(self):
+        '''
+        Remove all values and reset statistics.
+        '''
+        with self.__lock__:
+            self.__values__.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.__values__)
@@ -0,0 +1,201 @@
+'''
+Tests the persistent pairwise result cache and the in-process memo.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from segeval.data.samples import KAZANTSEVA2012_G5, HEARST_1997_STARGAZER
+from segeval.util.cache import (PairwiseCache, LruMemo, UncacheableError,
+                                pair_key)
+from segeval.metric import make_metric
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.weight import weight_a, weight_s, weight_t
+from segeval.window.pk import pk
+from segeval.agreement.kappa import fleiss_kappa_linear
+
+
+class TestPairwiseCache(unittest.TestCase):
+
+    '''
+    Test the persistent pairwise result cache.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_pair_key(self):
+        '''
+        Test that keys differ by segmentation, metric, and keyword argument.
+        '''
+        key = pair_key(boundary_similarity, (2, 3), (5,), n_t=2)
+        self.assertEqual(key, pair_key(boundary_similarity, [2, 3], (5,),
+                                       n_t=2))
+        self.assertNotEqual(key, pair_key(boundary_similarity, (5,), (2, 3),
+                                          n_t=2))
+        self.assertNotEqual(key, pair_key(pk, (2, 3), (5,), n_t=2))
+        self.assertNotEqual(key, pair_key(boundary_similarity, (2, 3), (5,),
+                                          n_t=3))
+        self.assertNotEqual(
+            pair_key(boundary_similarity, (2, 3), (5,),
+                     weight=(weight_a, weight_s, weight_t)),
+            pair_key(boundary_similarity, (2, 3), (5,),
+                     weight=(weight_a, weight_s, weight_s)))
+        self.assertEqual(
+            pair_key(boundary_similarity, (2, 3), (5,),
+                     boundary_types=set([1, 2])),
+            pair_key(boundary_similarity, (2, 3), (5,),
+                     boundary_types=frozenset([2, 1])))
+
+    def test_unstable_callables(self):
+        '''
+        Test that partials are keyed by their arguments, and that lambdas are
+        not keyed (and so not cached) at all.
+        '''
+        self.assertNotEqual(
+            pair_key(partial(boundary_similarity, n_t=2), (2, 3), (5,)),
+            pair_key(partial(boundary_similarity, n_t=3), (2, 3), (5,)))
+        self.assertEqual(
+            pair_key(partial(boundary_similarity, n_t=2), (2, 3), (5,)),
+            pair_key(partial(boundary_similarity, n_t=2), (2, 3), (5,)))
+        self.assertNotEqual(
+            pair_key(make_metric('pk', window_size=3), (2, 3), (5,)),
+            pair_key(make_metric('pk', window_size=4), (2, 3), (5,)))
+        self.assertRaises(UncacheableError, pair_key,
+                          lambda a, b: 0, (2, 3), (5,))
+        self.assertRaises(UncacheableError, pair_key, boundary_similarity,
+                          (2, 3), (5,), weight=(weight_a, weight_s,
+                                                lambda edits, n_t: 0))
+        cache = PairwiseCache(self.path)
+        self.assertEqual(1, cache.compute(lambda a, b: 1, (2, 3), (5,)))
+        self.assertEqual(2, cache.compute(lambda a, b: 2, (2, 3), (5,)))
+        self.assertEqual((0, 2), (len(cache), cache.uncacheable))
+        cache.close()
+
+    def test_dataset(self):
+        '''
+        Test that a second evaluation is served entirely from the cache.
+        '''
+        expected = boundary_similarity(KAZANTSEVA2012_G5)
+        with PairwiseCache(self.path) as cache:
+            value = boundary_similarity(KAZANTSEVA2012_G5, cache=cache)
+            self.assertEqual(expected, value)
+            self.assertEqual(0, cache.hits)
+        with PairwiseCache(self.path) as cache:
+            value = boundary_similarity(KAZANTSEVA2012_G5, cache=cache)
+            self.assertEqual(expected, value)
+            self.assertEqual(0, cache.misses)
+            self.assertEqual(1, cache.hit_rate)
+            self.assertEqual(len(cache), cache.stats()['entries'])
+
+    def test_single_pair(self):
+        '''
+        Test caching a single pair of segmentations.
+        '''
+        cache = PairwiseCache()
+        self.assertEqual(pk([2, 3, 6], [5, 6]),
+                         pk([2, 3, 6], [5, 6], cache=cache))
+        self.assertEqual(pk([2, 3, 6], [5, 6]),
+                         pk([2, 3, 6], [5, 6], cache=cache))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        pk([2, 3, 6], [5, 6], window_size=3, cache=cache)
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
+
+    def test_agreement(self):
+        '''
+        Test caching the pairwise comparisons of agreement coefficients.
+        '''
+        cache = PairwiseCache()
+        expected = fleiss_kappa_linear(HEARST_1997_STARGAZER)
+        self.assertEqual(expected,
+                         fleiss_kappa_linear(HEARST_1997_STARGAZER,
+                                             cache=cache))
+        self.assertEqual(expected,
+                         fleiss_kappa_linear(HEARST_1997_STARGAZER,
+                                             cache=cache))
+        self.assertEqual(0.5, cache.hit_rate)
+
+    def test_eviction(self):
+        '''
+        Test that the least recently used results are evicted.
+        '''
+        cache = PairwiseCache(max_size=200)
+        for i in range(0, 10):
+            cache.set(str(i), [i] * 10)
+        self.assertTrue(cache.size <= 200)
+        self.assertTrue(cache.evictions > 0)
+        self.assertEqual((False, None), cache.get('0'))
+        self.assertEqual((True, [9] * 10), cache.get('9'))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+
+class TestLruMemo(unittest.TestCase):
+
+    '''
+    Test the in-process memo.
+    '''
+
+    def test_eviction(self):
+        '''
+        Test that the least recently used value is discarded.
+        '''
+        memo = LruMemo(max_size=2)
+        memo.set('a', 1)
+        memo.set('b', 2)
+        self.assertEqual((True, 1), memo.get('a'))
+        memo.set('c', 3)
+        self.assertEqual((False, None), memo.get('b'))
+        self.assertEqual((True, 1), memo.get('a'))
+        self.assertEqual(2, len(memo))
+
+    def test_disabled(self):
+        '''
+        Test that a memo of size zero holds nothing.
+        '''
+        memo = LruMemo(max_size=0)
+        memo.set('a', 1)
+        self.assertEqual((False, None), memo.get('a'))
+
+    def test_max_bytes(self):
+        '''
+        Test that values are discarded to keep their total size bounded.
+        '''
+        memo = LruMemo(max_bytes=10, fnc_size=len)
+        memo.set('a', 'x' * 4)
+        memo.set('b', 'x' * 4)
+        memo.set('c', 'x' * 4)
+        self.assertEqual((False, None), memo.get('a'))
+        self.assertEqual((True, 'x' * 4), memo.get('b'))
+        self.assertEqual(8, memo.size)
+        memo.set('d', 'x' * 11)
+        self.assertEqual((False, None), memo.get('d'))
+        self.assertEqual(2, len(memo))
+
+    def test_threads(self):
+        '''
+        Test that concurrent use does not exceed the size limit.
+        '''
+        memo = LruMemo(max_size=16)
+
+        def __use__(offset):
+            for i in range(0, 500):
+                memo.set(offset + i, i)
+                memo.get(offset + i // 2)
+        threads = [threading.Thread(target=__use__, args=(offset * 1000,))
+                   for offset in range(0, 4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(16, len(memo))
+        self.assertEqual(2000, memo.hits + memo.misses)
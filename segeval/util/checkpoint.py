@@ -0,0 +1,155 @@
+'''
+Checkpoints of long dataset evaluations, so that a run that is interrupted
+can be resumed.  Pass a :class:`Checkpoint` as the ``checkpoint`` keyword
+argument of a metric or agreement coefficient given a dataset, e.g.::
+
+    with Checkpoint('kappa.checkpoint') as checkpoint:
+        kappa = fleiss_kappa_linear(dataset, checkpoint=checkpoint)
+
+Each completed comparison is stored (and periodically committed) under a
+fingerprint of the run: the metric, its options, and the dataset.  When the
+same run is repeated (e.g., after being preempted), stored comparisons are
+restored instead of being computed again, producing identical results.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import hashlib
+import pickle
+import sqlite3
+import timeit
+from segeval.util.cache import __canonical__
+
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS comparisons ('
+    'run TEXT NOT NULL, entry TEXT NOT NULL, value BLOB NOT NULL, '
+    'PRIMARY KEY (run, entry))',)
+
+
+def run_fingerprint(fnc_metric, dataset_a, dataset_b=None, **kwargs):
+    '''
+    Hash a metric, the dataset(s) that it is computed upon, and its keyword
+    arguments into an identifier of a run.  Datasets are hashed one item at a
+    time (in label order), so that no representation of a whole dataset is
+    held at once.
+    '''
+    digest = hashlib.sha1()
+
+    def __update__(value):
+        digest.update(__canonical__(value).encode('utf-8'))
+
+    __update__((fnc_metric, kwargs))
+    for dataset in (dataset_a, dataset_b):
+        if not hasattr(dataset, 'keys'):
+            __update__(dataset)
+            continue
+        items = sorted(dataset.keys(), key=__canonical__)
+        __update__(('dataset', len(items)))
+        for item in items:
+            __update__((item, dataset[item]))
+    return digest.hexdigest()
+
+
+class Checkpoint(object):
+
+    '''
+    An SQLite-backed store of the comparisons completed by runs, committed
+    every ``commit_every`` comparisons or ``commit_interval`` seconds
+    (whichever is first), and when closed.
+    '''
+
+    def __init__(self, path, commit_every=1000, commit_interval=30.0,
+                 clock=timeit.default_timer):
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.clock = clock
+        self.run = None
+        self.restored = 0
+        self.__values__ = dict()
+        self.__uncommitted__ = 0
+        self.__committed__ = clock()
+        self.connection = sqlite3.connect(path)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+
+    def resume(self, run):
+        '''
+        Begin (or resume) the run identified by ``run`` (see
+        :func:`run_fingerprint`), returning the number of comparisons restored.
+        '''
+        self.commit()
+        self.run = run
+        cursor = self.connection.execute(
+            'SELECT entry, value FROM comparisons WHERE run = ?', (run,))
+        self.__values__ = dict((entry, pickle.loads(bytes(value)))
+                               for entry, value in cursor)
+        self.restored = len(self.__values__)
+        return self.restored
+
+    def get(self, entry):
+        '''
+        Return a tuple of whether the comparison ``entry`` of the current run
+        was completed and its value.
+        '''
+        if entry in self.__values__:
+            return True, self.__values__[entry]
+        return False, None
+
+    def set(self, entry, value):
+        '''
+        Store the value of a completed comparison of the current run.
+        '''
+        self.__values__[entry] = value
+        self.connection.execute(
+            'INSERT OR REPLACE INTO comparisons (run, entry, value) '
+            'VALUES (?, ?, ?)',
+            (self.run, entry, sqlite3.Binary(pickle.dumps(value, 2))))
+        self.__uncommitted__ += 1
+        if self.__uncommitted__ >= self.commit_every or \
+                self.clock() - self.__committed__ >= self.commit_interval:
+            self.commit()
+
+    def compute(self, entry, fnc_compare, *args):
+        '''
+        Return the stored value of ``entry``, or call ``fnc_compare`` with
+        ``args`` and store its value.
+        '''
+        found, value = self.get(entry)
+        if not found:
+            value = fnc_compare(*args)
+            self.set(entry, value)
+        return value
+
+    def clear(self):
+        '''
+        Remove the comparisons of all runs.
+        '''
+        self.connection.execute('DELETE FROM comparisons')
+        self.connection.commit()
+        self.__values__ = dict()
+
+    def commit(self):
+        '''
+        Persist all stored comparisons.
+        '''
+        self.connection.commit()
+        self.__uncommitted__ = 0
+        self.__committed__ = self.clock()
+
+    def close(self):
+        '''
+        Commit all stored comparisons and close the database.
+        '''
+        self.commit()
+        self.connection.close()
+
+    def __len__(self):
+        return len(self.__values__)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
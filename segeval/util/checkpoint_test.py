@@ -0,0 +1,171 @@
+'''
+Tests checkpoints of dataset evaluations.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import segeval
+from segeval.util.test import TestCase
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.agreement import __agreement_comparisons__
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.similarity.boundary import boundary_similarity
+from segeval.util.cache import PairwiseCache
+from segeval.util.checkpoint import Checkpoint, run_fingerprint
+from segeval.util.progress import Progress
+
+
+class Interrupted(Exception):
+    pass
+
+
+def __interrupt_after__(count):
+    '''
+    Progress callback that interrupts a run after ``count`` comparisons.
+    '''
+    def __callback__(progress):
+        if progress.completed - progress.skipped >= count:
+            raise Interrupted()
+    return __callback__
+
+
+class TestCheckpoint(TestCase):
+
+    '''
+    Test checkpoints of dataset evaluations.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'run.checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def __resume__(self, fnc_metric, **kwargs):
+        '''
+        Interrupt a run after 5 comparisons and then resume it, returning its
+        value and the number of comparisons restored.
+        '''
+        with Checkpoint(self.path, commit_every=1) as checkpoint:
+            self.assertRaises(Interrupted, fnc_metric, KAZANTSEVA2012_G5,
+                              checkpoint=checkpoint,
+                              progress=__interrupt_after__(5), **kwargs)
+        progress = Progress()
+        with Checkpoint(self.path) as checkpoint:
+            value = fnc_metric(KAZANTSEVA2012_G5, checkpoint=checkpoint,
+                               progress=progress, **kwargs)
+        return value, progress.skipped
+
+    def test_pairwise(self):
+        '''
+        Test resuming pairwise values.
+        '''
+        value, restored = self.__resume__(boundary_similarity)
+        self.assertEqual(boundary_similarity(KAZANTSEVA2012_G5), value)
+        self.assertEqual(5, restored)
+
+    def test_agreement(self):
+        '''
+        Test resuming agreement.
+        '''
+        value, restored = self.__resume__(fleiss_kappa_linear)
+        self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5), value)
+        self.assertEqual(5, restored)
+
+    def test_agreement_cache(self):
+        '''
+        Test resuming agreement computed using (a different) cache.
+        '''
+        with Checkpoint(self.path, commit_every=1) as checkpoint:
+            self.assertRaises(Interrupted, fleiss_kappa_linear,
+                              KAZANTSEVA2012_G5, checkpoint=checkpoint,
+                              progress=__interrupt_after__(5),
+                              cache=PairwiseCache())
+        progress = Progress()
+        with Checkpoint(self.path) as checkpoint:
+            value = fleiss_kappa_linear(KAZANTSEVA2012_G5,
+                                        checkpoint=checkpoint,
+                                        progress=progress,
+                                        cache=PairwiseCache())
+        self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5), value)
+        self.assertEqual(5, progress.skipped)
+
+    def test_agreement_stale(self):
+        '''
+        Test that stored comparisons that a run does not make are not counted
+        as restored.
+        '''
+        with Checkpoint(self.path) as checkpoint:
+            expected = fleiss_kappa_linear(KAZANTSEVA2012_G5,
+                                           checkpoint=checkpoint)
+            checkpoint.set('stale,an1,an2', None)
+        progress = Progress()
+        with Checkpoint(self.path) as checkpoint:
+            self.assertEqual(expected, fleiss_kappa_linear(
+                KAZANTSEVA2012_G5, checkpoint=checkpoint, progress=progress))
+        total = len(__agreement_comparisons__(KAZANTSEVA2012_G5))
+        self.assertEqual(total, progress.total)
+        self.assertEqual(total, progress.skipped)
+        self.assertEqual(total, progress.completed)
+
+    def test_agreement_hash_seeds(self):
+        '''
+        Test resuming agreement in processes with differing hash seeds.
+        '''
+        script = (
+            'import sys\n'
+            'from segeval.data.jsonutils import input_linear_mass_json\n'
+            'from segeval.agreement.kappa import fleiss_kappa_linear\n'
+            'from segeval.util.checkpoint import Checkpoint\n'
+            'from segeval.util.progress import Progress\n'
+            'progress = Progress()\n'
+            'with Checkpoint(sys.argv[2]) as checkpoint:\n'
+            '    value = fleiss_kappa_linear(input_linear_mass_json('
+            'sys.argv[1]), checkpoint=checkpoint, progress=progress)\n'
+            'print(value, progress.skipped, progress.total)\n')
+        dataset_path = os.path.join(os.path.dirname(os.path.dirname(
+            __file__)), 'data', 'hearst1997.json')
+        directory = os.path.dirname(os.path.dirname(segeval.__file__))
+        outputs = list()
+        for seed in (1, 2, 3):
+            environment = dict(os.environ, PYTHONHASHSEED=str(seed))
+            outputs.append(subprocess.check_output(
+                [sys.executable, '-c', script, dataset_path, self.path],
+                cwd=directory, env=environment,
+                universal_newlines=True).split())
+        self.assertEqual(['0', '21'], outputs[0][1:])
+        for output in outputs[1:]:
+            self.assertEqual([outputs[0][0], '21', '21'], output)
+
+    def test_runs(self):
+        '''
+        Test that runs with differing options are stored separately.
+        '''
+        self.assertNotEqual(
+            run_fingerprint(boundary_similarity, KAZANTSEVA2012_G5, n_t=2),
+            run_fingerprint(boundary_similarity, KAZANTSEVA2012_G5, n_t=3))
+        self.assertEqual(
+            run_fingerprint(boundary_similarity, KAZANTSEVA2012_G5),
+            run_fingerprint(boundary_similarity,
+                            dict(reversed(list(KAZANTSEVA2012_G5.items())))))
+        self.assertNotEqual(
+            run_fingerprint(boundary_similarity, KAZANTSEVA2012_G5),
+            run_fingerprint(boundary_similarity,
+                            dict(list(KAZANTSEVA2012_G5.items())[1:])))
+        with Checkpoint(self.path) as checkpoint:
+            expected = boundary_similarity(KAZANTSEVA2012_G5,
+                                           checkpoint=checkpoint)
+            self.assertEqual(len(expected), len(checkpoint))
+            self.assertEqual(
+                boundary_similarity(KAZANTSEVA2012_G5, n_t=3),
+                boundary_similarity(KAZANTSEVA2012_G5, n_t=3,
+                                    checkpoint=checkpoint))
+            self.assertEqual(expected, boundary_similarity(
+                KAZANTSEVA2012_G5, checkpoint=checkpoint))
+            self.assertEqual(len(expected), checkpoint.restored)
@@ -0,0 +1,203 @@
+'''
+Opt-in, stage-level profiling of the metric pipelines.  Stages are functions
+identified by their dotted names; while a :class:`Profiler` is active each is
+replaced (wherever it is referenced within ``segeval``) by a wrapper that
+records call counts, cumulative wall time, and input sizes.  Nothing is
+replaced, and so no overhead is incurred, while no profiler is active.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import functools
+import importlib
+import sys
+import threading
+import timeit
+
+
+STAGES = [
+    # Metric and agreement dispatch
+    'segeval.util.__fnc_metric__',
+    'segeval.compute.compute_pairwise_values',
+    'segeval.agreement.__fnc_metric__',
+    # Format conversion
+    'segeval.format.convert_positions_to_masses',
+    'segeval.format.convert_nltk_to_masses',
+    'segeval.format.boundary_string_from_masses',
+    # Boundary edit distance
+    'segeval.similarity.__boundary_statistics__',
+    'segeval.similarity.distance.identify_types',
+    'segeval.similarity.distance.multipleboundary.__boundary_edit_distance__',
+    'segeval.similarity.distance.multipleboundary.__optional_set_edits__',
+    'segeval.similarity.distance.multipleboundary.__transpositions__',
+    'segeval.similarity.distance.multipleboundary.'
+    '__additions_substitutions_sets__',
+    # Weighting
+    'segeval.similarity.weight.weight_a',
+    'segeval.similarity.weight.weight_s',
+    'segeval.similarity.weight.weight_s_scale',
+    'segeval.similarity.weight.weight_t',
+    'segeval.similarity.weight.weight_t_scale',
+    # Window-based metrics
+    'segeval.window.__compute_window_size__',
+    'segeval.window.pk.__pk__',
+    'segeval.window.windowdiff.__create_paired_window__',
+    'segeval.window.windowdiff.__window_diff__',
+    # Agreement
+    'segeval.agreement.__actual_agreement_linear__',
+    'segeval.agreement.__potential_boundaries__',
+    'segeval.agreement.__boundaries__',
+    'segeval.agreement.pi.__fleiss_pi_linear__',
+    'segeval.agreement.kappa.__fleiss_kappa_linear__',
+    'segeval.agreement.bias.__artstein_poesio_bias_linear__',
+]
+'''
+Dotted names of the functions profiled by default.
+'''
+
+
+def __resolve__(stage):
+    '''
+    Import and return the function identified by a dotted name.
+    '''
+    module_name, name = stage.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), name)
+
+
+def __input_size__(args):
+    '''
+    Size of the first argument of a call, if it has one.
+    '''
+    if len(args) > 0 and hasattr(args[0], '__len__'):
+        return len(args[0])
+    return 0
+
+
+class Profiler(object):
+
+    '''
+    A context manager that profiles each of ``stages`` (default
+    :data:`STAGES`) while active.  Each ``callback`` is called as
+    ``callback(stage, elapsed, size)`` after every profiled call.  Profiling
+    is process-wide, so only one profiler should be active at a time.
+    '''
+
+    def __init__(self, stages=None, callbacks=None):
+        self.stages = list(stages if stages is not None else STAGES)
+        self.callbacks = list(callbacks) if callbacks is not None else list()
+        self.statistics = dict()
+        self.__lock__ = threading.Lock()
+        self.__replaced__ = list()
+
+    def __record__(self, stage, elapsed, size):
+        with self.__lock__:
+            statistics = self.statistics.get(stage)
+            if statistics is None:
+                statistics = {'calls': 0, 'time': 0.0, 'size': 0,
+                              'max_size': 0}
+                self.statistics[stage] = statistics
+            statistics['calls'] += 1
+            statistics['time'] += elapsed
+            statistics['size'] += size
+            statistics['max_size'] = max(statistics['max_size'], size)
+        for callback in self.callbacks:
+            callback(stage, elapsed, size)
+
+    def __wrap__(self, stage, fnc):
+        record = self.__record__
+        timer = timeit.default_timer
+
+        @functools.wraps(fnc)
+        def __profiled__(*args, **kwargs):
+            start = timer()
+            try:
+                return fnc(*args, **kwargs)
+            finally:
+                record(stage, timer() - start, __input_size__(args))
+        return __profiled__
+
+    def __replace__(self, container, key, value):
+        if isinstance(container, dict):
+            self.__replaced__.append((container, key, container[key]))
+            container[key] = value
+        else:
+            self.__replaced__.append((container, key, getattr(container, key)))
+            setattr(container, key, value)
+
+    def start(self):
+        '''
+        Begin profiling by replacing every reference to each stage found in
+        the ``segeval`` modules loaded, including within module-level
+        ``dict`` defaults (e.g., weighting functions).
+        '''
+        wrappers = dict()
+        for stage in self.stages:
+            fnc = __resolve__(stage)
+            wrappers[id(fnc)] = (fnc, self.__wrap__(stage, fnc))
+
+        def __wrapped__(value):
+            entry = wrappers.get(id(value))
+            if entry is not None and entry[0] is value:
+                return entry[1]
+            return None
+        for module_name, module in list(sys.modules.items()):
+            if module is None or not module_name.startswith('segeval'):
+                continue
+            for name, value in list(vars(module).items()):
+                wrapper = __wrapped__(value)
+                if wrapper is not None:
+                    self.__replace__(module, name, wrapper)
+                elif isinstance(value, dict) and name.isupper():
+                    for key, inner_value in list(value.items()):
+                        wrapper = __wrapped__(inner_value)
+                        if wrapper is not None:
+                            self.__replace__(value, key, wrapper)
+                        elif isinstance(inner_value, tuple):
+                            wrapped = tuple(__wrapped__(fnc) or fnc
+                                            for fnc in inner_value)
+                            if wrapped != inner_value:
+                                self.__replace__(value, key, wrapped)
+        return self
+
+    def stop(self):
+        '''
+        Stop profiling and restore all references replaced.
+        '''
+        while len(self.__replaced__) > 0:
+            container, key, value = self.__replaced__.pop()
+            if isinstance(container, dict):
+                container[key] = value
+            else:
+                setattr(container, key, value)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def report(self):
+        '''
+        Return a ``dict`` of statistics per stage called, including the
+        number of ``calls``, cumulative wall ``time`` in seconds, and the
+        total and maximum input ``size`` (the length of the first argument).
+        '''
+        with self.__lock__:
+            return dict((stage, dict(statistics))
+                        for stage, statistics in self.statistics.items())
+
+    def dump(self, stream=None):
+        '''
+        Write a table of stage statistics, slowest first, to ``stream``
+        (default ``sys.stdout``).
+        '''
+        stream = stream if stream is not None else sys.stdout
+        report = self.report()
+        stream.write('{0:>10} {1:>12} {2:>12} {3:>10}  {4}\n'.format(
+            'calls', 'time (s)', 'mean size', 'max size', 'stage'))
+        for stage in sorted(report, key=lambda stage: -report[stage]['time']):
+            statistics = report[stage]
+            stream.write('{0:>10} {1:>12.6f} {2:>12.1f} {3:>10}  {4}\n'.format(
+                statistics['calls'], statistics['time'],
+                statistics['size'] / statistics['calls'],
+                statistics['max_size'], stage))
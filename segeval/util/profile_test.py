@@ -0,0 +1,83 @@
+'''
+Tests stage-level profiling.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.util.profile import Profiler
+from segeval.similarity import SIMILARITY_METRIC_DEFAULTS
+from segeval.similarity.distance import multipleboundary
+from segeval.similarity.boundary import boundary_similarity
+from segeval.similarity.segmentation import segmentation_similarity
+from segeval.window.windowdiff import window_diff
+from segeval.agreement.pi import fleiss_pi_linear
+
+
+class TestProfiler(unittest.TestCase):
+
+    '''
+    Test stage-level profiling.
+    '''
+
+    def test_stages(self):
+        '''
+        Test that stages across packages are recorded.
+        '''
+        with Profiler() as profiler:
+            boundary_similarity([2, 3, 6], [5, 6])
+        report = profiler.report()
+        stage = 'segeval.similarity.distance.multipleboundary.' \
+            '__optional_set_edits__'
+        self.assertEqual(1, report[stage]['calls'])
+        self.assertEqual(10, report[stage]['max_size'])
+        self.assertEqual(
+            1, report['segeval.similarity.weight.weight_s_scale']['calls'])
+        with Profiler() as profiler:
+            window_diff([2, 3, 6], [5, 6])
+            fleiss_pi_linear(KAZANTSEVA2012_G5)
+        report = profiler.report()
+        self.assertEqual(
+            1, report['segeval.window.windowdiff.__window_diff__']['calls'])
+        self.assertEqual(
+            1, report['segeval.agreement.pi.__fleiss_pi_linear__']['calls'])
+
+    def test_restore(self):
+        '''
+        Test that all replaced references are restored.
+        '''
+        fnc = multipleboundary.__transpositions__
+        weight = SIMILARITY_METRIC_DEFAULTS['weight']
+        with Profiler():
+            self.assertFalse(fnc is multipleboundary.__transpositions__)
+            self.assertFalse(weight is SIMILARITY_METRIC_DEFAULTS['weight'])
+        self.assertTrue(fnc is multipleboundary.__transpositions__)
+        self.assertTrue(weight is SIMILARITY_METRIC_DEFAULTS['weight'])
+
+    def test_callbacks(self):
+        '''
+        Test that callbacks receive each profiled call.
+        '''
+        calls = list()
+        stage = 'segeval.similarity.segmentation.__segmentation_similarity__'
+        with Profiler(stages=[stage],
+                      callbacks=[lambda *args: calls.append(args)]):
+            segmentation_similarity([2, 3, 6], [5, 6])
+        self.assertEqual(1, len(calls))
+        self.assertEqual(stage, calls[0][0])
+
+    def test_dump(self):
+        '''
+        Test that a report can be written.
+        '''
+        stream = StringIO()
+        with Profiler() as profiler:
+            boundary_similarity([2, 3, 6], [5, 6])
+        profiler.dump(stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(len(profiler.report()) + 1, len(lines))
@@ -0,0 +1,132 @@
+'''
+Progress reporting for long pairwise and agreement computations.  Pass a
+:class:`Progress` (or any function, which is called with one) as the
+``progress`` keyword argument of a metric or agreement coefficient given a
+dataset, e.g.::
+
+    progress = Progress(stream=sys.stderr)
+    fleiss_kappa_linear(dataset, progress=progress)
+
+to receive completed and total pair counts, per-item timings, and an
+estimate of the time remaining after each pair is compared.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import, division
+import timeit
+
+
+class Progress(object):
+
+    '''
+    Tracks the pairs compared by a computation.  After each pair, ``callback``
+    (if any) is called with this object, and a line describing progress is
+    written to ``stream`` (if any) at most every ``interval`` seconds.
+
+    The item being compared, and for how long it has been, can be read from
+    another thread (see :attr:`current_item` and :meth:`current_elapsed`) to
+    notice a pair that is taking unusually long as it happens.
+    '''
+
+    def __init__(self, callback=None, stream=None, interval=1.0,
+                 clock=timeit.default_timer):
+        self.callback = callback
+        self.stream = stream
+        self.interval = interval
+        self.clock = clock
+        self.start(0)
+
+    def start(self, total, completed=0):
+        '''
+        Begin tracking a computation of ``total`` pairs, of which
+        ``completed`` were already compared (e.g., restored from a
+        checkpoint) and so are not used to estimate the time remaining.
+        '''
+        self.total = total
+        self.completed = completed
+        self.skipped = completed
+        self.item_times = dict()
+        self.current_item = None
+        self.started = self.clock()
+        self.current_started = self.started
+        self.last_written = None
+
+    def begin(self, item):
+        '''
+        Record that a pair of codings of ``item`` is being compared.
+        '''
+        self.current_item = item
+        self.current_started = self.clock()
+
+    def advance(self, item):
+        '''
+        Record that a pair of codings of ``item`` has been compared.
+        '''
+        now = self.clock()
+        self.completed += 1
+        self.item_times[item] = self.item_times.get(item, 0) + \
+            now - self.current_started
+        self.current_item = None
+        self.current_started = now
+        if self.callback is not None:
+            self.callback(self)
+        if self.stream is not None and (
+                self.last_written is None or self.completed == self.total or
+                now - self.last_written >= self.interval):
+            self.stream.write(self.report() + '\n')
+            self.last_written = now
+
+    def elapsed(self):
+        '''
+        Seconds since the computation started.
+        '''
+        return self.clock() - self.started
+
+    def current_elapsed(self):
+        '''
+        Seconds spent comparing the current pair, or ``None`` if no pair is
+        being compared.
+        '''
+        if self.current_item is None:
+            return None
+        return self.clock() - self.current_started
+
+    def eta(self):
+        '''
+        Estimated seconds remaining, assuming that remaining pairs take as
+        long as completed pairs did on average, or ``None`` before any pair
+        has been compared.
+        '''
+        compared = self.completed - self.skipped
+        if compared == 0:
+            return None
+        return self.elapsed() / compared * (self.total - self.completed)
+
+    def slowest_items(self, count=5):
+        '''
+        The ``count`` items upon which the most time was spent, as a list of
+        ``(item, seconds)`` tuples.
+        '''
+        return sorted(self.item_times.items(), key=lambda entry: entry[1],
+                      reverse=True)[:count]
+
+    def report(self):
+        '''
+        Describe progress in one line.
+        '''
+        eta = self.eta()
+        return '{0}/{1} pairs ({2:.1f}%), {3:.1f}s elapsed, ETA {4}'.format(
+            self.completed, self.total,
+            100 * self.completed / self.total if self.total > 0 else 100,
+            self.elapsed(), '{0:.1f}s'.format(eta) if eta is not None
+            else 'unknown')
+
+
+def as_progress(progress):
+    '''
+    Return ``progress`` if it is a :class:`Progress` (or ``None``), or wrap a
+    function in one that calls it.
+    '''
+    if progress is None or isinstance(progress, Progress):
+        return progress
+    return Progress(callback=progress)
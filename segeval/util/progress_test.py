@@ -0,0 +1,98 @@
+'''
+Tests progress reporting.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+from io import StringIO
+from segeval.util.test import TestCase
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.agreement.bias import artstein_poesio_bias_linear
+from segeval.agreement.kappa import fleiss_kappa_linear
+from segeval.similarity.boundary import boundary_similarity
+from segeval.util.progress import Progress
+
+
+class Clock(object):
+
+    '''
+    A clock that only advances when told to.
+    '''
+
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+class TestProgress(TestCase):
+
+    '''
+    Test progress reporting.
+    '''
+
+    def test_progress(self):
+        '''
+        Test counts, timings, and ETA.
+        '''
+        stream = StringIO()
+        clock = Clock()
+        progress = Progress(stream=stream, interval=100, clock=clock)
+        progress.start(4)
+        self.assertEqual(None, progress.eta())
+        progress.begin('a')
+        clock.time = 1
+        self.assertEqual('a', progress.current_item)
+        self.assertEqual(1, progress.current_elapsed())
+        clock.time = 2
+        progress.advance('a')
+        self.assertEqual(None, progress.current_elapsed())
+        progress.begin('b')
+        clock.time = 3
+        progress.advance('b')
+        self.assertEqual(2, progress.completed)
+        self.assertEqual({'a': 2, 'b': 1}, progress.item_times)
+        self.assertEqual([('a', 2)], progress.slowest_items(1))
+        # 3 seconds elapsed for 2 of 4 pairs
+        self.assertEqual(3, progress.eta())
+        # Only the first line is written within the interval
+        self.assertEqual(['1/4 pairs (25.0%), 2.0s elapsed, ETA 6.0s'],
+                         stream.getvalue().splitlines())
+
+    def test_pairwise(self):
+        '''
+        Test progress driven by pairwise comparisons of a dataset.
+        '''
+        updates = list()
+        values = boundary_similarity(KAZANTSEVA2012_G5, progress=lambda
+                                     progress: updates.append(
+                                         (progress.completed,
+                                          progress.total)))
+        self.assertEqual(len(values), len(updates))
+        self.assertEqual((len(values), len(values)), updates[-1])
+        progress = Progress()
+        self.assertEqual(
+            boundary_similarity(KAZANTSEVA2012_G5, permuted=True),
+            boundary_similarity(KAZANTSEVA2012_G5, permuted=True,
+                                progress=progress))
+        self.assertEqual(2 * len(values), progress.total)
+        self.assertEqual(set(KAZANTSEVA2012_G5), set(progress.item_times))
+
+    def test_agreement(self):
+        '''
+        Test progress driven by agreement comparisons, which are made once
+        for bias.
+        '''
+        progress = Progress()
+        self.assertEqual(fleiss_kappa_linear(KAZANTSEVA2012_G5),
+                         fleiss_kappa_linear(KAZANTSEVA2012_G5,
+                                             progress=progress))
+        total = progress.total
+        self.assertEqual(total, progress.completed)
+        self.assertTrue(total > 0)
+        progress = Progress()
+        self.assertEqual(artstein_poesio_bias_linear(KAZANTSEVA2012_G5),
+                         artstein_poesio_bias_linear(KAZANTSEVA2012_G5,
+                                                     progress=progress))
+        self.assertEqual(total, progress.completed)
@@ -42,12 +42,9 @@ def __pk__(hypothesis, reference, window_size, one_minus, boundary_format,
     # Slide window over and sum the number of varying windows
     measurements = 0
     for i in range(0, len(reference) - (window_size)):
-        # Create probe windows with k boundaries inside
-        window_ref = reference[i:i + window_size + 1]
-        window_hyp = hypothesis[i:i + window_size + 1]
-        # Probe agreement
-        agree_ref = window_ref[0] is window_ref[-1]
-        agree_hyp = window_hyp[0] is window_hyp[-1]
+        # Probe agreement between the ends of windows with k boundaries inside
+        agree_ref = reference[i] == reference[i + window_size]
+        agree_hyp = hypothesis[i] == hypothesis[i + window_size]
         # If the windows agreements agree
         if agree_ref is not agree_hyp:
             sum_differences += 1
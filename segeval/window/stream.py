@@ -0,0 +1,290 @@
+'''
+Pk and WindowDiff of segmentations that arrive as streams (e.g., from a live
+transcription segmenter), computed in memory bounded by the window size.
+Only the units of the last window and running counts of disagreements are
+held, rather than every position label, so a stream can be scored as it
+arrives::
+
+    stream = WindowDiffStream(window_size=4)
+    for hypothesis_masses, reference_masses in segmenter:
+        stream.push(hypothesis_masses, reference_masses)
+        print(stream.value())
+
+Segmentations are pushed as segment masses or, with
+``boundary_format=BoundaryFormat.position``, as position labels, in chunks of
+any length, so one stream may run ahead of the other.  Values are those of
+the units received from both streams so far (units of one stream are held
+until the other catches up), and equal the parts (and values) that :func:`pk`
+and :func:`window_diff` produce given the segmentations up to that unit.  A
+window size must be given, because computing one requires the whole
+reference.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import division, absolute_import
+from collections import deque
+from decimal import Decimal
+from segeval.format import BoundaryFormat
+from segeval.util import SegmentationMetricError
+
+
+SUPPORTED_FORMATS = (BoundaryFormat.mass, BoundaryFormat.position)
+
+
+class __WindowStream__(object):
+
+    '''
+    Aligns the units of hypothesis and reference streams, passing each pair of
+    position labels to :meth:`__unit__` in order.  Units of one stream that
+    arrive before those of the other are held as runs of labels.
+    '''
+
+    def __init__(self, window_size, boundary_format=BoundaryFormat.mass):
+        if window_size is None:
+            raise SegmentationMetricError(
+                'A window size is required to compare streams')
+        if boundary_format not in SUPPORTED_FORMATS:
+            raise SegmentationMetricError('Unsupported boundary format')
+        self.window_size = window_size
+        self.boundary_format = boundary_format
+        self.units = 0
+        # Runs of [label, count] not yet aligned with the other stream
+        self.__pending__ = (deque(), deque())
+        # Number of segments received from each stream (as masses)
+        self.__segments__ = [0, 0]
+
+    def push(self, hypothesis=(), reference=()):
+        '''
+        Append segment masses (or position labels) to either stream.
+        '''
+        for side, values in enumerate((hypothesis, reference)):
+            pending = self.__pending__[side]
+            for value in values:
+                if self.boundary_format == BoundaryFormat.mass:
+                    self.__segments__[side] += 1
+                    label, count = self.__segments__[side], value
+                else:
+                    label, count = value, 1
+                if count <= 0:
+                    continue
+                if len(pending) > 0 and pending[-1][0] == label:
+                    pending[-1][1] += count
+                else:
+                    pending.append([label, count])
+        self.__align__()
+        return self
+
+    def __align__(self):
+        pending_hyp, pending_ref = self.__pending__
+        while len(pending_hyp) > 0 and len(pending_ref) > 0:
+            run_hyp, run_ref = pending_hyp[0], pending_ref[0]
+            count = min(run_hyp[1], run_ref[1])
+            for _ in range(count):
+                self.__unit__(run_hyp[0], run_ref[0])
+            self.units += count
+            for pending, run in ((pending_hyp, run_hyp),
+                                 (pending_ref, run_ref)):
+                run[1] -= count
+                if run[1] == 0:
+                    pending.popleft()
+
+    def __check_finished__(self):
+        '''
+        Raise an error if one stream is longer than the other.
+        '''
+        lengths = [sum(run[1] for run in pending)
+                   for pending in self.__pending__]
+        if lengths[0] != lengths[1]:
+            raise SegmentationMetricError(
+                'Reference and hypothesis segmentations differ in position '
+                'length ({0} is not {1}).'.format(self.units + lengths[1],
+                                                  self.units + lengths[0]))
+
+    def __unit__(self, hypothesis_label, reference_label):
+        raise NotImplementedError()
+
+
+class PkStream(__WindowStream__):
+
+    '''
+    Pk (see :func:`segeval.pk`) of a pair of streams.
+    '''
+
+    def __init__(self, window_size, boundary_format=BoundaryFormat.mass):
+        __WindowStream__.__init__(self, window_size, boundary_format)
+        # Labels of the last window_size units
+        self.__window__ = deque()
+        self.sum_differences = 0
+        self.measurements = 0
+
+    def __unit__(self, hypothesis_label, reference_label):
+        window = self.__window__
+        window.append((hypothesis_label, reference_label))
+        if len(window) > self.window_size:
+            start_hyp, start_ref = window.popleft()
+            # Probe agreement between the ends of the window
+            agree_ref = start_ref == reference_label
+            agree_hyp = start_hyp == hypothesis_label
+            if agree_ref is not agree_hyp:
+                self.sum_differences += 1
+            self.measurements += 1
+
+    def parts(self):
+        '''
+        The number of windows whose ends disagree, and of windows, so far.
+        '''
+        return self.sum_differences, self.measurements
+
+    def value(self, one_minus=False, return_parts=False):
+        '''
+        Pk of the units received from both streams so far.
+        '''
+        if return_parts:
+            return self.parts()
+        value = Decimal(self.sum_differences) / self.measurements \
+            if self.measurements > 0 else 0
+        if one_minus:
+            return Decimal('1.0') - value
+        return value
+
+
+class WindowDiffStream(__WindowStream__):
+
+    '''
+    WindowDiff (see :func:`segeval.window_diff`) of a pair of streams.
+    '''
+
+    def __init__(self, window_size, boundary_format=BoundaryFormat.mass,
+                 lamprier_et_al_2007_fix=False):
+        __WindowStream__.__init__(self, window_size, boundary_format)
+        self.lamprier_et_al_2007_fix = lamprier_et_al_2007_fix
+        self.sum_differences = 0
+        self.measurements = 0
+        # Whether a boundary precedes each of the last window_size units
+        self.__window__ = deque()
+        self.__boundaries__ = [0, 0]
+        self.__last__ = None
+        self.__padded_units__ = 0
+        if lamprier_et_al_2007_fix:
+            self.__phantom_size__ = window_size if window_size > 0 else 1
+            for _ in range(self.__phantom_size__):
+                self.__unit__(0, 0)
+
+    def __unit__(self, hypothesis_label, reference_label):
+        self.__padded_units__ += 1
+        if self.__last__ is None:
+            self.__last__ = (hypothesis_label, reference_label)
+            return
+        last_hyp, last_ref = self.__last__
+        self.__last__ = (hypothesis_label, reference_label)
+        boundaries = (int(last_hyp != hypothesis_label),
+                      int(last_ref != reference_label))
+        window = self.__window__
+        window.append(boundaries)
+        self.__boundaries__[0] += boundaries[0]
+        self.__boundaries__[1] += boundaries[1]
+        if len(window) > self.window_size:
+            removed = window.popleft()
+            self.__boundaries__[0] -= removed[0]
+            self.__boundaries__[1] -= removed[1]
+        if self.__padded_units__ > self.window_size:
+            # If the number of boundaries per segmentation in the window
+            # differs
+            if self.__boundaries__[0] != self.__boundaries__[1]:
+                self.sum_differences += 1
+            self.measurements += 1
+
+    def parts(self):
+        '''
+        The number of windows whose boundary counts differ, and the
+        denominator, as if the streams ended now.
+        '''
+        if not self.lamprier_et_al_2007_fix:
+            return self.sum_differences, self.units - self.window_size
+        # Count the windows over the trailing phantom units without keeping
+        # them, so that more units may be pushed
+        state = (deque(self.__window__), list(self.__boundaries__),
+                 self.__last__, self.__padded_units__, self.sum_differences,
+                 self.measurements)
+        for _ in range(self.__phantom_size__):
+            self.__unit__(0, 0)
+        sum_differences, measurements = self.sum_differences, \
+            self.measurements
+        (self.__window__, self.__boundaries__, self.__last__,
+         self.__padded_units__, self.sum_differences,
+         self.measurements) = state
+        return sum_differences, measurements + 1
+
+    def value(self, one_minus=False, return_parts=False):
+        '''
+        WindowDiff of the units received from both streams so far.
+        '''
+        sum_differences, denominator = self.parts()
+        win_diff = Decimal(sum_differences) / denominator \
+            if denominator > 0 else 0
+        if not one_minus:
+            if return_parts:
+                return sum_differences, denominator
+            else:
+                return win_diff
+        else:
+            return Decimal('1.0') - win_diff
+
+
+def __consume__(stream, hypothesis, reference):
+    '''
+    Push every value of a pair of iterables into a stream, alternating
+    between them so that neither is held while the other is consumed, and
+    raise an error if one is longer than the other.
+    '''
+    hypothesis = iter(hypothesis)
+    reference = iter(reference)
+    exhausted = [False, False]
+    while not all(exhausted):
+        values = list()
+        for side, iterator in enumerate((hypothesis, reference)):
+            value = None if exhausted[side] else next(iterator, None)
+            if value is None:
+                exhausted[side] = True
+                values.append(())
+            elif stream.boundary_format == BoundaryFormat.mass:
+                values.append((value,))
+            else:
+                values.append(value)
+        stream.push(*values)
+    stream.__check_finished__()
+    return stream
+
+
+def pk_stream(hypothesis, reference, window_size, one_minus=False,
+              boundary_format=BoundaryFormat.mass, return_parts=False):
+    '''
+    Pk of a hypothesis and reference given as iterables of segment masses
+    (or, with ``boundary_format=BoundaryFormat.position``, of chunks of
+    position labels), holding only one window of units in memory.
+
+    :param window_size: Window size; required, because computing one
+        requires the whole reference.
+    :type window_size: int
+    '''
+    stream = PkStream(window_size, boundary_format)
+    return __consume__(stream, hypothesis, reference).value(one_minus,
+                                                            return_parts)
+
+
+def window_diff_stream(hypothesis, reference, window_size, one_minus=False,
+                       boundary_format=BoundaryFormat.mass,
+                       return_parts=False, lamprier_et_al_2007_fix=False):
+    '''
+    WindowDiff of a hypothesis and reference given as iterables of segment
+    masses (or, with ``boundary_format=BoundaryFormat.position``, of chunks
+    of position labels), holding only one window of units in memory.
+
+    :param window_size: Window size; required, because computing one
+        requires the whole reference.
+    :type window_size: int
+    '''
+    stream = WindowDiffStream(window_size, boundary_format,
+                              lamprier_et_al_2007_fix)
+    return __consume__(stream, hypothesis, reference).value(one_minus,
+                                                            return_parts)
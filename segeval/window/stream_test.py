@@ -0,0 +1,121 @@
+'''
+Tests window metrics of streams.
+
+.. moduleauthor:: Chris Fournier <chris.m.fournier@gmail.com>
+'''
+from __future__ import absolute_import
+from segeval.format import BoundaryFormat, convert_masses_to_positions
+from segeval.window.pk import pk
+from segeval.window.windowdiff import window_diff
+from segeval.window.stream import (PkStream, WindowDiffStream, pk_stream,
+                                   window_diff_stream)
+from segeval.data.samples import KAZANTSEVA2012_G5
+from segeval.util import SegmentationMetricError
+from segeval.util.test import TestCase
+
+
+def __codings__():
+    '''
+    Yield each pair of codings of the same item.
+    '''
+    for codings in KAZANTSEVA2012_G5.values():
+        coders = sorted(codings)
+        for i, coder_m in enumerate(coders):
+            for coder_n in coders[i + 1:]:
+                yield codings[coder_m], codings[coder_n]
+
+
+class TestWindowStream(TestCase):
+
+    '''
+    Test window metrics of streams.
+    '''
+
+    def test_pk(self):
+        '''
+        Test that Pk of streams equals Pk.
+        '''
+        for hypothesis, reference in __codings__():
+            for window_size in (2, 3, 7):
+                self.assertEqual(
+                    pk(hypothesis, reference, window_size=window_size,
+                       return_parts=True),
+                    pk_stream(iter(hypothesis), iter(reference), window_size,
+                              return_parts=True))
+                self.assertEqual(
+                    pk(hypothesis, reference, window_size=window_size),
+                    pk_stream(hypothesis, reference, window_size))
+
+    def test_window_diff(self):
+        '''
+        Test that WindowDiff of streams equals WindowDiff.
+        '''
+        for hypothesis, reference in __codings__():
+            for window_size in (2, 3, 7):
+                for fix in (False, True):
+                    self.assertEqual(
+                        window_diff(hypothesis, reference,
+                                    window_size=window_size,
+                                    lamprier_et_al_2007_fix=fix,
+                                    return_parts=True),
+                        window_diff_stream(iter(hypothesis), iter(reference),
+                                           window_size, return_parts=True,
+                                           lamprier_et_al_2007_fix=fix))
+
+    def test_positions(self):
+        '''
+        Test streams of chunks of position labels.
+        '''
+        hypothesis, reference = next(__codings__())
+        hypothesis = convert_masses_to_positions(hypothesis)
+        reference = convert_masses_to_positions(reference)
+        chunks_hyp = [hypothesis[i:i + 3] for i in range(0, len(hypothesis),
+                                                         3)]
+        chunks_ref = [reference[i:i + 5] for i in range(0, len(reference), 5)]
+        self.assertEqual(
+            window_diff(hypothesis, reference, window_size=4,
+                        boundary_format=BoundaryFormat.position),
+            window_diff_stream(chunks_hyp, chunks_ref, 4,
+                               boundary_format=BoundaryFormat.position))
+        self.assertEqual(
+            pk(hypothesis, reference, window_size=4,
+               boundary_format=BoundaryFormat.position),
+            pk_stream(chunks_hyp, chunks_ref, 4,
+                      boundary_format=BoundaryFormat.position))
+
+    def test_push(self):
+        '''
+        Test values of prefixes while units are pushed.
+        '''
+        hypothesis, reference = (2, 3, 6), (5, 6)
+        for stream_class, fnc_metric in ((PkStream, pk),
+                                         (WindowDiffStream, window_diff)):
+            stream = stream_class(3)
+            stream.push(hypothesis[:2], reference[:1])
+            self.assertEqual(fnc_metric((2, 3), (5,), window_size=3),
+                             stream.value())
+            # The hypothesis is ahead, so only the units of both are scored
+            stream.push(hypothesis[2:])
+            self.assertEqual(fnc_metric((2, 3), (5,), window_size=3),
+                             stream.value())
+            stream.push(reference=reference[1:])
+            self.assertEqual(fnc_metric(hypothesis, reference,
+                                        window_size=3), stream.value())
+        stream = WindowDiffStream(3, lamprier_et_al_2007_fix=True)
+        stream.push(hypothesis[:2], reference[:1])
+        stream.value()
+        stream.push(hypothesis[2:], reference[1:])
+        self.assertEqual(window_diff(hypothesis, reference, window_size=3,
+                                     lamprier_et_al_2007_fix=True),
+                         stream.value())
+
+    def test_errors(self):
+        '''
+        Test streams of differing lengths and missing window sizes.
+        '''
+        self.assertRaises(SegmentationMetricError, pk_stream, (2, 3), (6,), 2)
+        self.assertRaises(SegmentationMetricError, window_diff_stream,
+                          (2, 3), (4,), 2)
+        self.assertRaises(SegmentationMetricError, PkStream, None)
+        self.assertRaises(SegmentationMetricError, WindowDiffStream, 2,
+                          BoundaryFormat.sets)
@@ -99,26 +99,24 @@ length (%(ref)i is not %(hyp)i).' % {'ref': len(reference),
     units_ref_hyp = __create_paired_window__(hypothesis, reference,
                                              window_size,
                                              lamprier_et_al_2007_fix)[0]
+    # Count the boundaries preceding each position in either segmentation so
+    # that the boundaries within each window are found in constant time
+    ref_boundaries = [0]
+    hyp_boundaries = [0]
+    for j in range(0, len(units_ref_hyp) - 1):
+        ref_unit, hyp_unit = units_ref_hyp[j]
+        next_ref_unit, next_hyp_unit = units_ref_hyp[j + 1]
+        ref_boundaries.append(ref_boundaries[-1] +
+                              (ref_unit != next_ref_unit))
+        hyp_boundaries.append(hyp_boundaries[-1] +
+                              (hyp_unit != next_hyp_unit))
     # Slide window over and sum the number of varying windows
     sum_differences = 0
     measurements = len(units_ref_hyp) - window_size
     for i in range(0, measurements):
-        window = units_ref_hyp[i: i + window_size + 1]
-        ref_boundaries = 0
-        hyp_boundaries = 0
-        # Check that the number of loops is correct
-        assert len(window) is window_size + 1
-        # For pair in window
-        for j in range(0, len(window) - 1):
-            ref_part, hyp_part = zip(*window[j:j + 2])
-            # Boundary exists in the reference segmentation
-            if ref_part[0] is not ref_part[1]:
-                ref_boundaries += 1
-            # Boundary exists in the hypothesis segmentation
-            if hyp_part[0] is not hyp_part[1]:
-                hyp_boundaries += 1
         # If the number of boundaries per segmentation in the window differs
-        if ref_boundaries is not hyp_boundaries:
+        if ref_boundaries[i + window_size] - ref_boundaries[i] != \
+                hyp_boundaries[i + window_size] - hyp_boundaries[i]:
             sum_differences += 1
     # Perform final division
     n = sum(convert_positions_to_masses(reference))
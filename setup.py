@@ -9,7 +9,11 @@ import os
 
 try:
     from setuptools import setup
-    extra = dict(test_suite="segeval", include_package_data=True)
+    extra = dict(test_suite="segeval", include_package_data=True,
+                 entry_points={'console_scripts': [
+                     'segeval = segeval.cli:main',
+                     'segeval-daemon = segeval.daemon:main',
+                     'segeval-shard = segeval.shard:main']})
 except ImportError:
     from distutils.core import setup
     extra = {}
@@ -18,6 +22,7 @@ from segeval import __package__, __version__, __author__, __author_email__, __de
 
 packages=['segeval',
           'segeval.agreement',
+          'segeval.bench',
           'segeval.data',
           'segeval.ml',
           'segeval.similarity',